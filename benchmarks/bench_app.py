@@ -0,0 +1,244 @@
+"""
+End-to-end benchmark of an app: SmartAppModel.answer and MainLoop.process_message.
+
+Kafka and the user DB are replaced by in-process fakes (benchmarks.fakes, MemoryAdapter),
+so the numbers contain only framework and app code. By default the smart_kit/template app
+is rendered into a temporary folder and driven with the recorded dialogue from fixtures/messages.json:
+    python -m benchmarks.bench_app [--target model|main_loop|all] [--number N] [--users U] [--output results.json]
+Another app can be measured with --app-config <module> (the app folder must be importable).
+
+Every target is measured in three passes over the same message mix:
+    throughput - messages per second without any instrumentation
+    stages - p50/p95/p99 per tracing span (core.utils.tracing), the spans add their own overhead
+    allocations - tracemalloc peak and retained bytes per message
+"""
+import asyncio
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, List
+from unittest.mock import patch
+
+from benchmarks.fakes import FakeKafkaMessage, FakeConsumer, FakePublisher
+from benchmarks.utils import base_arg_parser, load_fixture, percentiles, report
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "messages.json")
+APP_NAME = "bench_app"
+KAFKA_KEY = "main"
+INCOMING_TOPIC = "bench_in"
+HEADERS = [("kafka_correlationId", b"benchmark")]
+
+
+def render_template_app(path: str) -> str:
+    from smart_kit.management.smart_kit_manager import CreateAppCommand
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        CreateAppCommand().execute(APP_NAME)
+    finally:
+        os.chdir(cwd)
+    return os.path.join(path, APP_NAME)
+
+
+def load_app_config(module: str):
+    os.environ["SMART_KIT_APP_CONFIG"] = module
+    from smart_kit.configs import get_app_config
+    return get_app_config()
+
+
+def build_settings(app_config):
+    settings = app_config.SETTINGS(config_path=app_config.CONFIGS_PATH, secret_path=app_config.SECRET_PATH,
+                                   references_path=app_config.REFERENCES_PATH, app_name=app_config.APP_NAME)
+    template_settings = settings["template_settings"]
+    template_settings["db_adapter"] = {"type": "memory"}
+    template_settings["health_check"] = {"enabled": False}
+    template_settings.setdefault("monitoring", {"enabled": False})
+    settings.registered_repositories["kafka"].fill({"template-engine": {KAFKA_KEY: {
+        "consumer": {"topics": {"app": INCOMING_TOPIC}, "conf": {}},
+        "publisher": {"topic": {"app": "bench_out"}, "conf": {}},
+    }}})
+    return settings
+
+
+def build_messages(dialogue: List[Dict[str, Any]], number: int, users: int) -> List[Dict[str, Any]]:
+    """Each user goes through the dialogue step by step, users are interleaved"""
+    messages = []
+    for i in range(number):
+        user_index = i % users
+        value = copy.deepcopy(dialogue[(i // users) % len(dialogue)])
+        value["messageId"] = i
+        value["sessionId"] = f"bench_session_{user_index}"
+        value["uuid"]["userId"] = f"bench_user_{user_index}"
+        messages.append(value)
+    return messages
+
+
+class StageRecorder:
+    """Span exporter keeping durations by span name"""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+
+    def export(self, span):
+        self.durations.setdefault(span.name, []).append(span.duration)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: percentiles(values) for name, values in sorted(self.durations.items())}
+
+
+@contextmanager
+def recording_stages():
+    from core.utils.tracing import tracer
+    recorder = StageRecorder()
+    enabled, exporters = tracer.enabled, tracer.exporters
+    tracer.enabled, tracer.exporters = True, [recorder]
+    try:
+        yield recorder
+    finally:
+        tracer.enabled, tracer.exporters = enabled, exporters
+
+
+class ModelTarget:
+    """SmartAppModel.answer only: user state is kept in memory between messages, no serialization"""
+    name = "model"
+
+    def __init__(self, app_config, settings, model):
+        self.app_config = app_config
+        self.settings = settings
+        self.model = model
+        self.users_data: Dict[str, str] = {}
+
+    def prepare(self, messages):
+        return [json.dumps(value, ensure_ascii=False) for value in messages]
+
+    async def process(self, raw):
+        message = self.app_config.FROM_MSG(json.loads(raw), headers=HEADERS)
+        user = self.app_config.USER(message.uid, message=message, db_data=self.users_data.get(message.db_uid),
+                                    settings=self.settings, descriptions=self.model.scenario_descriptions,
+                                    parametrizer_cls=self.app_config.PARAMETRIZER)
+        await self.model.answer(message, user)
+        self.users_data[message.db_uid] = user.raw_str
+
+
+class MainLoopTarget:
+    """MainLoop.process_message with fake Kafka and MemoryAdapter as the user DB"""
+    name = "main_loop"
+
+    def __init__(self, app_config, settings, model):
+        import smart_kit.start_points.main_loop_kafka as main_loop_kafka
+        with patch.object(main_loop_kafka, "KafkaConsumer", FakeConsumer), \
+                patch.object(main_loop_kafka, "AsyncKafkaPublisher", FakePublisher):
+            self.main_loop = main_loop_kafka.MainLoop(
+                model, app_config.USER, app_config.PARAMETRIZER, app_config.POSTPROCESSOR_MAIN_LOOP,
+                settings, app_config.TO_MSG_VALIDATORS, app_config.FROM_MSG_VALIDATORS,
+            )
+        self.app_config = app_config
+        self.consumer = self.main_loop.consumers[KAFKA_KEY]
+
+    def prepare(self, messages):
+        result = []
+        for value in messages:
+            message = self.app_config.FROM_MSG(value, headers=HEADERS)
+            key = self.main_loop._get_valid_message_key(message).encode()
+            result.append(FakeKafkaMessage(json.dumps(value, ensure_ascii=False).encode(), key=key,
+                                           topic=INCOMING_TOPIC, headers=HEADERS))
+        return result
+
+    async def process(self, mq_message):
+        # stamped when sent: with prepare-time stamps long passes would exceed waiting_message_timeout.skip
+        mq_message.stamp()
+        if not await self.main_loop.process_message(mq_message, self.consumer, KAFKA_KEY, ""):
+            raise RuntimeError("Message was skipped by MainLoop, the numbers would not be comparable")
+
+
+def run_pass(loop, target, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        loop.run_until_complete(target.process(item))
+    return time.perf_counter() - start
+
+
+def run_allocations_pass(loop, target, items) -> Dict[str, float]:
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    try:
+        for item in items:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            loop.run_until_complete(target.process(item))
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_bytes_per_message": sum(peaks) / len(peaks),
+        "peak_bytes_p95": percentiles(peaks)["p95"],
+        "retained_bytes_per_message": sum(retained) / len(retained),
+    }
+
+
+def measure(target, messages: List[Dict[str, Any]], warmup: int) -> Dict[str, Any]:
+    loop = asyncio.get_event_loop()
+    run_pass(loop, target, target.prepare(messages[:warmup]))
+    elapsed = run_pass(loop, target, target.prepare(messages))
+    with recording_stages() as recorder:
+        run_pass(loop, target, target.prepare(messages))
+    return {
+        "messages": len(messages),
+        "seconds": elapsed,
+        "messages_per_sec": len(messages) / elapsed,
+        "stages_ms": {name: {key: value * 1000 if key != "count" else value for key, value in stats.items()}
+                      for name, stats in recorder.summary().items()},
+        "allocations": run_allocations_pass(loop, target, target.prepare(messages)),
+    }
+
+
+def run(number: int, users: int, targets: List[str], app_config_module: str = None,
+        fixture_path: str = FIXTURE_PATH, warmup: int = 50) -> Dict[str, Any]:
+    from core.utils.version import get_nlpf_version
+
+    with tempfile.TemporaryDirectory() as path:
+        if app_config_module is None:
+            sys.path.insert(0, render_template_app(path))
+            app_config_module = "app_config"
+        app_config = load_app_config(app_config_module)
+        if app_config.NORMALIZER:
+            app_config.NORMALIZER.load_everything()
+        settings = build_settings(app_config)
+        resources = app_config.RESOURCES(settings.get_source(), app_config.REFERENCES_PATH, settings)
+        model = app_config.MODEL(resources, app_config.DIALOGUE_MANAGER, settings)
+
+        messages = build_messages(load_fixture(fixture_path)["dialogue"], number, users)
+        results = {
+            "framework_version": get_nlpf_version(),
+            "python": sys.version.split()[0],
+            "app": app_config.APP_NAME,
+            "users": users,
+        }
+        target_classes = {ModelTarget.name: ModelTarget, MainLoopTarget.name: MainLoopTarget}
+        for target_name in targets:
+            target = target_classes[target_name](app_config, settings, model)
+            results[target_name] = measure(target, messages, warmup)
+    return results
+
+
+def main():
+    parser = base_arg_parser(__doc__)
+    parser.add_argument("--target", choices=["model", "main_loop", "all"], default="all")
+    parser.add_argument("--users", type=int, default=100, help="distinct users in the message mix")
+    parser.add_argument("--app-config", default=None, help="app config module, default: smart_kit/template app")
+    parser.add_argument("--messages", default=FIXTURE_PATH, help="JSON file with the dialogue to replay")
+    args = parser.parse_args()
+    targets = [ModelTarget.name, MainLoopTarget.name] if args.target == "all" else [args.target]
+    report("app", run(args.number, args.users, targets, args.app_config, args.messages), args.output)
+
+
+if __name__ == "__main__":
+    main()
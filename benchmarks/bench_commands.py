@@ -0,0 +1,94 @@
+"""
+Answer assembly for scenarios that emit many commands: combine_commands and MainLoop._generate_answers.
+
+Commands are the recorded answers from fixtures/answers.json (ANSWER_TO_USER) mixed with other commands,
+`--commands` per message, a share of ANSWER_TO_USER given by `--answers-share`:
+    python -m benchmarks.bench_commands [--number N] [--commands 1,10,100] [--answers-share 0.5] [--output results.json]
+
+Measured are CPU per message of
+    combine - combine_commands only
+    generate_answers - Kafka MainLoop._generate_answers: combine_commands and outgoing SmartAppToMessage with requests
+"""
+import copy
+import os
+from types import SimpleNamespace
+
+from core.basic_models.actions.command import Command
+from core.message.from_message import SmartAppFromMessage
+from core.model.registered import registered_factories
+from scenarios.scenario_models.history import History, HistoryDescription
+from scenarios.scenario_models.history.formatters import EventFormatter, HistoryEventFormatter, formatters, \
+    formatters_factory
+from smart_kit.compatibility.commands import combine_commands
+from smart_kit.start_points.main_loop_kafka import MainLoop
+from benchmarks.utils import base_arg_parser, cpu_time_per_call, load_fixture, report
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "answers.json")
+REPEAT = 3
+
+
+def build_user(incoming):
+    # as registered by SmartAppResources
+    registered_factories[EventFormatter] = formatters_factory
+    formatters[None] = HistoryEventFormatter
+    return SimpleNamespace(
+        message=incoming,
+        last_scenarios=SimpleNamespace(last_scenario_name="bench_scenario"),
+        history=History({}, HistoryDescription({"enabled": False}), None),
+        local_vars={},
+    )
+
+
+def build_commands(answers, count: int, answers_share: float):
+    commands = []
+    answers_count = max(1, int(count * answers_share))
+    for index in range(count):
+        if index < answers_count:
+            answer = answers[index % len(answers)]
+            commands.append(Command(answer["name"], copy.deepcopy(answer["payload"])))
+        else:
+            commands.append(Command(f"COMMAND_{index}", {"index": index, "data": {"value": index}}))
+    return commands
+
+
+def run(number: int, counts, answers_share: float):
+    fixture = load_fixture(FIXTURE_PATH)
+    incoming = SmartAppFromMessage(fixture["incoming"], headers_required=False)
+    user = build_user(incoming)
+    main_loop = SimpleNamespace(masking_fields=None, to_msg_validators=(), app_name="bench_app",
+                                BAD_ANSWER_COMMAND=MainLoop.BAD_ANSWER_COMMAND)
+    results = {}
+    for count in counts:
+        # combine_commands mutates the commands, every call gets its own prebuilt list
+        def prebuilt():
+            return iter([build_commands(fixture["answers"], count, answers_share) for _ in range(number * REPEAT)])
+
+        combine_commands_lists = prebuilt()
+        generate_answers_lists = prebuilt()
+
+        def combine():
+            return combine_commands(next(combine_commands_lists), user)
+
+        def generate_answers():
+            return MainLoop._generate_answers(main_loop, user, next(generate_answers_lists), incoming,
+                                              topic_key="bench_out", kafka_key="main")
+
+        results[count] = {
+            "combine_cpu_us_per_message": cpu_time_per_call(combine, number=number, repeat=REPEAT) * 1e6,
+            "generate_answers_cpu_us_per_message":
+                cpu_time_per_call(generate_answers, number=number, repeat=REPEAT) * 1e6,
+        }
+    return results
+
+
+def main():
+    parser = base_arg_parser(__doc__)
+    parser.add_argument("--commands", default="1,10,100", help="commands per message")
+    parser.add_argument("--answers-share", type=float, default=0.5, help="share of ANSWER_TO_USER commands")
+    args = parser.parse_args()
+    counts = [int(count) for count in args.commands.split(",")]
+    report("commands", run(args.number, counts, args.answers_share), args.output)
+
+
+if __name__ == "__main__":
+    main()
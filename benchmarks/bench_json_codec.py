@@ -0,0 +1,100 @@
+"""
+JSON codec per call site, for every available backend of core.utils.json_codec (json, orjson if installed).
+
+Payloads are the recorded incoming message and answers from fixtures/answers.json, a synthetic user record
+and the template app's form description:
+    python -m benchmarks.bench_json_codec [--number N] [--output results.json]
+
+Call sites:
+    incoming_loads - MainLoop.process_message, HttpMainLoop/AIOHttpMainLoop.iterate: loads of the message body
+    user_loads - User.__init__: loads of db_data
+    user_raw_str - BaseUser.raw_str: dumps with default for non-serializable objects
+    from_message_as_str - SmartAppFromMessage.as_str
+    to_message_value - SmartAppToMessage.value for the json.dumps loader
+    masked_view - str of MaskedView in logs
+    logger_format - SmartKitJsonFormatter.format of a record with args
+    ordered_json - ordered_json loading of repositories
+"""
+import logging
+import os
+import time
+
+from core.basic_models.actions.command import Command
+from core.message.from_message import SmartAppFromMessage
+from core.utils import json_codec
+from core.utils.loader import ordered_json
+from core.utils.masking_message import MaskedView
+from smart_kit.message.smartapp_to_message import SmartAppToMessage
+from smart_kit.utils.logger_writer.logger_formatter import SmartKitJsonFormatter
+from benchmarks.utils import base_arg_parser, cpu_time_per_call, load_fixture, report
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "answers.json")
+FORM_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "smart_kit", "template", "static", "references",
+                         "forms", "hello_form.json")
+
+
+def build_user_record(size: int = 50):
+    now = time.time()
+    return {
+        "id": "webdbg_userid_3ab4f5",
+        "variables": {f"var_{index}": [f"значение {index}", now + 3600] for index in range(size)},
+        "counters": {f"counter_{index}": {"value": index, "create_time": int(now), "update_time": int(now),
+                                          "lifetime": 3600} for index in range(size)},
+        "forms": {"hello_form": {"remove_time": int(now) + 3600,
+                                 "fields": {"name": {"value": "Иван", "available": True}}}},
+        "history": {"columns": {"created_time": [now] * size, "type": [0] * size, "scenario": [0] * size},
+                    "values": {"type": ["field_event"], "scenario": ["hello_scenario"]}},
+        "last_messages_ids": list(range(10)),
+    }
+
+
+def call_sites():
+    fixture = load_fixture(FIXTURE_PATH)
+    incoming_body = json_codec.dumps(fixture["incoming"], ensure_ascii=False).encode()
+    incoming = SmartAppFromMessage(fixture["incoming"], headers_required=False)
+    answer = fixture["answers"][0]
+    user_record = build_user_record()
+    user_db_data = json_codec.dumps(user_record)
+    with open(FORM_PATH, encoding="utf-8") as f:
+        form = f.read()
+    formatter = SmartKitJsonFormatter(json_ensure_ascii=False)
+    record = logging.LogRecord("bench", logging.INFO, __file__, 0, "message %(uid)s", None, None)
+    record.args = {"uid": "webdbg_userid_3ab4f5", "message_id": 3155210893, "text": "привет"}
+
+    def to_message_value():
+        command = Command(answer["name"], dict(answer["payload"]), loader=SmartAppToMessage.JSON_LOADER)
+        return SmartAppToMessage(command, incoming, request=None).value
+
+    return {
+        "incoming_loads": lambda: json_codec.loads(incoming_body),
+        "user_loads": lambda: json_codec.loads(user_db_data),
+        "user_raw_str": lambda: json_codec.dumps(
+            user_record, default=lambda o: f"<non-serializable: {type(o).__qualname__}>"),
+        "from_message_as_str": lambda: incoming.as_str,
+        "to_message_value": to_message_value,
+        "masked_view": lambda: str(MaskedView(fixture["incoming"])),
+        "logger_format": lambda: formatter.format(record),
+        "ordered_json": lambda: ordered_json(form),
+    }
+
+
+def run(number: int):
+    results = {}
+    initial = json_codec.get_backend()
+    try:
+        for backend in json_codec.available_backends():
+            json_codec.set_backend(backend)
+            results[backend] = {name: {"cpu_us_per_call": cpu_time_per_call(func, number=number) * 1e6}
+                                for name, func in call_sites().items()}
+    finally:
+        json_codec.set_backend(initial)
+    return results
+
+
+def main():
+    args = base_arg_parser(__doc__).parse_args()
+    report("json_codec", run(args.number), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+JSON vs protobuf outgoing message serialization.
+
+Measures bytes on the wire and CPU per answer on recorded answers from fixtures/answers.json:
+    python -m benchmarks.bench_to_message [--number N] [--output results.json]
+"""
+import os
+
+from core.basic_models.actions.command import Command
+from core.message.from_message import SmartAppFromMessage
+from smart_kit.message.smartapp_to_message import SmartAppToMessage
+from benchmarks.utils import cpu_time_per_call, load_fixture, base_arg_parser, report
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "answers.json")
+
+
+def _build_answer(incoming, answer, loader):
+    command = Command(answer["name"], dict(answer["payload"]), loader=loader)
+    return SmartAppToMessage(command, incoming, request=None)
+
+
+def run(number: int):
+    fixture = load_fixture(FIXTURE_PATH)
+    incoming = SmartAppFromMessage(fixture["incoming"], headers_required=False)
+    results = {}
+    for loader in (SmartAppToMessage.JSON_LOADER, SmartAppToMessage.PROTOBUF_LOADER):
+        wire_bytes = 0
+        cpu = 0.0
+        for answer in fixture["answers"]:
+            value = _build_answer(incoming, answer, loader).value
+            wire_bytes += len(value.encode() if isinstance(value, str) else value)
+            cpu += cpu_time_per_call(lambda: _build_answer(incoming, answer, loader).value, number=number)
+        results[loader] = {
+            "bytes_per_answer": wire_bytes / len(fixture["answers"]),
+            "cpu_us_per_answer": cpu / len(fixture["answers"]) * 1e6,
+        }
+    return results
+
+
+def main():
+    args = base_arg_parser(__doc__).parse_args()
+    report("to_message_serialization", run(args.number), args.output)
+
+
+if __name__ == "__main__":
+    main()
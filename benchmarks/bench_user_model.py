@@ -0,0 +1,85 @@
+"""
+User model load/save cost with lazy fields.
+
+User records are produced by replaying the recorded dialogue from fixtures/messages.json through
+the smart_kit/template app (see benchmarks.bench_app), then every record is loaded and saved again:
+    python -m benchmarks.bench_user_model [--number N] [--users U] [--output results.json]
+
+Two scenarios per record:
+    untouched - User(...) and raw_str only, untouched fields are passed through as raw JSON
+    materialized - every field of User.fields is accessed before raw_str, as eager construction did
+Measured are CPU per record and tracemalloc peak bytes per record.
+"""
+import asyncio
+import sys
+import tempfile
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks.bench_app import FIXTURE_PATH, ModelTarget, build_messages, build_settings, load_app_config, \
+    render_template_app
+from benchmarks.utils import base_arg_parser, cpu_time_per_call, load_fixture, report
+
+
+def load_user(target: ModelTarget, message, db_data: str, touch: bool):
+    app_config = target.app_config
+    user = app_config.USER("bench_user", message=message, db_data=db_data, settings=target.settings,
+                           descriptions=target.model.scenario_descriptions,
+                           parametrizer_cls=app_config.PARAMETRIZER)
+    if touch:
+        for field in user.fields:
+            user.get_field(field.name)
+    return user.raw_str
+
+
+def allocations(func, records: List[str]) -> float:
+    peaks = []
+    tracemalloc.start()
+    try:
+        for db_data in records:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            func(db_data)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def run(number: int, users: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as path:
+        sys.path.insert(0, render_template_app(path))
+        app_config = load_app_config("app_config")
+        if app_config.NORMALIZER:
+            app_config.NORMALIZER.load_everything()
+        settings = build_settings(app_config)
+        resources = app_config.RESOURCES(settings.get_source(), app_config.REFERENCES_PATH, settings)
+        model = app_config.MODEL(resources, app_config.DIALOGUE_MANAGER, settings)
+
+        target = ModelTarget(app_config, settings, model)
+        dialogue = load_fixture(FIXTURE_PATH)["dialogue"]
+        loop = asyncio.get_event_loop()
+        for raw in target.prepare(build_messages(dialogue, users * len(dialogue), users)):
+            loop.run_until_complete(target.process(raw))
+        records = list(target.users_data.values())
+        message = app_config.FROM_MSG(build_messages(dialogue, 1, 1)[0], headers_required=False)
+
+        results = {"records": len(records), "mean_record_bytes": sum(map(len, records)) / len(records)}
+        for name, touch in (("untouched", False), ("materialized", True)):
+            cpu = sum(cpu_time_per_call(lambda: load_user(target, message, db_data, touch), number=number)
+                      for db_data in records)
+            peak = allocations(lambda db_data: load_user(target, message, db_data, touch), records)
+            results[name] = {"cpu_us_per_record": cpu / len(records) * 1e6, "peak_bytes_per_record": peak}
+    return results
+
+
+def main():
+    parser = base_arg_parser(__doc__)
+    parser.add_argument("--users", type=int, default=20, help="distinct user records")
+    args = parser.parse_args()
+    report("user_model", run(args.number, args.users), args.output)
+
+
+if __name__ == "__main__":
+    main()
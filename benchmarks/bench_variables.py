@@ -0,0 +1,57 @@
+"""
+Variables and Counters of users with many entries.
+
+A message is emulated as: load from the stored raw, expire, `reads` reads of Variables.values and
+Counters.raw (templates, requirements and the parametrizer), a few updates and raw for saving:
+    python -m benchmarks.bench_variables [--number N] [--sizes 10,100,500] [--reads R] [--output results.json]
+"""
+import json
+import time
+
+from core.basic_models.counter.counters import Counters
+from core.basic_models.variables.variables import Variables
+from benchmarks.utils import base_arg_parser, cpu_time_per_call, report
+
+
+def build_raw(size: int):
+    now = time.time()
+    variables = {f"var_{index}": [f"value_{index}", now + 3600 + index] for index in range(size)}
+    counters = {f"counter_{index}": {"value": index, "create_time": int(now), "update_time": int(now),
+                                     "lifetime": 3600 + index} for index in range(size)}
+    return json.dumps(variables), json.dumps(counters)
+
+
+def process_message(raw_variables: str, raw_counters: str, reads: int):
+    variables = Variables(json.loads(raw_variables), None)
+    counters = Counters(json.loads(raw_counters), None)
+    variables.expire()
+    counters.expire()
+    for index in range(reads):
+        variables.values.get("var_0")
+        counters.raw.get("counter_0")
+        if index % 10 == 0:
+            variables.set(f"var_{index}", index)
+            counters[f"counter_{index}"].inc()
+    return variables.raw, counters.raw
+
+
+def run(number: int, sizes, reads: int):
+    results = {}
+    for size in sizes:
+        raw_variables, raw_counters = build_raw(size)
+        cpu = cpu_time_per_call(lambda: process_message(raw_variables, raw_counters, reads), number=number)
+        results[size] = {"cpu_us_per_message": cpu * 1e6}
+    return results
+
+
+def main():
+    parser = base_arg_parser(__doc__)
+    parser.add_argument("--sizes", default="10,100,500", help="variables and counters per user")
+    parser.add_argument("--reads", type=int, default=50, help="reads of values per message")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report("variables", run(args.number, sizes, args.reads), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""In-process replacements for Kafka consumer/publisher used by the benchmarks"""
+import time
+from typing import List, Optional, Tuple
+
+from confluent_kafka import TIMESTAMP_CREATE_TIME
+
+
+class FakeKafkaMessage:
+    """Mimics the part of confluent_kafka.Message used by MainLoop"""
+
+    def __init__(self, value: bytes, key: Optional[bytes] = None, topic: str = "", partition: int = 0,
+                 headers: Optional[List[Tuple[str, bytes]]] = None, timestamp: Optional[int] = None):
+        self._value = value
+        self._key = key
+        self._topic = topic
+        self._partition = partition
+        self._headers = headers
+        self._timestamp = timestamp
+
+    def value(self):
+        return self._value
+
+    def key(self):
+        return self._key
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def headers(self):
+        return self._headers
+
+    def timestamp(self):
+        return TIMESTAMP_CREATE_TIME, self._timestamp
+
+    def stamp(self):
+        """Sets the create time to now, as if the message has just been produced"""
+        self._timestamp = int(time.time() * 1000)
+
+
+class FakeConsumer:
+    def __init__(self, config=None):
+        self.config = config
+        self.messages: List[FakeKafkaMessage] = []
+        self.committed = 0
+
+    def subscribe(self, topics=None):
+        pass
+
+    def poll(self):
+        return self.messages.pop(0) if self.messages else None
+
+    def commit_offset(self, msg):
+        if msg is not None:
+            self.committed += 1
+
+    def get_msg_create_time(self, mq_message):
+        return mq_message.timestamp()[1]
+
+    def close(self):
+        pass
+
+
+class FakePublisher:
+    def __init__(self, config=None):
+        self.config = config
+        self.sent = 0
+        self.sent_bytes = 0
+
+    def send(self, value, key=None, topic_key=None, headers=None):
+        self.sent += 1
+        self.sent_bytes += len(value)
+
+    def send_to_topic(self, value, key=None, topic=None, headers=None):
+        self.send(value, key, topic, headers)
+
+    def close(self):
+        pass
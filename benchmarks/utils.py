@@ -0,0 +1,49 @@
+import argparse
+import json
+import time
+from typing import Callable, Dict, Any, Optional, Sequence
+
+
+def cpu_time_per_call(func: Callable[[], Any], number: int = 1000, repeat: int = 3) -> float:
+    """Best of `repeat` runs, CPU seconds per call"""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        for _ in range(number):
+            func()
+        elapsed = (time.process_time() - start) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """count, mean, p50/p95/p99 and max of the values (nearest-rank)"""
+    values = sorted(values)
+    count = len(values)
+    return {
+        "count": count,
+        "mean": sum(values) / count,
+        "p50": values[int(count * 0.5)],
+        "p95": values[min(count - 1, int(count * 0.95))],
+        "p99": values[min(count - 1, int(count * 0.99))],
+        "max": values[-1],
+    }
+
+
+def load_fixture(path: str):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def base_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--number", type=int, default=1000, help="calls per measurement")
+    parser.add_argument("--output", default=None, help="path to write JSON results")
+    return parser
+
+
+def report(name: str, results: Dict[str, Any], output: Optional[str] = None):
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"benchmark": name, "results": results}, f, ensure_ascii=False, indent=2)
+    print(json.dumps({"benchmark": name, "results": results}, ensure_ascii=False, indent=2))
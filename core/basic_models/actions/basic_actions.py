@@ -237,8 +237,9 @@ class NonRepeatingAction(ActionOfActions):
         all_indexes = list(range(self._actions_count))
         max_last_ids_count = self._actions_count - 1
         # get last_actions_ids slice with max_len of max_last_ids_count
-        last_actions_ids = last_ids.get_list()[-max_last_ids_count:]
-        available_indexes = list(set(all_indexes) - set(last_actions_ids))
+        last_actions_ids = set(last_ids.get_list()[-max_last_ids_count:])
+        # в хранилище могут быть отпечатки индексов (fingerprint_size), сравниваются ключи
+        available_indexes = [index for index in all_indexes if last_ids.key(index) not in last_actions_ids]
         action_index = random.choice(available_indexes)
         action = self.actions[action_index]
         last_ids.add(action_index)
@@ -12,7 +12,7 @@ from core.basic_models.answer_items.answer_items import SdkAnswerItem
 from core.model.base_user import BaseUser
 from core.model.factory import list_factory
 from core.text_preprocessing.base import BaseTextPreprocessingResult
-from core.unified_template.unified_template import UnifiedTemplate, UNIFIED_TEMPLATE_TYPE_NAME
+from core.unified_template.unified_template import UnifiedTemplate, UNIFIED_TEMPLATE_TYPE_NAME, RENDER_STATIC
 
 T = TypeVar("T")
 
@@ -24,6 +24,9 @@ class NodeAction(CommandAction):
     """ NodeAction расширяет функционал CommandAction, добавляя рендеринг Jinja-шаблонов внутри полей "nodes" и
     "support_templates".
 
+    Шаблоны без переменных отрисовываются один раз при загрузке, шаблоны, зависящие только от данных в параметрах,
+    отрисовываются через ограниченный кэш по значениям этих данных (items["render_cache"], по умолчанию включено,
+    items["render_cache_size"] - размер кэша каждого шаблона). Какие шаблоны к какому виду отнесены - render_metadata.
     """
     version: Optional[int]
     command: str
@@ -36,14 +39,48 @@ class NodeAction(CommandAction):
         self._nodes = items.get("nodes") or {}
         self._support_templates = items.get("support_templates") or {}
         self.no_empty_nodes = items.get("no_empty_nodes", False)
+        self.render_cache_size = items.get("render_cache_size", 128) if items.get("render_cache", True) else 0
 
     @cached_property
     def nodes(self) -> Dict[str, Union[str, T]]:
-        return {k: self._get_template_tree(t) for k, t in self._nodes.items()}
+        return {k: self._enable_render_cache(self._get_template_tree(t)) for k, t in self._nodes.items()}
 
     @cached_property
     def support_templates(self) -> Dict[str, Union[str, T]]:
-        return {k: self._get_template_tree(t) for k, t in self._support_templates.items()}
+        return {k: self._enable_render_cache(self._get_template_tree(t)) for k, t in self._support_templates.items()}
+
+    def _enable_render_cache(self, tree: T) -> T:
+        if self.render_cache_size:
+            for _, template in self._iter_templates(tree):
+                template.enable_render_cache(self.render_cache_size)
+        return tree
+
+    @classmethod
+    def _iter_templates(cls, value: T, path: Tuple = ()):
+        if type(value) is UnifiedTemplate:
+            yield path, value
+        elif isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                yield from cls._iter_templates(inner_value, path + (inner_key,))
+        elif isinstance(value, list):
+            for index, inner_value in enumerate(value):
+                yield from cls._iter_templates(inner_value, path + (index,))
+
+    def _is_static(self, value: T) -> bool:
+        return all(template.render_kind == RENDER_STATIC for _, template in self._iter_templates(value))
+
+    @cached_property
+    def render_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Вид отрисовки каждого шаблона: {"nodes.answer.0": {"kind": "cached", "params": ["payload.amount"]}}"""
+        metadata = {}
+        for section, trees in (("nodes", self.nodes), ("support_templates", self.support_templates)):
+            for path, template in self._iter_templates(trees, (section,)):
+                dependencies = template.dependencies or ()
+                metadata[".".join(map(str, path))] = {
+                    "kind": template.render_kind,
+                    "params": sorted(".".join(map(str, dependency)) for dependency in dependencies),
+                }
+        return metadata
 
     def _get_template_tree(self, value: Union[str, T]) -> T:
         is_dict_unified_template = isinstance(value, dict) and value.get("type") == UNIFIED_TEMPLATE_TYPE_NAME
@@ -62,6 +99,9 @@ class NodeAction(CommandAction):
         return result
 
     def _get_rendered_tree(self, value: T, params: Dict, no_empty=False) -> Union[str, Dict, List]:
+        if self._is_static(value):
+            # от support_templates результат тоже не зависит
+            return self._get_rendered_tree_recursive(value, params, no_empty=no_empty)
         params = copy(params)
         for support_key, support_template in self.support_templates.items():
             params[support_key] = support_template.render(params)
@@ -1,7 +1,9 @@
 # coding: utf-8
-from typing import Dict
+import time
+from typing import Dict, Optional
 
 from core.basic_models.counter.counter import Counter
+from core.model.heapq.deadline_heap import DeadlineHeap
 
 
 class Counters:
@@ -10,6 +12,7 @@ class Counters:
         self._raw_items = items or {}
         self._items: Dict[str, Counter] = {}
         self._item_type = Counter
+        self._deadlines: Optional[DeadlineHeap] = None
 
     def __getitem__(self, key):
         return self.get(key)
@@ -27,12 +30,44 @@ class Counters:
             del self._items[key]
         if key in self._raw_items:
             self._raw_items.pop(key)
+        if self._deadlines is not None:
+            self._deadlines.discard(key)
+
+    def _get_deadline(self, key) -> Optional[float]:
+        counter = self._items.get(key)
+        if counter is None:
+            item = self._raw_items[key]
+            if not item.get("lifetime"):
+                return None
+            if item.get("create_time"):
+                return item["create_time"] + item["lifetime"]
+            # create_time счетчику задается при создании
+            counter = self.get(key)
+        return counter.create_time + counter.lifetime if counter.lifetime else None
+
+    def _get_deadlines(self) -> DeadlineHeap:
+        """Сроки счетчиков из raw; сроки созданных счетчиков могли измениться и назначаются заново"""
+        raw = self.raw
+        if self._deadlines is None:
+            self._deadlines = DeadlineHeap((key, self._get_deadline(key)) for key in raw)
+        else:
+            for key in self._items:
+                if key in raw:
+                    self._deadlines.schedule(key, self._get_deadline(key))
+        return self._deadlines
 
     def expire(self):
-        items = list(self.raw.keys())
-        for key in items:
+        deadlines = self._get_deadlines()
+        for key in deadlines.pop_due(time.time()):
+            if key not in self._raw_items:
+                continue
             if self[key].check_expire():
                 self.clear(key)
+            else:
+                deadlines.schedule(key, self._get_deadline(key))
+
+    def next_expire_time(self) -> Optional[float]:
+        return self._get_deadlines().peek()
 
     @property
     def raw(self):
@@ -1,11 +1,11 @@
 import logging
 import hashlib
-from datetime import datetime, timezone
+import time
+import zlib
+from datetime import datetime, time as datetime_time
 from functools import cached_property
 from random import random
-from typing import List, Optional, Dict, Any
-
-from croniter import croniter
+from typing import List, Optional, Dict, Any, Tuple, Hashable, Collection
 
 import core.logging.logger_constants as log_const
 from core.basic_models.classifiers.basic_classifiers import Classifier, ExternalClassifier
@@ -17,6 +17,7 @@ from core.model.registered import Registered
 from core.text_preprocessing.base import BaseTextPreprocessingResult
 from core.text_preprocessing.preprocessing_result import TextPreprocessingResult
 from core.unified_template.unified_template import UnifiedTemplate
+from core.utils.cron import CronSchedule
 from core.utils.stats_timer import StatsTimer
 from scenarios.scenario_models.field.field_filler_description import IntersectionFieldFiller
 from scenarios.user.user_model import User
@@ -115,6 +116,30 @@ class Requirement:
     def hash_for_cache(self):
         return hashlib.md5(f"{self.__class__.__name__}{self.items}".encode()).hexdigest()
 
+    def transition_key(self) -> Optional[Tuple[Hashable, Collection]]:
+        """Дешевый необходимый признак выполнения условия для индекса переходов TreeScenario.
+
+        Возвращает (key, values): условие может вернуть True только если transition_value() входит в values.
+        Условия с одинаковым key считают transition_value() одинаково. None - признака нет.
+        """
+        return None
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser) -> Hashable:
+        raise NotImplementedError
+
+    def transition_discriminator(self) -> Optional[Tuple[Hashable, Collection]]:
+        """transition_key(), если он объявлен не раньше проверки: наследник, переопределивший check или _check,
+        не получит чужой признак.
+        """
+        mro = type(self).__mro__
+
+        def owner(name):
+            return next(index for index, cls in enumerate(mro) if name in vars(cls))
+
+        if owner("transition_key") > min(owner("check"), owner("_check"), owner("_on_check_error_result")):
+            return None
+        return self.transition_key()
+
 
 class CompositeRequirement(Requirement):
     requirements: List[Requirement]
@@ -138,6 +163,17 @@ class AndRequirement(CompositeRequirement):
             for requirement in self.requirements
         )
 
+    def transition_key(self) -> Optional[Tuple[Hashable, Collection]]:
+        for requirement in self.requirements:
+            discriminator = requirement.transition_discriminator()
+            if discriminator is not None:
+                self._discriminating_requirement = requirement
+                return discriminator
+        return None
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser) -> Hashable:
+        return self._discriminating_requirement.transition_value(text_preprocessing_result, user)
+
 
 class OrRequirement(CompositeRequirement):
 
@@ -204,6 +240,12 @@ class TopicRequirement(Requirement):
                params: Dict[str, Any] = None) -> bool:
         return user.message.topic_key in self.topics
 
+    def transition_key(self) -> Optional[Tuple[Hashable, Collection]]:
+        return "topic", self.topics
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser) -> Hashable:
+        return user.message.topic_key
+
 
 class TemplateRequirement(Requirement):
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
@@ -225,24 +267,52 @@ class TemplateRequirement(Requirement):
 
 
 class RollingRequirement(Requirement):
+    """Условие возвращает True для items["percent"] процентов пользователей.
+
+    Пользователь попадает в корзину 0..99 по хэшу user.id: items["hash"] - "sha256" (по умолчанию)
+    или быстрый некриптографический "crc32" (смена функции перераспределяет пользователей по корзинам).
+    Корзина считается один раз на сообщение и общая для всех RollingRequirement с той же функцией хэша.
+    """
+    MESSAGE_VAR = "rolling_buckets"
+    BUCKETS = 100
+    HASHES = {
+        "sha256": lambda data: int.from_bytes(hashlib.sha256(data).digest(), "big"),
+        "crc32": zlib.crc32,
+    }
+
     percent: int
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self.percent = items["percent"]
+        self.hash_name = items.get("hash", "sha256")
+        self._hash = self.HASHES[self.hash_name]
+
+    def _get_bucket(self, user: BaseUser) -> int:
+        buckets = user.message_vars.get(self.MESSAGE_VAR)
+        if not isinstance(buckets, dict):
+            buckets = {}
+            user.message_vars.set(self.MESSAGE_VAR, buckets)
+        key = (self.hash_name, user.id)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = self._hash(user.id.encode("utf-8")) % self.BUCKETS
+            buckets[key] = bucket
+        return bucket
 
     def _check(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser,
                params: Dict[str, Any] = None) -> bool:
-        id = user.id
-        s = id.encode('utf-8')
-        hash = int(hashlib.sha256(s).hexdigest(), 16)
-        res = hash % 100
-        return res < self.percent
+        return self._get_bucket(user) < self.percent
 
 
 class TimeRequirement(ComparisonRequirement):
+    """Сравнивает время сообщения (UTC) с items["operator"]["amount"] в формате %H:%M:%S.
+    Результат последней проверки запоминается на секунду времени сообщения.
+    """
+
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
+        self._last_result = (None, None)
 
     def _check(
             self,
@@ -252,8 +322,14 @@ class TimeRequirement(ComparisonRequirement):
     ) -> bool:
         message_time_dict = user.message.payload['meta']['time']
         message_timestamp_sec = message_time_dict['timestamp'] // 1000
-        message_time = datetime.fromtimestamp(message_timestamp_sec, tz=timezone.utc).time()
-        return self.operator.compare(message_time)
+        last_timestamp, last_result = self._last_result
+        if last_timestamp == message_timestamp_sec:
+            return last_result
+        seconds = message_timestamp_sec % 86400
+        message_time = datetime_time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+        result = self.operator.compare(message_time)
+        self._last_result = (message_timestamp_sec, result)
+        return result
 
     @factory(Operator)
     def build_operator(self):
@@ -264,11 +340,17 @@ class TimeRequirement(ComparisonRequirement):
 
 
 class DateTimeRequirement(Requirement):
+    """Проверяет локальное время сообщения по cron-выражению items["match_cron"].
+    Выражение компилируется при загрузке (CronSchedule), результат запоминается на минуту времени сообщения
+    и часовой пояс процесса.
+    """
     match_cron: str
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         super().__init__(items, id)
         self.match_cron = items['match_cron']
+        self.schedule = CronSchedule(self.match_cron)
+        self._last_result = (None, None)
 
     def _check(
             self,
@@ -278,8 +360,14 @@ class DateTimeRequirement(Requirement):
     ) -> bool:
         message_time_dict = user.message.payload['meta']['time']
         message_timestamp_sec = message_time_dict['timestamp'] // 1000
+        key = (message_timestamp_sec // 60, time.tzname, time.timezone)
+        last_key, last_result = self._last_result
+        if last_key == key:
+            return last_result
         message_datetime = datetime.fromtimestamp(message_timestamp_sec)
-        return croniter.match(self.match_cron, message_datetime)
+        result = self.schedule.match(message_datetime)
+        self._last_result = (key, result)
+        return result
 
 
 class IntersectionRequirement(Requirement):
@@ -352,6 +440,12 @@ class FormFieldValueRequirement(Requirement):
                params: Dict[str, Any] = None) -> bool:
         return user.forms[self.form_name].fields[self.field_name].value == self.value
 
+    def transition_key(self) -> Optional[Tuple[Hashable, Collection]]:
+        return ("form_field_value", self.form_name, self.field_name), [self.value]
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User) -> Hashable:
+        return user.forms[self.form_name].fields[self.field_name].value
+
 
 class EnvironmentRequirement(Requirement):
     """Условие возвращает True, если сценарий исполняется на стенде из числа values, иначе - False.
@@ -387,6 +481,12 @@ class CharacterIdRequirement(Requirement):
                params: Dict[str, Any] = None) -> bool:
         return user.message.payload["character"]["id"] in self.values
 
+    def transition_key(self) -> Optional[Tuple[Hashable, Collection]]:
+        return "character_id", self.values
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User) -> Hashable:
+        return user.message.payload["character"]["id"]
+
 
 class FeatureToggleRequirement(Requirement):
     """Условие возвращает True, если проверка указанного тогла по названию возвращает True, иначе - False.
@@ -42,6 +42,12 @@ class ChannelRequirement(BaseContainsRequirement):
     def get_field(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser) -> str:
         return user.message.channel
 
+    def transition_key(self):
+        return "channel", self.channels
+
+    def transition_value(self, text_preprocessing_result: BaseTextPreprocessingResult, user: BaseUser) -> str:
+        return user.message.channel
+
 
 class PlatformTypeRequirement(Requirement):
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
@@ -12,6 +12,7 @@ from core.model.factory import build_factory, list_factory
 from core.model.factory import factory
 from core.model.registered import Registered
 from core.text_preprocessing.base import BaseTextPreprocessingResult
+from core.utils.tracing import tracer
 
 scenarios = Registered()
 
@@ -84,7 +85,9 @@ class BaseScenario:
                                  actions: List[Action], params: Dict[str, Any] = None) -> List[Command]:
         results = []
         for action in actions:
-            result = await action.run(user, text_preprocessing_result, params) or []
+            with tracer.span("action", action=action.__class__.__name__, action_id=getattr(action, "id", None),
+                             scenario=self.id):
+                result = await action.run(user, text_preprocessing_result, params) or []
             log_params = self._log_params()
             log_params["class"] = action.__class__.__name__
             log("called action: %(class)s", user, log_params)
@@ -1,5 +1,8 @@
 import time
-from typing import Dict, Any, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+from core.model.heapq.deadline_heap import DeadlineHeap
 
 
 class Variables:
@@ -8,6 +11,9 @@ class Variables:
     def __init__(self, items, user, savable: bool = True):
         self._savable = savable
         self._storage: Dict[str, Tuple[Any, float]] = items or {}
+        # сроки и значения живых переменных строятся при первом обращении и дальше поддерживаются изменениями
+        self._deadlines: Optional[DeadlineHeap] = None
+        self._live: Optional[Dict[str, Any]] = None
 
     @property
     def raw(self) -> Optional[Dict[str, Any]]:
@@ -15,21 +21,40 @@ class Variables:
             return self._storage
         return None
 
+    def _get_deadlines(self) -> DeadlineHeap:
+        if self._deadlines is None:
+            self._deadlines = DeadlineHeap((key, expire_time) for key, (_, expire_time) in self._storage.items())
+        return self._deadlines
+
+    def _put(self, key, value, expire_time) -> None:
+        self._storage[key] = value, expire_time
+        if self._deadlines is not None:
+            self._deadlines.schedule(key, expire_time)
+        if self._live is not None:
+            self._live[key] = value
+
     @property
-    def values(self) -> Dict[str, Any]:
+    def view(self) -> Mapping[str, Any]:
+        """Живые переменные без копирования, только для чтения"""
         self.expire()
-        return {key: value[0] for key, value in self._storage.items()}
+        if self._live is None:
+            self._live = {key: value[0] for key, value in self._storage.items()}
+        return MappingProxyType(self._live)
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        return dict(self.view)
 
     def set(self, key, value, ttl=None) -> None:
         ttl = ttl if ttl is not None else self.DEFAULT_TTL
-        self._storage[key] = value, time.time() + ttl
+        self._put(key, value, time.time() + ttl)
 
     def update(self, key, value, ttl=None) -> None:
         _, expire_time = self._storage.get(key, (None, None))
         if not expire_time:
             ttl = ttl if ttl is not None else self.DEFAULT_TTL
             expire_time = ttl + time.time()
-        self._storage[key] = value, expire_time
+        self._put(key, value, expire_time)
 
     def get(self, key, default=None):
         value, expire_time = self._storage.get(key, (default, time.time() + self.DEFAULT_TTL))
@@ -38,13 +63,20 @@ class Variables:
         return value
 
     def expire(self) -> None:
-        for key in list(self._storage):
-            _, expire_time = self._storage[key]
-            if expire_time <= time.time():
-                self.delete(key)
+        for key in self._get_deadlines().pop_due(time.time()):
+            self.delete(key)
+
+    def next_expire_time(self) -> Optional[float]:
+        return self._get_deadlines().peek()
 
     def delete(self, key) -> None:
         del self._storage[key]
+        if self._deadlines is not None:
+            self._deadlines.discard(key)
+        if self._live is not None:
+            self._live.pop(key, None)
 
     def clear(self) -> None:
         self._storage.clear()
+        self._deadlines = None
+        self._live = None
@@ -1,12 +1,9 @@
 # coding: utf-8
-import asyncio
-
-import core.logging.logger_constants as log_const
-from core.logging.logger_utils import log
 from core.model.factory import build_factory
 from core.model.registered import Registered
 from core.monitoring.monitoring import monitoring
 from core.utils.rerunable import Rerunable
+from core.utils.tracing import tracer
 
 db_adapters = Registered()
 db_adapter_factory = build_factory(db_adapters)
@@ -84,6 +81,11 @@ class DBAdapter(Rerunable):
     def _handled_exception(self):
         return Exception
 
+    @property
+    def _expected_exception(self):
+        # отсутствие файла - ответ, а не сбой хранилища: вызывающий его обрабатывает (например, DillRepository.load)
+        return FileNotFoundError
+
     def _on_all_tries_fail(self):
         raise
 
@@ -106,43 +108,30 @@ class AsyncDBAdapter(DBAdapter):
     async def _path_exists(self, path):
         raise NotImplementedError
 
+    async def close(self):
+        pass
+
     async def path_exists(self, path):
         return await self._async_run(self._path_exists, path)
 
     @monitoring.got_histogram("save_time")
+    @tracer.traced("db_save")
     async def save(self, id, data):
         return await self._async_run(self._save, id, data)
 
     @monitoring.got_histogram("save_time")
+    @tracer.traced("db_replace_if_equals")
     async def replace_if_equals(self, id, sample, data):
         return await self._async_run(self._replace_if_equals, id, sample, data)
 
     @monitoring.got_histogram("get_time")
+    @tracer.traced("db_get")
     async def get(self, id):
         return await self._async_run(self._get, id)
 
     async def _async_run(self, action, *args, _try_count=None, **kwargs):
-        if _try_count is None:
-            _try_count = self.try_count
-        if _try_count <= 0:
-            await self._on_all_tries_fail()
-        _try_count = _try_count - 1
-        try:
-            result = await action(*args, **kwargs) if asyncio.iscoroutinefunction(action) \
-                else action(*args, **kwargs)
-        except self._handled_exception as e:
-            params = {
-                "class_name": str(self.__class__),
-                "exception": str(e),
-                "try_count": _try_count,
-                log_const.KEY_NAME: log_const.HANDLED_EXCEPTION_VALUE
-            }
-            log("%(class_name)s run failed with %(exception)s.\n Got %(try_count)s tries left.",
-                params=params,
-                level="ERROR")
-            self._on_prepare()
-            result = await self._async_run(action, *args, _try_count=_try_count, **kwargs)
-            counter_name = self._get_counter_name()
-            if counter_name:
-                monitoring.got_counter(f"{counter_name}_exception")
-        return result
+        return await self.retry_policy.async_run(
+            action, *args, handled=self._handled_exception, on_retry=self._on_retry,
+            on_all_tries_fail=self._on_all_tries_fail, try_count=self.try_count if _try_count is None else _try_count,
+            expected=self._expected_exception, **kwargs
+        )
@@ -85,5 +85,5 @@ class IgniteAdapter(AsyncDBAdapter):
     async def _on_prepare(self):
         self._client = None
 
-    async def _get_counter_name(self):
+    def _get_counter_name(self):
         return "ignite_async_adapter"
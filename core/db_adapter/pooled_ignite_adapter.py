@@ -0,0 +1,205 @@
+# coding: utf-8
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional
+
+import pyignite
+from pyignite import AioClient
+
+import core.logging.logger_constants as log_const
+from core.db_adapter.ignite_adapter import IgniteAdapter
+from core.logging.logger_utils import log
+from core.monitoring.monitoring import monitoring
+
+
+class IgniteConnection:
+    """
+    Клиент пула: после ошибки считается нездоровым и переподключается не раньше next_attempt.
+    reconnection - идущее переподключение, его ждут все вызывающие, второй клиент для слота не создается.
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Optional[AioClient] = None
+        self.cache = None
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.reconnection: Optional[asyncio.Future] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.cache is not None
+
+
+class PooledIgniteAdapter(IgniteAdapter):
+    """
+    Ignite-адаптер с пулом из pool_size клиентов. Клиенты создаются с partition_aware=True: запрос по ключу
+    идет сразу на primary-узел его партиции. Параметры config кроме параметров IgniteAdapter:
+        pool_size - количество клиентов (4)
+        batch_get - объединять get, пришедшие в одной итерации event loop, в один get_all (True)
+    Паузы перед повторами и переподключением упавшего клиента задаются в config["retry"] (см. RetryPolicy).
+    """
+    POOL_SIZE = 4
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._init_params = {"partition_aware": True, **self._init_params}
+        self.pool_size = config.get("pool_size", self.POOL_SIZE)
+        self.batch_get = config.get("batch_get", True)
+        self._connections = [IgniteConnection(index) for index in range(self.pool_size)]
+        self._round_robin = itertools.cycle(self._connections)
+        self._pending_gets: Dict[Any, List[asyncio.Future]] = {}
+
+    async def connect(self):
+        results = await asyncio.gather(*(self._connect_one(connection) for connection in self._connections),
+                                       return_exceptions=True)
+        if not any(connection.healthy for connection in self._connections):
+            raise next(result for result in results if isinstance(result, BaseException))
+        logger_args = {
+            log_const.KEY_NAME: log_const.IGNITE_VALUE,
+            "pyignite_addresses": str(self._url),
+            "pool_size": sum(connection.healthy for connection in self._connections)
+        }
+        log("PooledIgniteAdapter with %(pool_size)s clients to servers %(pyignite_addresses)s created",
+            params=logger_args, level="WARNING")
+
+    async def _connect_one(self, connection: IgniteConnection):
+        try:
+            # клиент сразу в слоте: при ошибке подключения _mark_failed его закроет
+            connection.client = pyignite.aio_client.AioClient(**self._init_params)
+            await connection.client.connect(self._url)
+            connection.cache = await connection.client.get_or_create_cache(self._cache_name)
+            connection.failures = 0
+        except Exception:
+            self._mark_failed(connection)
+            log("PooledIgniteAdapter connect error",
+                params={log_const.KEY_NAME: log_const.HANDLED_EXCEPTION_VALUE},
+                level="ERROR",
+                exc_info=True)
+            monitoring.got_counter("ignite_connection_exception")
+            raise
+
+    def _mark_failed(self, connection: IgniteConnection):
+        loop = asyncio.get_event_loop()
+        connection.cache = None
+        connection.next_attempt = loop.time() + self.retry_policy.delay(connection.failures)
+        connection.failures += 1
+        client, connection.client = connection.client, None
+        if client is not None:
+            asyncio.ensure_future(self._close_client(client))
+
+    @staticmethod
+    async def _close_client(client: AioClient):
+        try:
+            await client.close()
+        except Exception:
+            pass
+
+    def _reconnect(self, connection: IgniteConnection) -> asyncio.Future:
+        """Переподключение слота; если оно уже идет - то же самое. Результат - исключение подключения или None"""
+        if connection.reconnection is None or connection.reconnection.done():
+            log("Attempt to recreate ignite client %(index)s", params={"index": connection.index}, level="WARNING")
+            monitoring.got_counter("ignite_reconnection")
+            connection.reconnection = asyncio.ensure_future(self._reconnect_one(connection))
+        return connection.reconnection
+
+    async def _reconnect_one(self, connection: IgniteConnection) -> Optional[Exception]:
+        try:
+            await self._connect_one(connection)
+        except Exception as error:
+            return error
+        return None
+
+    async def _acquire(self) -> IgniteConnection:
+        """
+        Следующий здоровый клиент. Нездоровые клиенты, чья пауза закончилась, переподключаются в фоне;
+        если здоровых нет - ждем переподключения того, чья пауза закончится раньше.
+        """
+        now = asyncio.get_event_loop().time()
+        for _ in range(self.pool_size):
+            connection = next(self._round_robin)
+            if connection.healthy:
+                return connection
+            if connection.next_attempt <= now:
+                self._reconnect(connection)
+        connection = min(self._connections, key=lambda item: item.next_attempt)
+        delay = connection.next_attempt - asyncio.get_event_loop().time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if not connection.healthy:
+            error = await self._reconnect(connection)
+            if error is not None:
+                raise error
+        return connection
+
+    async def _call(self, method: str, *args):
+        connection = await self._acquire()
+        try:
+            return await getattr(connection.cache, method)(*args)
+        except self._handled_exception:
+            self._mark_failed(connection)
+            raise
+
+    async def _on_prepare(self):
+        pass
+
+    async def close(self):
+        for connection in self._connections:
+            if connection.reconnection is not None and not connection.reconnection.done():
+                connection.reconnection.cancel()
+            if connection.client is not None:
+                await self._close_client(connection.client)
+            connection.client = connection.cache = None
+
+    async def _save(self, id, data):
+        return await self._call("put", id, data)
+
+    async def _replace_if_equals(self, id, sample, data):
+        return await self._call("replace_if_equals", id, sample, data)
+
+    async def _get(self, id):
+        if not self.batch_get:
+            return await self._call("get", id)
+        future = asyncio.get_event_loop().create_future()
+        if not self._pending_gets:
+            asyncio.get_event_loop().call_soon(self._flush_gets)
+        self._pending_gets.setdefault(id, []).append(future)
+        return await future
+
+    def _flush_gets(self):
+        pending, self._pending_gets = self._pending_gets, {}
+        asyncio.ensure_future(self._get_pending(pending))
+
+    async def _get_pending(self, pending: Dict[Any, List[asyncio.Future]]):
+        try:
+            if len(pending) == 1:
+                id = next(iter(pending))
+                values = {id: await self._call("get", id)}
+            else:
+                values = await self._call("get_all", list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(values.get(id))
+
+    async def _get_all(self, ids: List) -> Dict:
+        return await self._call("get_all", list(ids))
+
+    async def _put_all(self, items: Dict) -> None:
+        return await self._call("put_all", items)
+
+    async def get_all(self, ids: List) -> Dict:
+        """Значения по списку ключей за один запрос; отсутствующих ключей нет в результате"""
+        return await self._async_run(self._get_all, ids)
+
+    async def put_all(self, items: Dict) -> None:
+        await self._async_run(self._put_all, items)
+
+    def _get_counter_name(self):
+        return "ignite_pool_adapter"
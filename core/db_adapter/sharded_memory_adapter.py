@@ -0,0 +1,224 @@
+# coding: utf-8
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+import core.logging.logger_constants as log_const
+from core.db_adapter import error
+from core.db_adapter.db_adapter import AsyncDBAdapter
+from core.logging.logger_utils import log
+
+
+# память на запись сверх ключа и значения: список [data, expires_at, size], float и int в нем,
+# узел OrderedDict и место в множестве слота колеса таймеров (измерено tracemalloc на CPython 3.9)
+ENTRY_OVERHEAD = 280
+
+
+def entry_size(key, data) -> int:
+    """
+    Память, занимаемая записью: ключ и значение (для str и bytes - точно, для остальных - без вложенных объектов)
+    и ENTRY_OVERHEAD
+    """
+    return sys.getsizeof(key) + sys.getsizeof(data) + ENTRY_OVERHEAD
+
+
+class MemoryShard:
+    """
+    Часть хранилища со своей блокировкой. Записи хранятся в порядке использования (LRU) и вытесняются
+    при превышении max_bytes. Время жизни отслеживает колесо таймеров: записи раскладываются по слотам
+    шириной resolution секунд, истекшие слоты очищаются при следующих операциях с шардом.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, resolution: float, timer=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.resolution = resolution
+        self.timer = timer
+        self.lock = threading.Lock()
+        self.bytes = 0
+        # key -> [data, expires_at, size]
+        self.data: "OrderedDict[Any, list]" = OrderedDict()
+        self.wheel: Dict[int, Set] = {}
+        self._last_slot = self._slot(timer())
+
+    def _slot(self, moment: float) -> int:
+        return int(moment // self.resolution)
+
+    def _remove(self, key) -> None:
+        entry = self.data.pop(key)
+        self.bytes -= entry[2]
+        # ключ убирается и из своего слота колеса, чтобы слоты не держали ключи перезаписанных и вытесненных записей
+        slot = self._slot(entry[1])
+        keys = self.wheel.get(slot)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.wheel[slot]
+
+    def _expire(self, now: float) -> None:
+        slot = self._slot(now)
+        # слот now еще не закончился; пустые слоты между операциями пропускаются
+        if slot <= self._last_slot or not self.wheel:
+            self._last_slot = max(slot, self._last_slot)
+            return
+        for expired_slot in [item for item in self.wheel if item < slot]:
+            for key in self.wheel.pop(expired_slot):
+                entry = self.data.get(key)
+                if entry is not None and entry[1] <= now:
+                    self._remove(key)
+        self._last_slot = slot
+
+    def _get_entry(self, key, now: float) -> Optional[list]:
+        entry = self.data.get(key)
+        if entry is not None and entry[1] <= now:
+            self._remove(key)
+            entry = None
+        return entry
+
+    def _put(self, key, data, now: float, ttl: Optional[float] = None) -> None:
+        size = entry_size(key, data)
+        if key in self.data:
+            self._remove(key)
+        if size > self.max_bytes:
+            log("MemoryShard: value for %(key)s of %(size)s bytes is larger than the shard",
+                params={log_const.KEY_NAME: "memory_adapter_too_large", "key": str(key), "size": size},
+                level="WARNING")
+            return
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        self.data[key] = [data, expires_at, size]
+        self.wheel.setdefault(self._slot(expires_at), set()).add(key)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self.data)))
+
+    def get(self, key):
+        with self.lock:
+            now = self.timer()
+            self._expire(now)
+            entry = self._get_entry(key, now)
+            if entry is None:
+                return None
+            self.data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, data) -> None:
+        with self.lock:
+            now = self.timer()
+            self._expire(now)
+            self._put(key, data, now)
+
+    def replace_if_equals(self, key, sample, data) -> bool:
+        with self.lock:
+            now = self.timer()
+            self._expire(now)
+            entry = self._get_entry(key, now)
+            if (entry[0] if entry is not None else None) != sample:
+                return False
+            self._put(key, data, now)
+            return True
+
+    def items(self):
+        """(key, data, оставшееся время жизни) неистекших записей"""
+        with self.lock:
+            now = self.timer()
+            return [(key, entry[0], entry[1] - now) for key, entry in self.data.items() if entry[1] > now]
+
+
+class ShardedMemoryAdapter(AsyncDBAdapter):
+    """
+    Хранилище в памяти процесса, разбитое на shards частей со своими блокировками (можно использовать из
+    нескольких потоков). Параметры config:
+        max_bytes - память под записи (ключи, значения и служебные структуры) на все шарды (250 Мб)
+        ttl - время жизни записи в секундах (12 часов)
+        shards - количество шардов (16)
+        wheel_resolution - точность удаления истекших записей в секундах (60)
+        snapshot_path - файл, в который данные сохраняются при close() и загружаются при connect()
+    """
+    IS_ASYNC = True
+    MEM_CACHE_SIZE = 250 * 1024 * 1024
+    TTL = 12 * 60 * 60
+    SHARDS = 16
+    WHEEL_RESOLUTION = 60
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.max_bytes = self.config.get("max_bytes", self.MEM_CACHE_SIZE)
+        self.ttl = self.config.get("ttl", self.TTL)
+        self.snapshot_path = self.config.get("snapshot_path")
+        shards_count = self.config.get("shards", self.SHARDS)
+        resolution = self.config.get("wheel_resolution", self.WHEEL_RESOLUTION)
+        self.shards = [MemoryShard(self.max_bytes // shards_count, self.ttl, resolution)
+                       for _ in range(shards_count)]
+
+    def _shard(self, id) -> MemoryShard:
+        return self.shards[hash(id) % len(self.shards)]
+
+    @property
+    def bytes(self) -> int:
+        return sum(shard.bytes for shard in self.shards)
+
+    async def _glob(self, path, pattern):
+        raise error.NotSupportedOperation
+
+    async def _path_exists(self, path):
+        raise error.NotSupportedOperation
+
+    async def _on_prepare(self):
+        pass
+
+    async def connect(self):
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load_snapshot(self.snapshot_path)
+
+    async def close(self):
+        if self.snapshot_path:
+            self.save_snapshot(self.snapshot_path)
+
+    async def _open(self, filename, *args, **kwargs):
+        pass
+
+    async def _save(self, id, data):
+        self._shard(id).put(id, data)
+
+    async def _replace_if_equals(self, id, sample, data):
+        return self._shard(id).replace_if_equals(id, sample, data)
+
+    async def _get(self, id):
+        return self._shard(id).get(id)
+
+    async def _list_dir(self, path):
+        pass
+
+    def save_snapshot(self, path: str) -> None:
+        # shard.timer монотонный и не переживает перезапуск процесса, поэтому в снимок пишется
+        # абсолютное время истечения по wall-clock: простой между save и load тоже засчитывается
+        now = time.time()
+        items = [(id, data, now + ttl) for shard in self.shards for id, data, ttl in shard.items()]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(items, file)
+        os.replace(tmp_path, path)
+        log("ShardedMemoryAdapter saved %(count)s records to %(path)s",
+            params={log_const.KEY_NAME: "memory_adapter_snapshot", "count": len(items), "path": path},
+            level="WARNING")
+
+    def load_snapshot(self, path: str) -> None:
+        with open(path, "rb") as file:
+            items = pickle.load(file)
+        now = time.time()
+        count = 0
+        for id, data, expires_at in items:
+            ttl = expires_at - now
+            if ttl <= 0:
+                continue
+            shard = self._shard(id)
+            with shard.lock:
+                shard._put(id, data, shard.timer(), ttl)
+            count += 1
+        log("ShardedMemoryAdapter loaded %(count)s records from %(path)s",
+            params={log_const.KEY_NAME: "memory_adapter_snapshot", "count": count, "path": path},
+            level="WARNING")
@@ -1,11 +1,18 @@
 # coding: utf-8
-from typing import Dict, Callable, Any
+import asyncio
+from concurrent.futures import Executor
+from typing import Dict, Callable, Any, Optional
 
+import core.logging.logger_constants as log_const
 from core.descriptions.descriptions_items import DescriptionsItems
+from core.descriptions.smart_updatable_descriptions_items import SmartUpdatableDescriptionsItems
+from core.logging.logger_utils import log
 from core.model.registered import Registered
 from core.repositories.base_repository import BaseRepository
 
 registered_description_factories = Registered()
+# вызываются без аргументов после сборки и после перезагрузки описаний
+registered_descriptions_loaded_hooks = Registered()
 
 
 def default_description_factory(x):
@@ -24,7 +31,40 @@ class Descriptions:
             factory: Callable = registered_description_factories.get(key, default_description_factory)
             description_item = factory(repository.data)
             self._descriptions[key] = description_item
+            self._on_loaded()
         return description_item
 
+    @staticmethod
+    def _on_loaded() -> None:
+        for hook in registered_descriptions_loaded_hooks.values():
+            hook()
+
     def __setitem__(self, key: str, description_item: DescriptionsItems) -> None:
         self._descriptions[key] = description_item
+
+    async def reload(self, executor: Optional[Executor] = None) -> Dict[str, frozenset]:
+        """
+        Перечитывает изменившиеся репозитории и обновляет только изменившиеся описания.
+        Чтение файлов и сборка описаний выполняются в executor, подмена версии - в event loop.
+        :return: ключи описаний и id пересозданных в них элементов
+        """
+        loop = asyncio.get_event_loop()
+        result = {}
+        for key, description_item in list(self._descriptions.items()):
+            if not isinstance(description_item, SmartUpdatableDescriptionsItems):
+                continue
+            repository = self.registered_repositories.get(key)
+            if not getattr(repository, "is_outdated", False):
+                continue
+            await loop.run_in_executor(executor, repository.load)
+            changed = await description_item.update_data_async(repository.data, executor)
+            result[key] = changed
+            log("Descriptions.reload: %(descriptions_key)s reloaded, %(changed_count)s items changed",
+                params={log_const.KEY_NAME: "descriptions_reload",
+                        "descriptions_key": key,
+                        "changed_count": len(changed),
+                        "changed": sorted(changed)},
+                level="WARNING")
+        if result:
+            self._on_loaded()
+        return result
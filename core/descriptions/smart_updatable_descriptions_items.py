@@ -1,16 +1,71 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, Any, NamedTuple, Optional
+from concurrent.futures import Executor
+
 from core.descriptions.descriptions_items import DescriptionsItems
 
 
+class DescriptionsUpdate(NamedTuple):
+    raw_items: Dict[str, Any]
+    items: Dict[str, Any]
+    hashes: Dict[str, str]
+    changed: frozenset
+
+
 class SmartUpdatableDescriptionsItems(DescriptionsItems):
+    """
+    Описания с инкрементальным обновлением: при update_data пересоздаются только элементы,
+    у которых изменились версия или содержимое (хэш сырого описания), остальные переиспользуются.
+    Новая версия собирается отдельно от текущей и подменяется целиком.
+    """
+
+    def __init__(self, factory, items, ordered=False):
+        # хэши текущей версии считаются лениво - при первом обновлении
+        self._hashes: Optional[Dict[str, str]] = None
+        super().__init__(factory, items, ordered)
+
+    @staticmethod
+    def item_hash(raw_item) -> str:
+        dump = json.dumps(raw_item, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(dump.encode()).hexdigest()
+
+    def _is_changed(self, item_id, raw_item, item_hash):
+        if raw_item.get("force_update"):
+            return True
+        existed_item = self._items.get(item_id)
+        if existed_item is not None and existed_item.version != raw_item.get("version", -1):
+            return True
+        return self._hashes.get(item_id) != item_hash
+
+    def prepare_update(self, items) -> DescriptionsUpdate:
+        """Builds changed items without touching the current version, safe to call outside the event loop"""
+        if self._hashes is None:
+            self._hashes = {item_id: self.item_hash(raw_item) for item_id, raw_item in self._raw_items.items()}
+        hashes = {}
+        new_items = {}
+        changed = set()
+        for item_id, raw_item in items.items():
+            item_hash = self.item_hash(raw_item)
+            hashes[item_id] = item_hash
+            if self._is_changed(item_id, raw_item, item_hash):
+                changed.add(item_id)
+                new_items[item_id] = self._factory(id=item_id, items=raw_item)
+            elif item_id in self._items:
+                new_items[item_id] = self._items[item_id]
+        changed.update(set(self._raw_items) - set(items))
+        return DescriptionsUpdate(items, new_items, hashes, frozenset(changed))
+
+    def apply_update(self, update: DescriptionsUpdate):
+        self._raw_items, self._items, self._hashes = update.raw_items, update.items, update.hashes
 
     def update_data(self, items):
-        for item_id in items.keys():
-            existed_item = self._items.get(item_id)
-            if existed_item:
-                if existed_item.version != items[item_id].get("version", -1) or \
-                        items[item_id].get("force_update"):
-                    del self._items[item_id]
-        redundant = set(self._items.keys()) - set(items.keys())
-        for key in redundant:
-            del self._items[key]
-        self._raw_items = items
+        self.apply_update(self.prepare_update(items))
+
+    async def update_data_async(self, items, executor: Optional[Executor] = None) -> frozenset:
+        """Rebuilds changed items in executor and swaps in the new version on the event loop"""
+        loop = asyncio.get_event_loop()
+        update = await loop.run_in_executor(executor, self.prepare_update, items)
+        self.apply_update(update)
+        return update.changed
@@ -3,6 +3,7 @@ from datetime import datetime
 from pythonjsonlogger import jsonlogger
 from core.model.factory import build_factory
 from core.model.registered import Registered
+from core.utils import json_codec
 
 loggers_formatter = Registered()
 
@@ -14,6 +15,10 @@ class BaseJsonFormatter(jsonlogger.JsonFormatter):
     DEV_TEAM = "NA"
     APPLICATION_NAME = "NA"
 
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("json_serializer", json_codec.dumps)
+        super().__init__(*args, **kwargs)
+
     def add_fields(self, log_record, record, message_dict):
         super(BaseJsonFormatter, self).add_fields(log_record, record, message_dict)
         dt = datetime.fromtimestamp(record.created)
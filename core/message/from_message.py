@@ -10,6 +10,7 @@ from core.names import field
 import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.utils.masking_message import masking
+from core.utils import json_codec
 from core.utils.utils import current_time_ms
 from core.message.msg_validator import MessageValidator
 
@@ -248,7 +249,7 @@ class SmartAppFromMessage:
     @property
     def masked_value(self) -> str:
         masked_data = masking(self.as_dict, self.masking_fields)
-        return json.dumps(masked_data, ensure_ascii=False)
+        return json_codec.dumps(masked_data, ensure_ascii=False)
 
     @property
     def message_name(self) -> str:
@@ -269,7 +270,7 @@ class SmartAppFromMessage:
 
     @property
     def as_str(self) -> str:
-        return json.dumps(self._value, ensure_ascii=False)
+        return json_codec.dumps(self._value, ensure_ascii=False)
 
 
 basic_error_message = SmartAppFromMessage(
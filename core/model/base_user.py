@@ -1,7 +1,7 @@
 # coding: utf-8
-import json
+import time
 from functools import cached_property
-from typing import List
+from typing import Dict, List, Tuple
 
 from core.descriptions.descriptions import Descriptions
 from core.model.queued_objects.limited_queued_hashable_objects_description import \
@@ -9,8 +9,10 @@ from core.model.queued_objects.limited_queued_hashable_objects_description impor
 from core.model.queued_objects.limited_queued_hashable_objects import LimitedQueuedHashableObjects, \
     LimitedQueuedHashableObjectsItems
 from core.logging.logger_utils import log
-from core.model.field import Field
+from core.model.expiry_index import ExpiryIndex
+from core.model.field import Field, UserDescription
 from core.model.model import Model
+from core.utils import json_codec
 from core.basic_models.parametrizers.parametrizer import BasicParametrizer
 from core.basic_models.counter.counters import Counters
 from core.basic_models.variables.variables import Variables
@@ -44,22 +46,28 @@ class BaseUser(Model):
     def parametrizer(self):
         return BasicParametrizer(self, {})
 
+    FIELDS: List[Field] = [
+        Field("counters", Counters),
+        Field("last_action_ids", LimitedQueuedHashableObjectsItems, UserDescription("last_action_ids")),
+        Field("last_messages_ids", LimitedQueuedHashableObjects, LimitedQueuedHashableObjectsDescription(None)),
+        Field("local_vars", Variables, None, False, lazy=False),
+        Field("variables", Variables),
+        Field("private_vars", Variables),
+        Field("message_vars", Variables, None, False, lazy=False),
+        Field("expiry_index", ExpiryIndex, lazy=False),
+    ]
+    # поля с expire в порядке вызова и поля, после изменения которых expire нужен и зависимому полю
+    EXPIRABLE_FIELDS: List[str] = ["counters", "variables", "private_vars", "local_vars", "message_vars"]
+    EXPIRY_DEPENDENCIES: Dict[str, Tuple[str, ...]] = {}
+
     @property
     def fields(self) -> List[Field]:
-        return [
-            Field("counters", Counters),
-            Field("last_action_ids", LimitedQueuedHashableObjectsItems, self.descriptions["last_action_ids"]),
-            Field("last_messages_ids", LimitedQueuedHashableObjects, LimitedQueuedHashableObjectsDescription(None)),
-            Field("local_vars", Variables, None, False),
-            Field("variables", Variables),
-            Field("private_vars", Variables),
-            Field("message_vars", Variables, None, False),
-        ]
+        return self.FIELDS
 
     @property
     def raw_str(self):
         # Attention: non-serializable objects will become str with error message
-        raw = json.dumps(self.raw, default=lambda o: f"<non-serializable: {type(o).__qualname__}>")
+        raw = json_codec.dumps(self.raw, default=lambda o: f"<non-serializable: {type(o).__qualname__}>")
         log("%(class_name)s.raw USER %(uid)s SAVE db_version = %(db_version)s. "
             "Saving User %(uid)s. Serialized utf8 json length is %(user_length)s symbols.", self,
             {"db_version": str(self.private_vars.get(self.USER_DB_VERSION)),
@@ -68,8 +76,13 @@ class BaseUser(Model):
         return raw
 
     def expire(self):
-        self.counters.expire()
-        self.variables.expire()
-        self.private_vars.expire()
-        self.local_vars.expire()
-        self.message_vars.expire()
+        """Вызывает expire полей, к которым обращались, и полей, срок которых по expiry_index наступил"""
+        expired = set()
+        for name in self.EXPIRABLE_FIELDS:
+            if self._need_expire(name, expired):
+                self.get_field(name).expire()
+                expired.add(name)
+
+    def _need_expire(self, name, expired) -> bool:
+        return self.is_materialized(name) or self.expiry_index.is_due(name, time.time()) or \
+            any(dependency in expired for dependency in self.EXPIRY_DEPENDENCIES.get(name, ()))
@@ -0,0 +1,42 @@
+# coding: utf-8
+import heapq
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ExpiryIndex:
+    """
+    Ближайший срок истечения каждой подсистемы пользователя (counters, variables, forms...), min-heap по сроку.
+    Хранится вместе с пользователем и пересчитывается при сохранении для подсистем, к которым обращались.
+    Подсистема без записи в индексе считается просроченной, None - в подсистеме нечему истекать.
+    """
+
+    def __init__(self, items: Optional[Dict[str, Any]], user):
+        items = items or {}
+        self._user = user
+        self._deadlines: Dict[str, Optional[float]] = {name: None for name in items.get("never", [])}
+        self._heap: List[Tuple[float, str]] = []
+        for deadline, name in items.get("heap", []):
+            self._deadlines[name] = deadline
+            self._heap.append((deadline, name))
+        heapq.heapify(self._heap)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._deadlines
+
+    def is_due(self, name: str, now: float) -> bool:
+        if name not in self._deadlines:
+            return True
+        if not self._heap or self._heap[0][0] > now:
+            return False
+        deadline = self._deadlines[name]
+        return deadline is not None and deadline <= now
+
+    @property
+    def raw(self) -> Dict[str, List]:
+        user = self._user
+        for name in user.EXPIRABLE_FIELDS:
+            if any(user.is_materialized(field) for field in (name, *user.EXPIRY_DEPENDENCIES.get(name, ()))):
+                self._deadlines[name] = user.get_field(name).next_expire_time()
+        self._heap = sorted((deadline, name) for name, deadline in self._deadlines.items() if deadline is not None)
+        never = sorted(name for name, deadline in self._deadlines.items() if deadline is None)
+        return {"heap": [list(item) for item in self._heap], "never": never}
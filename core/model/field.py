@@ -1,9 +1,33 @@
 # coding: utf-8
 
 
+class UserDescription:
+    """Описание поля из user.descriptions[key]: берется при создании модели поля, а не при описании полей класса"""
+
+    def __init__(self, key):
+        self.key = key
+
+    def resolve(self, user):
+        return user.descriptions[self.key]
+
+
 class Field:
-    def __init__(self, name, model, description=None, *args):
+    """
+    Поле модели. lazy - модель поля создается при первом обращении, а пока к полю не обращались,
+    в raw отдается исходный фрагмент values без изменений.
+    """
+
+    def __init__(self, name, model, description=None, *args, lazy=True):
         self.name = name
         self.model = model
         self.description = description
         self.args = args
+        self.lazy = lazy
+
+    def create(self, value, user):
+        description = self.description
+        if isinstance(description, UserDescription):
+            description = description.resolve(user)
+        if description is not None:
+            return self.model(value, description, user, *self.args)
+        return self.model(value, user, *self.args)
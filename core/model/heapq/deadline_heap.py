@@ -0,0 +1,55 @@
+import heapq
+import itertools
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class DeadlineHeap:
+    """
+    Сроки по ключам на min-heap. У ключа действует только последний назначенный срок:
+    устаревшие записи кучи пропускаются при чтении и вычищаются, когда их становится больше действующих.
+    """
+    COMPACT_MIN_SIZE = 32
+
+    def __init__(self, deadlines: Iterable[Tuple[Hashable, Optional[float]]] = ()):
+        self._deadlines: Dict[Hashable, float] = {key: deadline for key, deadline in deadlines if deadline is not None}
+        self._counter = itertools.count()
+        self._heap = [(deadline, next(self._counter), key) for key, deadline in self._deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def _is_actual(self, entry) -> bool:
+        deadline, _, key = entry
+        return self._deadlines.get(key) == deadline
+
+    def schedule(self, key: Hashable, deadline: Optional[float]) -> None:
+        if deadline is None:
+            self.discard(key)
+            return
+        if self._deadlines.get(key) == deadline:
+            return
+        self._deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), key))
+        if len(self._heap) > max(self.COMPACT_MIN_SIZE, 2 * len(self._deadlines)):
+            self._heap = [entry for entry in self._heap if self._is_actual(entry)]
+            heapq.heapify(self._heap)
+
+    def discard(self, key: Hashable) -> None:
+        self._deadlines.pop(key, None)
+
+    def peek(self) -> Optional[float]:
+        """Ближайший действующий срок"""
+        while self._heap and not self._is_actual(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Hashable]:
+        """Ключи со сроком <= now; их сроки снимаются"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_actual(entry):
+                del self._deadlines[entry[2]]
+                due.append(entry[2])
+        return due
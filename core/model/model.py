@@ -9,16 +9,34 @@ class Model:
 
     def __init__(self, values, user):
         values = values or {}
+        self._lazy_user = user
+        self._lazy_values: Dict[str, Any] = {}
+        self._lazy_fields = {}
 
         for field in self.fields:
             value = values.get(field.name)
-            description = field.description
-            args = field.args
-            if description is not None:
-                obj = field.model(value, description, user, *args)
+            if field.lazy:
+                self._lazy_fields[field.name] = field
+                self._lazy_values[field.name] = value
             else:
-                obj = field.model(value, user, *args)
-            setattr(self, field.name, obj)
+                setattr(self, field.name, field.create(value, user))
+
+    def __getattr__(self, name):
+        # вызывается, только если атрибута еще нет: создаем модель ленивого поля
+        lazy_fields = self.__dict__.get("_lazy_fields")
+        field = lazy_fields.pop(name, None) if lazy_fields else None
+        if field is None:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+        obj = field.create(self._lazy_values.pop(name), self._lazy_user)
+        setattr(self, name, obj)
+        return obj
+
+    def is_materialized(self, name) -> bool:
+        return name in self.__dict__
+
+    def get_lazy_raw(self, name):
+        """Исходный фрагмент values поля, модель которого еще не создана"""
+        return self._lazy_values.get(name)
 
     def get_field(self, name):
         return getattr(self, name)
@@ -27,8 +45,13 @@ class Model:
     def raw(self) -> Dict[str, Any]:
         result = {}
         for field in self.fields:
-            value = getattr(self, field.name)
-            raw = value.raw
+            name = field.name
+            if name in self.__dict__:
+                raw = self.__dict__[name].raw
+            elif name in self._lazy_values:
+                raw = self._lazy_values[name]
+            else:
+                raw = getattr(self, name).raw
             if raw is not None:
-                result[field.name] = raw
+                result[name] = raw
         return result
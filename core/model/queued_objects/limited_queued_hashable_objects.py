@@ -1,27 +1,67 @@
 # coding: utf-8
-from collections import deque
+import hashlib
+from collections import Counter, deque
 
 from core.model.lazy_items import LazyItems
 
 
 class LimitedQueuedHashableObjects:
+    """
+    Последние description.max_len объектов в порядке добавления. Рядом с очередью хранится счетчик вхождений,
+    поэтому check не обходит очередь.
+    При description.fingerprint_size вместо объектов хранятся их отпечатки - первые fingerprint_size байт
+    blake2b от repr объекта в виде строки FINGERPRINT_PREFIX + hex; get_list и raw тогда возвращают отпечатки,
+    и сравнивать их с объектами нужно через key.
+    """
+    FINGERPRINT_PREFIX = "#"
+
     def __init__(self, items, description, user=None):
         self.description = description
-        self.queue = deque(items or [], maxlen=description.max_len)
+        self.fingerprint_size = description.fingerprint_size
+        self.queue = deque(maxlen=description.max_len)
+        self._counts = Counter()
+        for id in items or []:
+            self._append(id if self._is_fingerprint(id) else self.key(id))
+
+    def _is_fingerprint(self, value):
+        return self.fingerprint_size is not None and isinstance(value, str) and \
+            value.startswith(self.FINGERPRINT_PREFIX) and \
+            len(value) == len(self.FINGERPRINT_PREFIX) + 2 * self.fingerprint_size
+
+    def key(self, id):
+        """Значение, под которым id хранится в очереди: сам id или его отпечаток"""
+        if self.fingerprint_size is None:
+            return id
+        digest = hashlib.blake2b(repr(id).encode(), digest_size=self.fingerprint_size).hexdigest()
+        return self.FINGERPRINT_PREFIX + digest
+
+    def _append(self, key):
+        if self.queue.maxlen == 0:
+            return
+        # maxlen None - очередь без ограничения
+        if self.queue.maxlen is not None and len(self.queue) == self.queue.maxlen:
+            evicted = self.queue.popleft()
+            self._counts[evicted] -= 1
+            if not self._counts[evicted]:
+                del self._counts[evicted]
+        self.queue.append(key)
+        self._counts[key] += 1
 
     def get_list(self):
         return list(self.queue)
 
     def add(self, id):
-        self.queue.append(id)
+        self._append(self.key(id))
 
     def clear(self):
         self.queue.clear()
+        self._counts.clear()
 
     def check(self, id):
-        duplicated = id in self.queue
+        key = self.key(id)
+        duplicated = key in self._counts
         if not duplicated:
-            self.add(id)
+            self._append(key)
         return duplicated
 
     @property
@@ -8,6 +8,8 @@ class LimitedQueuedHashableObjectsDescription:
         self.id = id
         self.items = items or {}
         self.max_len = self.items.get("max_len", self.DEFAULT_MAX_LEN)
+        # размер отпечатка в байтах: хранить отпечатки объектов вместо самих объектов
+        self.fingerprint_size = self.items.get("fingerprint_size")
 
 
 class LimitedQueuedHashableObjectsDescriptionsItems(DescriptionsItems):
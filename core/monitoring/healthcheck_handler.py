@@ -1,10 +1,13 @@
 import io
+import json
 import time
 from prometheus_client import CONTENT_TYPE_LATEST
 from prometheus_client.twisted import MetricsResource
 from twisted.web.resource import Resource
 from core.monitoring.twisted_server import TwistedServer
+from core.utils.bounded_cache import cache_registry
 from core.utils.memstats import get_meminfo, show_growth, show_most_common_types, get_leaking_objects
+from core.utils.profiling import profiler
 
 
 def add_headers(request, response_text):
@@ -14,16 +17,20 @@ def add_headers(request, response_text):
 
 class RootResource(Resource):
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, profiling=False):
         super(RootResource, self).__init__()
         self.putChild(b'health', HealthcheckResource())
-        self.putChild(b'metrics', MetricsResource())
+        self.putChild(b'metrics', AppMetricsResource())
+
+        if debug or profiling:
+            self.putChild(b'profiling', ProfilingResource())
 
         if debug:
             self.putChild(b'meminfo', MemInfoResource())
             self.putChild(b'objgrowth', ObjGrowthResource())
             self.putChild(b'objtypes', ObjTypesResource())
             self.putChild(b'objleak', ObjLeakResource())
+            self.putChild(b'caches', CachesResource())
 
     def getChild(self, name, request):
         if name:
@@ -45,6 +52,28 @@ class HealthcheckResource(Resource):
         return response.encode()
 
 
+class AppMetricsResource(Resource):
+    """Метрики prometheus; накопленные счетчики кэшей отправляются перед каждым сбором"""
+    isLeaf = True
+
+    def __init__(self):
+        super().__init__()
+        self._metrics = MetricsResource()
+
+    def render(self, request):
+        cache_registry.report_metrics()
+        return self._metrics.render(request)
+
+
+class CachesResource(Resource):
+    isLeaf = True
+
+    def render_GET(self, request):
+        response = json.dumps(cache_registry.stats())
+        add_headers(request, response)
+        return response.encode()
+
+
 class MemInfoResource(Resource):
     isLeaf = True
 
@@ -88,6 +117,44 @@ class ObjLeakResource(Resource):
         return response.encode()
 
 
+class ProfilingResource(Resource):
+    """
+    GET /profiling - состояние последней сессии
+    GET /profiling/start?duration=30&interval=0.01&memory=1 - запуск сессии
+    GET /profiling/stop - досрочная остановка сессии
+    """
+    isLeaf = True
+
+    @staticmethod
+    def _arg(request, name, default, cast):
+        values = request.args.get(name.encode())
+        return cast(values[0].decode()) if values else default
+
+    def render_GET(self, request):
+        action = request.postpath[0].decode() if request.postpath else ""
+        try:
+            if action == "start":
+                profiler.start_session(
+                    duration=self._arg(request, "duration", 30, float),
+                    interval=self._arg(request, "interval", 0.01, float),
+                    memory=self._arg(request, "memory", False, lambda value: value.lower() in ("1", "true")),
+                )
+            elif action == "stop":
+                profiler.stop_session()
+            elif action:
+                request.setResponseCode(404)
+        except ValueError as e:
+            request.setResponseCode(400)
+            response = json.dumps({"error": str(e)})
+        except RuntimeError as e:
+            request.setResponseCode(409)
+            response = json.dumps({"error": str(e)})
+        else:
+            response = json.dumps(profiler.status())
+        add_headers(request, response)
+        return response.encode()
+
+
 if __name__ == "__main__":
     t = TwistedServer(1111, "localhost", RootResource, debug=True)
     while 1:
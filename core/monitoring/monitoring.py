@@ -3,7 +3,7 @@ import re
 from core.logging.logger_constants import KEY_NAME
 from core.logging.logger_utils import log
 
-from prometheus_client import Counter, Histogram, REGISTRY
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
 
 
 def _filter_monitoring_msg(msg):
@@ -31,6 +31,7 @@ def silence_it(func):
 class Monitoring:
     COUNTER = "counter"
     HISTOGRAM = "histogram"
+    GAUGE = "gauge"
     DEFAULT_ENABLED = True
     DEFAULT_DISABLED_METRICS = []
 
@@ -40,7 +41,8 @@ class Monitoring:
         self.buckets = Histogram.DEFAULT_BUCKETS
         self._monitoring_items = {
             self.COUNTER: {},
-            self.HISTOGRAM: {}
+            self.HISTOGRAM: {},
+            self.GAUGE: {}
         }
         self._clean_registry()
 
@@ -74,6 +76,19 @@ class Monitoring:
         if counter:
             counter.inc()
 
+    def get_gauge(self, name, description=None, labels=()):
+        if not self.check_enabled(name):
+            return None
+        gauge = self._monitoring_items[self.GAUGE]
+        if not gauge.get(name):
+            gauge[name] = Gauge(name, description or name, labels)
+        return gauge[name]
+
+    def got_gauge(self, name, value, description=None):
+        gauge = self.get_gauge(name, description)
+        if gauge:
+            gauge.set(value)
+
     def got_histogram(self, name, description=None):
         def decor(func):
             def wrap(*args, **kwargs):
@@ -92,6 +107,14 @@ class Monitoring:
                 histogram[name] = Histogram(name, description or name, buckets=self.buckets)
             return histogram[name].time()
 
+    def get_histogram(self, name, description=None, labels=()):
+        if not self.check_enabled(name):
+            return None
+        histogram = self._monitoring_items[self.HISTOGRAM]
+        if not histogram.get(name):
+            histogram[name] = Histogram(name, description or name, labels, buckets=self.buckets)
+        return histogram[name]
+
     def got_histogram_observe(self, name, value, description=None):
         if self.check_enabled(name):
             histogram = self._monitoring_items[self.HISTOGRAM]
@@ -279,12 +302,49 @@ class Monitoring:
         monitoring_msg = "{}_mq_waiting_time".format(app_name)
         monitoring.got_histogram_observe(_filter_monitoring_msg(monitoring_msg), value)
 
+    @silence_it
+    def sampling_span_time(self, app_name, span_name, value):
+        monitoring_msg = _filter_monitoring_msg("{}_span_time".format(app_name))
+        histogram = self.get_histogram(monitoring_msg, "Duration of message processing stages", ["span"])
+        if histogram is None:
+            raise MetricDisabled('histogram disabled')
+        histogram.labels(span_name).observe(value)
+
     @silence_it
     def counter_mq_skip_waiting(self, app_name):
         monitoring_msg = "{}_mq_skip_waiting".format(app_name)
         c = self._get_or_create_counter(monitoring_msg, "(Now - creation_time) is greater than error threshold")
         c.inc()
 
+    @silence_it
+    def gauge_concurrency_limit(self, app_name, limit, in_flight):
+        monitoring_msg = _filter_monitoring_msg("{}_concurrency".format(app_name))
+        gauge = self.get_gauge(monitoring_msg, "Adaptive concurrency limit and in-flight messages", ["kind"])
+        if gauge is None:
+            raise MetricDisabled('gauge disabled')
+        gauge.labels("limit").set(limit)
+        gauge.labels("in_flight").set(in_flight)
+
+    @silence_it
+    def counter_cache_events(self, cache_name, event, value=1):
+        c = self._get_or_create_counter("cache_events", "Count of cache hits, misses, evictions and expirations",
+                                        ["cache", "event"])
+        c.labels(cache_name, event).inc(value)
+
+    @silence_it
+    def gauge_circuit_breaker(self, breaker_name, state):
+        gauge = self.get_gauge("circuit_breaker_state", "Circuit breaker state: 0 - closed, 1 - half-open, 2 - open",
+                               ["breaker"])
+        if gauge is None:
+            raise MetricDisabled('gauge disabled')
+        gauge.labels(breaker_name).set(state)
+
+    @silence_it
+    def counter_retry_events(self, policy_name, event):
+        c = self._get_or_create_counter("retry_events", "Count of retries, exhausted retry budgets and rejected calls",
+                                        ["policy", "event"])
+        c.labels(policy_name, event).inc()
+
     @silence_it
     def pod_event(self, app_name, event_type):
         monitoring_msg = "{}_pod_event".format(app_name)
@@ -5,11 +5,11 @@ import core.logging.logger_constants as log_const
 
 
 class TwistedServer:
-    def __init__(self, port, interface, handler, debug=False):
+    def __init__(self, port, interface, handler, debug=False, **handler_kwargs):
         log("TwistedServer.__init__ started.",
             params={log_const.KEY_NAME: log_const.TWISTED_SERVER},
             level="WARNING")
-        site = server.Site(handler(debug=debug))
+        site = server.Site(handler(debug=debug, **handler_kwargs))
         reactor.listenTCP(port, site, interface=interface or "")
         reactor.startRunning(False)
         log("TwistedServer.__init__ finished.",
@@ -74,3 +74,7 @@ class UpdatableFileRepository(FileRepository):
         if self._file_exist and self.expired:
             return self.source.mtime(self.filename) > self._last_mtime
         return False
+
+    @property
+    def is_outdated(self):
+        return self._is_outdated
@@ -1,3 +1,5 @@
+import time
+
 import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.repositories.shard_repository import ShardRepository
@@ -63,3 +65,54 @@ class FolderRepository(ShardRepository):
 
     def check_load_in_parts(self):
         return True
+
+
+class UpdatableFolderRepository(FolderRepository):
+    """
+    FolderRepository с отслеживанием изменений по mtime файлов.
+    При перезагрузке заново читаются только изменившиеся файлы, остальные берутся из кэша.
+    """
+
+    def __init__(self, *args, update_cooldown=5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._files_mtime = {}
+        self._files_data = {}
+        self._last_update_time = 0
+        self.update_cooldown = update_cooldown
+
+    def _form_file_upload_map(self, shard_desc):
+        filename_to_data = {}
+        files_mtime = {}
+        for shard in shard_desc:
+            mtime = self.source.mtime(shard)
+            if shard in self._files_data and self._files_mtime.get(shard) == mtime:
+                shard_data = self._files_data[shard]
+            else:
+                shard_data = self._load_item(shard)
+            files_mtime[shard] = mtime
+            if shard_data:
+                filename_to_data[shard] = shard_data
+        self._files_mtime = files_mtime
+        self._files_data = filename_to_data
+        return filename_to_data
+
+    def load(self):
+        super().load()
+        self._last_update_time = time.time()
+
+    @property
+    def expired(self):
+        return self._last_update_time + self.update_cooldown < time.time()
+
+    def check_load_in_parts(self):
+        return False
+
+    @property
+    def is_outdated(self):
+        if not self.expired:
+            return False
+        self._last_update_time = time.time()
+        shard_desc = self.source.list_dir(self.path)
+        if set(shard_desc) != set(self._files_mtime):
+            return True
+        return any(self.source.mtime(shard) != self._files_mtime[shard] for shard in shard_desc)
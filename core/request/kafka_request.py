@@ -33,8 +33,9 @@ class KafkaRequest(BaseRequest):
         headers = source_mq_message.headers() or []
         return headers
 
-    def send(self, data, publisher: KafkaPublisher, source_mq_message):
-        headers = self._get_new_headers(source_mq_message)
+    def send(self, data, publisher: KafkaPublisher, source_mq_message, headers=None):
+        if headers is None:
+            headers = self._get_new_headers(source_mq_message)
         if self.topic is not None:
             publisher.send_to_topic(data, source_mq_message.key(), self.topic, headers=headers)
         elif self.topic_key is not None:
@@ -49,7 +50,7 @@ class KafkaRequest(BaseRequest):
     def run(self, data, params):
         publishers = params["publishers"]
         publisher = publishers[self.kafka_key]
-        self.send(data=data, publisher=publisher, source_mq_message=params["mq_message"])
+        self.send(data=data, publisher=publisher, source_mq_message=params["mq_message"], headers=params.get("headers"))
 
     def __str__(self):
         if self.topic_key is not None:
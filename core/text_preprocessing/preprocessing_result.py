@@ -21,7 +21,7 @@ class TextPreprocessingResult(BaseTextPreprocessingResult):
                  "_period_token_values", "_org_token_values", "_time_date_interval_token_values",
                  "_relative_token_values", "_ccy_token_values", "_geo_token_values", "pipeline_results",
                  "_tokenized_string_stop_words", "_words_tokenized_stop_words", "_words_tokenized_set_stop_words",
-                 "model_ner", "dict_ner")
+                 "model_ner", "dict_ner", "_tokens_by_type", "_composite_tokens_by_type")
 
     @staticmethod
     def from_payload(payload: Dict):
@@ -60,6 +60,8 @@ class TextPreprocessingResult(BaseTextPreprocessingResult):
         self._tokenized_string_stop_words = None
         self._words_tokenized_stop_words = None
         self._words_tokenized_set_stop_words = None
+        self._tokens_by_type = None
+        self._composite_tokens_by_type = None
 
     @property
     def tokenized_elements_list_pymorphy(self):
@@ -160,21 +162,28 @@ class TextPreprocessingResult(BaseTextPreprocessingResult):
                 result[token.get(COMPOSITE_TOKEN_TYPE)].append(token.get(COMPOSITE_TOKEN_VALUE))
         return result
 
+    def _index_tokens(self):
+        # один проход по токенам сразу для всех типов: filler'ы одного сообщения спрашивают разные типы
+        tokens_by_type = defaultdict(list)
+        composite_tokens_by_type = defaultdict(list)
+        for token in self.__tokenized_elements_list:
+            for values_dicti in token.get(LIST_OF_TOKEN_TYPES_DATA, []):
+                tokens_by_type[values_dicti[TOKEN_TYPE]].append(values_dicti)
+            if token.get(IS_BEGINNING_OF_COMPOSITE):
+                composite_tokens_by_type[token.get(COMPOSITE_TOKEN_TYPE)].append(token.get(COMPOSITE_TOKEN_VALUE))
+        self._tokens_by_type = tokens_by_type
+        self._composite_tokens_by_type = composite_tokens_by_type
+
     def get_token_values_by_type(self, token_type):
-        final_list = []
-        for t in self.__tokenized_elements_list:
-            list_of_values = t.get(LIST_OF_TOKEN_TYPES_DATA, [])
-            for values_dicti in list_of_values:
-                if values_dicti[TOKEN_TYPE] == token_type:
-                    final_list.append(values_dicti.get(TOKEN_VALUE, {}).get(VALUE))
-        return final_list
+        if self._tokens_by_type is None:
+            self._index_tokens()
+        return [values_dicti.get(TOKEN_VALUE, {}).get(VALUE)
+                for values_dicti in self._tokens_by_type.get(token_type, [])]
 
     def get_composite_token_values_by_type(self, composite_token_type):
-        list_of_composite_token_values = []
-        for token in self.__tokenized_elements_list:
-            if token.get(COMPOSITE_TOKEN_TYPE) == composite_token_type and token.get(IS_BEGINNING_OF_COMPOSITE):
-                list_of_composite_token_values.append(token.get(COMPOSITE_TOKEN_VALUE))
-        return list_of_composite_token_values
+        if self._composite_tokens_by_type is None:
+            self._index_tokens()
+        return list(self._composite_tokens_by_type.get(composite_token_type, []))
 
     @property
     def num_token_values(self):
@@ -0,0 +1,107 @@
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple
+
+import jinja2
+from jinja2 import meta, nodes
+
+# функции окружения, результат которых зависит только от аргументов
+DETERMINISTIC_GLOBALS = frozenset({"range", "dict", "cycler", "joiner", "namespace", "timedelta", "datetime",
+                                   "timestamp_to_datetime"})
+NON_DETERMINISTIC_FILTERS = frozenset({"random", "shuffle"})
+UNSUPPORTED_NODES = (nodes.Include, nodes.Import, nodes.FromImport, nodes.Extends)
+
+_MISSING = object()
+_SCALARS = (str, int, float, bool, type(None))
+
+Path = Tuple[Any, ...]
+
+
+class NotCacheable(Exception):
+    pass
+
+
+def _constant_path(node) -> Optional[Path]:
+    """a.b["c"][0] -> ("a", "b", "c", 0); None, если в цепочке есть не константа"""
+    if isinstance(node, nodes.Name):
+        return (node.name,) if node.ctx == "load" else None
+    if isinstance(node, nodes.Getattr):
+        base = _constant_path(node.node)
+        return base + (node.attr,) if base else None
+    if isinstance(node, nodes.Getitem) and isinstance(node.arg, nodes.Const) and \
+            type(node.arg.value) in (str, int):
+        base = _constant_path(node.node)
+        return base + (node.arg.value,) if base else None
+    return None
+
+
+def _collect_paths(node, paths):
+    if isinstance(node, (nodes.Name, nodes.Getattr, nodes.Getitem)):
+        path = _constant_path(node)
+        if path:
+            paths.add(path)
+            return
+    for child in node.iter_child_nodes():
+        _collect_paths(child, paths)
+
+
+def find_dependencies(template: jinja2.Template, source: str) -> Optional[FrozenSet[Path]]:
+    """
+    Пути в параметрах, от которых зависит результат шаблона: {{ payload.amount }} -> {("payload", "amount")}.
+    Пустое множество - шаблон статический. None - зависимость определить нельзя
+    (вызовы недетерминированных функций, random, include/import).
+    """
+    environment = template.environment
+    ast = environment.parse(source)
+    for node in ast.find_all(UNSUPPORTED_NODES):
+        return None
+    for node in ast.find_all(nodes.Filter):
+        if node.name in NON_DETERMINISTIC_FILTERS:
+            return None
+    for node in ast.find_all(nodes.Call):
+        if isinstance(node.node, nodes.Name) and node.node.name in environment.globals and \
+                node.node.name not in DETERMINISTIC_GLOBALS:
+            return None
+    undeclared = meta.find_undeclared_variables(ast)
+    paths = set()
+    _collect_paths(ast, paths)
+    return frozenset(path for path in paths if path[0] in undeclared)
+
+
+def _freeze(value):
+    value_type = type(value)
+    if value_type in _SCALARS:
+        # тип в ключе: 1, 1.0 и True равны, но отрисовываются по-разному
+        return value_type, value
+    if value_type is dict:
+        return dict, tuple((_freeze(key), _freeze(item)) for key, item in value.items())
+    if value_type in (list, tuple):
+        return value_type, tuple(_freeze(item) for item in value)
+    raise NotCacheable()
+
+
+def _resolve(params: Dict[str, Any], path: Path):
+    value = params.get(path[0], _MISSING)
+    for step in path[1:]:
+        if value is _MISSING:
+            break
+        if type(value) is dict:
+            if isinstance(step, str) and hasattr(dict, step):
+                # a.items, a.get и т.п. jinja берет у словаря как атрибут - ключом будет весь словарь
+                break
+            value = value.get(step, _MISSING)
+        elif type(value) in (list, tuple) and type(step) is int:
+            value = value[step] if -len(value) <= step < len(value) else _MISSING
+        else:
+            break
+    return value
+
+
+def dependency_key(dependencies: Sequence[Path], params: Dict[str, Any]) -> Optional[Tuple]:
+    """Ключ кэша отрисовки по значениям зависимостей; None - значения нельзя сравнить по содержимому"""
+    key = []
+    try:
+        for path in dependencies:
+            value = _resolve(params, path)
+            key.append(_MISSING if value is _MISSING else _freeze(value))
+    except NotCacheable:
+        return None
+    return tuple(key)
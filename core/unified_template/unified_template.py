@@ -1,21 +1,30 @@
 import json
 import logging
-from copy import copy
+from copy import copy, deepcopy
+from functools import cached_property
+from typing import FrozenSet, Optional
 import jinja2
 from distutils.util import strtobool
 
 import core.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.monitoring.monitoring import monitoring
+from core.unified_template.template_dependencies import find_dependencies, dependency_key, Path
+from core.utils.bounded_cache import BoundedCache
 
 UNIFIED_TEMPLATE_TYPE_NAME = "unified_template"
 
+RENDER_STATIC = "static"
+RENDER_CACHED = "cached"
+RENDER_DYNAMIC = "dynamic"
+
 
 def bool_loader(val):
     return bool(strtobool(val))
 
 
 class UnifiedTemplate:
+    RENDER_CACHE_NAME = "template_render"
     loaders = {
         "str": str,
         "int": int,
@@ -42,11 +51,65 @@ class UnifiedTemplate:
         self.is_logging_debug_mode = logging.getLogger(globals().get("__name__")).isEnabledFor(
             logging.getLevelName("DEBUG")
         )
+        self._render_cache: Optional[BoundedCache] = None
+
+    @cached_property
+    def dependencies(self) -> Optional[FrozenSet[Path]]:
+        """Пути в параметрах, от которых зависит результат (с учетом support_templates), None - не определить"""
+        if isinstance(self.input, str):
+            source = self.input
+        elif self.input.get("extensions"):
+            return None
+        else:
+            source = self.input["template"]
+        dependencies = find_dependencies(self.template, source)
+        if dependencies is None:
+            return None
+        result = {path for path in dependencies if path[0] not in self.support_templates}
+        for support_template in self.support_templates.values():
+            support_dependencies = support_template.dependencies
+            if support_dependencies is None:
+                return None
+            result.update(path for path in support_dependencies if path[0] not in self.support_templates)
+        return frozenset(result)
+
+    @property
+    def render_kind(self) -> str:
+        dependencies = self.dependencies
+        if dependencies is None:
+            return RENDER_DYNAMIC
+        return RENDER_CACHED if dependencies else RENDER_STATIC
+
+    def enable_render_cache(self, max_size: int = 128):
+        """Запоминать до max_size результатов render по значениям зависимостей.
+        Статический шаблон отрисовывается сразу.
+        Размер можно переопределить в template_settings["caches"]["template_render"].
+        """
+        if self.dependencies is None or max_size <= 0:
+            return
+        self._sorted_dependencies = sorted(self.dependencies, key=repr)
+        self._render_cache = BoundedCache(self.RENDER_CACHE_NAME, max_entries=max_size)
+        if not self.dependencies:
+            try:
+                self._render_cache[()] = self.silent_render({})
+            except Exception:
+                # ошибка отрисовки будет выброшена и залогирована при вызове render
+                pass
+
+    def _cached_render(self, params_dict):
+        key = dependency_key(self._sorted_dependencies, params_dict)
+        if key is None:
+            return self.silent_render(params_dict)
+        result = self._render_cache.get_or_create(key, lambda: self.silent_render(params_dict))
+        return result if isinstance(result, str) else deepcopy(result)
 
     def render(self, *args, **kwargs):
         params_dict = dict(*args, **kwargs)
         try:
-            result = self.silent_render(params_dict)
+            if self._render_cache is not None:
+                result = self._cached_render(params_dict)
+            else:
+                result = self.silent_render(params_dict)
             if self.is_logging_debug_mode:
                 log_params = dict()
                 log_params[log_const.KEY_NAME] = log_const.TEMPLATE_TRACE_VALUE
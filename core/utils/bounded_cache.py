@@ -0,0 +1,258 @@
+# coding: utf-8
+import asyncio
+import sys
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from core.monitoring.monitoring import monitoring
+
+_MISSING = object()
+_NOT_SET = object()
+
+
+class CacheStats:
+    EVENTS = ("hit", "miss", "eviction", "expiration")
+
+    __slots__ = ("hit", "miss", "eviction", "expiration", "_reported")
+
+    def __init__(self):
+        self.hit = self.miss = self.eviction = self.expiration = 0
+        self._reported = dict.fromkeys(self.EVENTS, 0)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {event: getattr(self, event) for event in self.EVENTS}
+
+    def unreported(self) -> Dict[str, int]:
+        """Приросты счетчиков с прошлого вызова"""
+        result = {}
+        for event in self.EVENTS:
+            value = getattr(self, event)
+            if value != self._reported[event]:
+                result[event] = value - self._reported[event]
+                self._reported[event] = value
+        return result
+
+
+class BoundedCache:
+    """
+    LRU-кэш с ограничением по числу записей (max_entries), по суммарному размеру (max_bytes) и
+    временем жизни записей (ttl, секунды по timer). None - ограничения нет.
+
+    Размер записи считает sizeof(value) (по умолчанию sys.getsizeof, если задан max_bytes).
+    Истекшие записи удаляются при обращении и полным проходом не чаще раза в ttl.
+    Кэш с name регистрируется в cache_registry: параметры из template_settings["caches"][name]
+    переопределяют заданные в коде, счетчики hit/miss/eviction/expiration уходят в метрику cache_events
+    при cache_registry.report_metrics().
+    """
+
+    def __init__(self, name: Optional[str] = None, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, ttl: Optional[float] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None, timer: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.timer = timer
+        self.max_entries = None
+        self.max_bytes = None
+        self.ttl = None
+        self.sizeof = None
+        self._sizeof = None
+        self.bytes = 0
+        self.stats = CacheStats()
+        # key -> [value, expires_at, size]
+        self._data: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._next_sweep = None
+        self.configure(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, sizeof=sizeof)
+        cache_registry.register(self)
+
+    def configure(self, max_entries=_NOT_SET, max_bytes=_NOT_SET, ttl=_NOT_SET, sizeof=_NOT_SET) -> None:
+        """Меняет ограничения; лишние записи вытесняются сразу, новый ttl действует для новых записей"""
+        if max_entries is not _NOT_SET:
+            self.max_entries = max_entries
+        if max_bytes is not _NOT_SET:
+            self.max_bytes = max_bytes
+        if ttl is not _NOT_SET:
+            self.ttl = ttl
+            self._next_sweep = self.timer() + ttl if ttl and ttl > 0 else None
+        if sizeof is not _NOT_SET:
+            self._sizeof = sizeof
+        sizeof = self._sizeof or (sys.getsizeof if self.max_bytes is not None else None)
+        if sizeof is not self.sizeof:
+            self.sizeof = sizeof
+            self.bytes = 0
+            for entry in self._data.values():
+                entry[2] = self.sizeof(entry[0]) if self.sizeof else 0
+                self.bytes += entry[2]
+        self._shrink()
+
+    def _count(self, event: str) -> None:
+        setattr(self.stats, event, getattr(self.stats, event) + 1)
+
+    def report_metrics(self) -> None:
+        if self.name is None:
+            return
+        for event, value in self.stats.unreported().items():
+            monitoring.counter_cache_events(self.name, event, value)
+
+    def _remove(self, key) -> list:
+        entry = self._data.pop(key)
+        self.bytes -= entry[2]
+        return entry
+
+    def _shrink(self) -> None:
+        data = self._data
+        while data and ((self.max_entries is not None and len(data) > self.max_entries) or
+                        (self.max_bytes is not None and self.bytes > self.max_bytes)):
+            self._remove(next(iter(data)))
+            self._count("eviction")
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.timer():
+            self._remove(key)
+            self._count("expiration")
+            entry = None
+        if entry is None:
+            self._count("miss")
+            return default
+        self._data.move_to_end(key)
+        self._count("hit")
+        return entry[0]
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        now = None
+        if self.ttl is not None:
+            if self.ttl <= 0:
+                # запись истекла бы сразу
+                return
+            now = self.timer()
+            if self._next_sweep is not None and now >= self._next_sweep:
+                self.sweep()
+        size = self.sizeof(value) if self.sizeof else 0
+        if key in self._data:
+            self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._count("eviction")
+            return
+        self._data[key] = [value, now + self.ttl if now is not None else None, size]
+        self.bytes += size
+        self._shrink()
+
+    def __delitem__(self, key) -> None:
+        self._remove(key)
+
+    def __contains__(self, key) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > self.timer())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator:
+        return iter(list(self._data))
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Записи от давно использованных к недавним, без учета ttl и без изменения порядка"""
+        return ((key, entry[0]) for key, entry in list(self._data.items()))
+
+    def pop(self, key, default=None):
+        if key not in self._data:
+            return default
+        return self._remove(key)[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def sweep(self) -> int:
+        """Удаляет все истекшие записи, возвращает их количество"""
+        now = self.timer()
+        if self.ttl:
+            self._next_sweep = now + self.ttl
+        expired = [key for key, entry in self._data.items() if entry[1] is not None and entry[1] <= now]
+        for key in expired:
+            self._remove(key)
+            self._count("expiration")
+        return len(expired)
+
+    def get_or_create(self, key, factory: Callable[[], Any]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self[key] = value
+        return value
+
+    async def get_or_load(self, key, loader: Callable[[], Awaitable]):
+        """Значение из кэша или результат loader(); одновременные промахи по ключу ждут одну загрузку"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = future
+        # отмена одного ожидающего не отменяет загрузку для остальных
+        return await asyncio.shield(future)
+
+    async def _load(self, key, loader: Callable[[], Awaitable]):
+        try:
+            value = await loader()
+            self[key] = value
+            return value
+        finally:
+            self._loading.pop(key, None)
+
+
+class CacheRegistry:
+    """Именованные кэши и их параметры из template_settings["caches"]: {name: {max_entries, max_bytes, ttl}}"""
+    PARAMS = ("max_entries", "max_bytes", "ttl")
+
+    def __init__(self):
+        self._caches = weakref.WeakSet()
+        self._config: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, cache: BoundedCache) -> None:
+        if cache.name is None:
+            return
+        self._caches.add(cache)
+        params = self._config.get(cache.name)
+        if params:
+            cache.configure(**params)
+
+    def apply_config(self, config: Dict[str, Dict[str, Any]]) -> None:
+        self._config = {name: {param: value for param, value in (params or {}).items() if param in self.PARAMS}
+                        for name, params in (config or {}).items()}
+        for cache in list(self._caches):
+            params = self._config.get(cache.name)
+            if params:
+                cache.configure(**params)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Суммарные счетчики, число записей и размер по именам кэшей"""
+        result = {}
+        for cache in list(self._caches):
+            stats = result.setdefault(cache.name, dict.fromkeys(CacheStats.EVENTS + ("entries", "bytes"), 0))
+            for event, value in cache.stats.as_dict().items():
+                stats[event] += value
+            stats["entries"] += len(cache)
+            stats["bytes"] += cache.bytes
+        return result
+
+    def report_metrics(self) -> None:
+        """Отправляет в cache_events приросты счетчиков с прошлого вызова, одним значением на имя кэша"""
+        events: Dict[Tuple[str, str], int] = {}
+        for cache in list(self._caches):
+            for event, value in cache.stats.unreported().items():
+                events[cache.name, event] = events.get((cache.name, event), 0) + value
+        for (name, event), value in events.items():
+            monitoring.counter_cache_events(name, event, value)
+
+
+cache_registry = CacheRegistry()
@@ -0,0 +1,122 @@
+# coding: utf-8
+import asyncio
+import math
+from typing import Optional, Dict, Any
+
+from core.model.factory import build_factory
+from core.model.registered import Registered
+
+concurrency_limiters = Registered()
+concurrency_limiter_factory = build_factory(concurrency_limiters)
+
+
+class ConcurrencyLimiter:
+    """
+    Ограничитель количества одновременно обрабатываемых сообщений.
+    Базовый класс держит фиксированный лимит (limit: null - без ограничений),
+    наследники подстраивают лимит по наблюдаемой задержке и ошибкам.
+    """
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        items = items or {}
+        self.min_limit: int = items.get("min_limit", 1)
+        self.max_limit: int = items.get("max_limit", 1000)
+        self._limit: Optional[float] = items.get("limit", items.get("initial_limit"))
+        self.in_flight: int = 0
+        self._released: Optional[asyncio.Event] = None
+
+    @property
+    def limit(self) -> Optional[int]:
+        return None if self._limit is None else int(self._limit)
+
+    @property
+    def is_limited(self) -> bool:
+        return self.limit is not None and self.in_flight >= self.limit
+
+    async def acquire(self):
+        """Waits until a slot is free. Caller must call release() when message processing is done"""
+        while self.is_limited:
+            if self._released is None:
+                self._released = asyncio.Event()
+            self._released.clear()
+            await self._released.wait()
+        self.in_flight += 1
+
+    def release(self, latency: Optional[float] = None, error: bool = False):
+        """
+        :param latency: end-to-end processing time in seconds, None if the slot was not used
+        :param error: processing failed or the message was dropped
+        """
+        if latency is not None:
+            self._on_sample(latency, error)
+        self.in_flight -= 1
+        if self._released is not None:
+            self._released.set()
+
+    def _on_sample(self, latency: float, error: bool):
+        pass
+
+    def _clamp(self, limit: float) -> float:
+        return min(self.max_limit, max(self.min_limit, limit))
+
+
+class AIMDConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Additive increase / multiplicative decrease:
+    лимит растет на increase после каждого быстрого и успешного сообщения, если лимит реально используется,
+    и умножается на backoff_ratio при ошибке или задержке больше latency_threshold (в секундах).
+    """
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        items = items or {}
+        super().__init__(items)
+        self._limit = self._clamp(items.get("initial_limit", 10))
+        self.increase: float = items.get("increase", 1)
+        self.backoff_ratio: float = items.get("backoff_ratio", 0.9)
+        self.latency_threshold: float = items.get("latency_threshold", 1.0)
+
+    def _on_sample(self, latency: float, error: bool):
+        if error or latency > self.latency_threshold:
+            self._limit = self._clamp(self._limit * self.backoff_ratio)
+        elif self.in_flight * 2 >= self._limit:
+            self._limit = self._clamp(self._limit + self.increase / max(1.0, math.floor(self._limit)))
+
+
+class GradientConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Градиентный лимитер: сравнивает текущую задержку (короткое скользящее среднее)
+    с базовой (длинное скользящее среднее) и уменьшает лимит пропорционально росту задержки.
+    Запас queue_size = sqrt(limit) позволяет лимиту расти, пока задержка не меняется.
+    """
+
+    def __init__(self, items: Optional[Dict[str, Any]] = None):
+        items = items or {}
+        super().__init__(items)
+        self._limit = self._clamp(items.get("initial_limit", 10))
+        self.smoothing: float = items.get("smoothing", 0.2)
+        self.tolerance: float = items.get("tolerance", 1.5)
+        self.backoff_ratio: float = items.get("backoff_ratio", 0.9)
+        self._short_alpha = 2 / (items.get("short_window", 10) + 1)
+        self._long_alpha = 2 / (items.get("long_window", 600) + 1)
+        self.short_rtt: Optional[float] = None
+        self.long_rtt: Optional[float] = None
+
+    def _on_sample(self, latency: float, error: bool):
+        if self.short_rtt is None:
+            self.short_rtt = self.long_rtt = latency
+        else:
+            self.short_rtt += self._short_alpha * (latency - self.short_rtt)
+            self.long_rtt += self._long_alpha * (latency - self.long_rtt)
+        # базовая задержка не должна "застревать" после долгой деградации
+        if self.long_rtt / max(self.short_rtt, 1e-9) > 2:
+            self.long_rtt *= 0.95
+
+        if error:
+            self._limit = self._clamp(self._limit * self.backoff_ratio)
+            return
+        if self.in_flight * 2 < self._limit:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / max(self.short_rtt, 1e-9)))
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = self._clamp(self._limit * (1 - self.smoothing) + new_limit * self.smoothing)
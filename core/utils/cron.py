@@ -0,0 +1,62 @@
+# coding: utf-8
+from datetime import datetime, date
+from typing import Optional
+
+from croniter import croniter
+
+from core.utils.bounded_cache import BoundedCache
+
+
+class CronSchedule:
+    """
+    Cron-выражение, скомпилированное для частых проверок croniter.match(expression, dt).
+
+    Минуты и часы раскрываются в битовые маски при создании, поля дней (день месяца, месяц, день недели
+    со всеми особенностями croniter: L, #, объединение дня месяца и дня недели) проверяются через croniter
+    один раз на календарный день. Проверяется переданное локальное время как есть, поэтому переходы
+    на летнее/зимнее время обрабатываются так же, как в croniter.match.
+    Выражения с секундами и псевдонимы (@daily) проверяются через croniter.match без компиляции.
+    """
+    DAYS_CACHE_SIZE = 64
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._minutes: Optional[int] = None
+        self._hours: Optional[int] = None
+        self._day_expression: Optional[str] = None
+        self._days = BoundedCache(max_entries=self.DAYS_CACHE_SIZE)
+        fields = expression.split()
+        if len(fields) != 5:
+            return
+        try:
+            expanded = croniter(expression).expanded
+        except Exception:
+            # ошибка выражения будет выброшена при проверке - как без компиляции
+            return
+        self._minutes = self._mask(expanded[0], 60)
+        self._hours = self._mask(expanded[1], 24)
+        self._day_expression = "0 0 " + " ".join(fields[2:])
+
+    @staticmethod
+    def _mask(values, size: int) -> int:
+        if "*" in values:
+            return (1 << size) - 1
+        mask = 0
+        for value in values:
+            mask |= 1 << int(value)
+        return mask
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._minutes is not None
+
+    def _day_matches(self, day: date) -> bool:
+        return self._days.get_or_create(
+            day, lambda: croniter.match(self._day_expression, datetime(day.year, day.month, day.day))
+        )
+
+    def match(self, dt: datetime) -> bool:
+        if not self.is_compiled:
+            return croniter.match(self.expression, dt)
+        return bool(self._minutes >> dt.minute & 1) and bool(self._hours >> dt.hour & 1) and \
+            self._day_matches(dt.date())
@@ -0,0 +1,112 @@
+# coding: utf-8
+"""
+JSON-кодек фреймворка: dumps и loads с сигнатурой json.dumps/json.loads.
+Если установлен orjson, кодирование и разбор идут через него, иначе через стандартный json.
+
+Семантика json сохраняется:
+    default (и cls без своего encode) вызывается для тех же объектов: datetime и dataclass передаются в default;
+    ensure_ascii=True экранирует не-ASCII символы так же, как json;
+    порядок ключей сохраняется, sort_keys сортирует.
+Аргументы, которых у orjson нет (indent, separators, object_pairs_hook...), и данные, которые orjson не принимает
+(ключи не-строки, целые больше 64 бит, NaN при разборе...), обрабатываются стандартным json - с его результатом
+или его исключением.
+Отличия orjson: компактная запись без пробелов после ":" и ",", uuid.UUID и enum.Enum он кодирует сам,
+NaN и Infinity пишет как null.
+"""
+import json
+import re
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = "json"
+ORJSON_BACKEND = "orjson"
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]+")
+
+
+def _escape_non_ascii(match) -> str:
+    # не-ASCII символы в выводе бывают только внутри строк, экранируются как в json: \uXXXX и суррогатные пары
+    return encode_basestring_ascii(match.group())[1:-1]
+
+
+class JsonBackend:
+    name = JSON_BACKEND
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, data, **kwargs) -> Any:
+        return json.loads(data, **kwargs)
+
+
+class OrjsonBackend(JsonBackend):
+    name = ORJSON_BACKEND
+
+    def __init__(self):
+        self._options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    @staticmethod
+    def _get_default(default: Optional[Callable], cls) -> Optional[Callable]:
+        if default is not None or cls is None:
+            return default
+        if cls.encode is not json.JSONEncoder.encode or cls.iterencode is not json.JSONEncoder.iterencode:
+            raise TypeError(f"{cls.__qualname__} overrides encoding")
+        return cls().default
+
+    def dumps(self, obj: Any, default: Optional[Callable] = None, cls=None, ensure_ascii: bool = True,
+              sort_keys: bool = False, indent=None, **kwargs) -> str:
+        if indent is None and not kwargs:
+            try:
+                options = self._options | orjson.OPT_SORT_KEYS if sort_keys else self._options
+                result = orjson.dumps(obj, default=self._get_default(default, cls), option=options).decode()
+                if ensure_ascii and not result.isascii():
+                    result = _NON_ASCII.sub(_escape_non_ascii, result)
+                return result
+            except TypeError:
+                pass
+        return json.dumps(obj, default=default, cls=cls, ensure_ascii=ensure_ascii, sort_keys=sort_keys,
+                          indent=indent, **kwargs)
+
+    def loads(self, data, **kwargs) -> Any:
+        if not kwargs:
+            try:
+                return orjson.loads(data)
+            except (orjson.JSONDecodeError, TypeError):
+                pass
+        return json.loads(data, **kwargs)
+
+
+_backends = {JSON_BACKEND: JsonBackend}
+if orjson is not None:
+    _backends[ORJSON_BACKEND] = OrjsonBackend
+
+_backend: JsonBackend = _backends.get(ORJSON_BACKEND, JsonBackend)()
+
+
+def set_backend(name: str) -> None:
+    """Выбор бэкенда по имени: "json" или "orjson" (если установлен)"""
+    global _backend
+    if name not in _backends:
+        raise ValueError(f"JSON backend {name} is not available, available: {', '.join(_backends)}")
+    _backend = _backends[name]()
+
+
+def get_backend() -> str:
+    return _backend.name
+
+
+def available_backends() -> List[str]:
+    return list(_backends)
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    return _backend.dumps(obj, **kwargs)
+
+
+def loads(data, **kwargs) -> Any:
+    return _backend.loads(data, **kwargs)
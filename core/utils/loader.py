@@ -1,15 +1,15 @@
 # coding=utf-8
 from collections import OrderedDict
 
-import json
+from core.utils import json_codec
 
 
 def ordered_json(data):
-    return json.loads(data, object_pairs_hook=OrderedDict)
+    return json_codec.loads(data, object_pairs_hook=OrderedDict)
 
 
 def reverse_json_dict(data):
-    data = json.loads(data)
+    data = json_codec.loads(data)
     result = dict()
     for key, values in data.items():
         for value in values:
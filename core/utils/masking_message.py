@@ -1,6 +1,8 @@
 from typing import Optional, Union, Match, Dict, List
 import re
 
+from core.utils import json_codec
+
 MASK = "***"
 DEFAULT_MASKING_FIELDS = {
     "token": 0, "access_token": 0, "refresh_token": 0, "epkId": 0, "profileId": 0, "searchResult": 0,
@@ -147,3 +149,28 @@ def structure_mask(data: Union[Dict, List], depth: int, available_depth: int = -
                 counter.max_depth = depth
 
     return counter
+
+
+class MaskedView:
+    """
+    Ленивое маскированное представление данных для логирования.
+    Маскировка и сериализация выполняются только при обращении к строковому представлению
+    (т.е. когда запись лога действительно форматируется), результат кэшируется.
+    """
+
+    def __init__(self, data: Union[Dict, List], masking_fields: Optional[Union[Dict, List]] = None):
+        self._data = data
+        self._masking_fields = masking_fields
+        self._str = None
+
+    @property
+    def masked_data(self) -> Union[Dict, List]:
+        return masking(self._data, self._masking_fields)
+
+    def __str__(self) -> str:
+        if self._str is None:
+            self._str = json_codec.dumps(self.masked_data, ensure_ascii=False)
+        return self._str
+
+    def __repr__(self) -> str:
+        return str(self)
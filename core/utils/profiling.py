@@ -0,0 +1,249 @@
+# coding: utf-8
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, defaultdict
+from typing import Optional, Dict, List, Iterable
+
+import core.logging.logger_constants as log_const
+from core.logging.logger_utils import log
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def to_collapsed(stacks: Dict[str, int]) -> str:
+    """Brendan Gregg's collapsed stacks format, accepted by flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {value}\n" for stack, value in sorted(stacks.items()) if value > 0)
+
+
+class StackSampler:
+    """
+    Статистический профилировщик: фоновый поток раз в interval секунд снимает стеки
+    отслеживаемых потоков через sys._current_frames. Накладные расходы не зависят от количества вызовов.
+    """
+    MIN_INTERVAL = 0.001
+
+    def __init__(self, interval: float = 0.01, thread_ids: Optional[Iterable[int]] = None, max_depth: int = 128):
+        # слишком частый опрос превращает поток семплера в busy-loop
+        self.interval = max(interval, self.MIN_INTERVAL)
+        self.thread_ids = set(thread_ids or [threading.main_thread().ident])
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id in self.thread_ids:
+            frame = frames.get(thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return to_collapsed(self.stacks)
+
+
+class StageTimings:
+    def __init__(self):
+        self._values: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, secs: float):
+        with self._lock:
+            self._values[stage].append(secs)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        with self._lock:
+            values = {stage: sorted(stage_values) for stage, stage_values in self._values.items()}
+        for stage, stage_values in values.items():
+            count = len(stage_values)
+            result[stage] = {
+                "count": count,
+                "total_ms": sum(stage_values) * 1000,
+                "mean_ms": sum(stage_values) / count * 1000,
+                "p50_ms": stage_values[int(count * 0.5)] * 1000,
+                "p95_ms": stage_values[min(count - 1, int(count * 0.95))] * 1000,
+                "max_ms": stage_values[-1] * 1000,
+            }
+        return result
+
+
+class ProfilingSession:
+    """
+    Ограниченная по времени сессия профилирования: сэмплирование стеков, diff снапшотов tracemalloc
+    и разбивка времени обработки по этапам. По завершении результаты пишутся в файлы в path:
+        <id>.cpu.folded - сэмплы стеков в collapsed-формате (flamegraph.pl, speedscope)
+        <id>.memory.folded - прирост памяти по стекам аллокаций в collapsed-формате (в байтах)
+        <id>.memory.txt - топ изменений по строкам
+        <id>.stages.json - время по этапам обработки сообщения
+    """
+
+    def __init__(self, path: str, duration: float = 30, interval: float = 0.01, memory: bool = False,
+                 memory_depth: int = 16, thread_ids: Optional[Iterable[int]] = None):
+        self.id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.path = path
+        self.duration = duration
+        self.memory = memory
+        self.memory_depth = memory_depth
+        self.sampler = StackSampler(interval, thread_ids)
+        self.stages = StageTimings()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.files: List[str] = []
+        self._memory_snapshot = None
+        self._own_tracemalloc = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def start(self):
+        self.started_at = time.time()
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.memory_depth)
+                self._own_tracemalloc = True
+            self._memory_snapshot = tracemalloc.take_snapshot()
+        self.sampler.start()
+        self._timer = threading.Timer(self.duration, self.stop)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop(self):
+        with self._lock:
+            if not self.active:
+                return
+            self.finished_at = time.time()
+        if self._timer is not None:
+            self._timer.cancel()
+        self.sampler.stop()
+        memory_stats = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            memory_stats = snapshot.compare_to(self._memory_snapshot, "traceback")
+            self._memory_snapshot = None
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+        try:
+            self._export(memory_stats)
+        except Exception:
+            log("ProfilingSession %(session_id)s export failed",
+                params={log_const.KEY_NAME: "profiling_session", "session_id": self.id},
+                level="ERROR", exc_info=True)
+
+    def _write(self, suffix: str, content: str):
+        filename = os.path.join(self.path, f"{self.id}.{suffix}")
+        with open(filename, "w") as f:
+            f.write(content)
+        self.files.append(filename)
+
+    def _export(self, memory_stats):
+        os.makedirs(self.path, exist_ok=True)
+        self._write("cpu.folded", self.sampler.collapsed())
+        self._write("stages.json", json.dumps(self.stages.summary(), indent=2))
+        if memory_stats is not None:
+            stacks = Counter()
+            for stat in memory_stats:
+                stack = ";".join(f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in stat.traceback)
+                stacks[stack] += stat.size_diff
+            self._write("memory.folded", to_collapsed(stacks))
+            top = "\n".join(str(stat) for stat in memory_stats[:50])
+            self._write("memory.txt", top)
+        log("ProfilingSession %(session_id)s finished: %(samples)s samples, files: %(files)s",
+            params={log_const.KEY_NAME: "profiling_session", "session_id": self.id,
+                    "samples": self.sampler.samples, "files": self.files},
+            level="WARNING")
+
+    def status(self) -> dict:
+        return {
+            "id": self.id,
+            "active": self.active,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": self.duration,
+            "samples": self.sampler.samples,
+            "memory": self.memory,
+            "files": self.files,
+        }
+
+
+class Profiler:
+    """Точка управления сессиями профилирования, одновременно активна не более одной сессии"""
+    DEFAULT_PATH = "/tmp/profiling"
+    MAX_DURATION = 600
+
+    def __init__(self):
+        self.path = self.DEFAULT_PATH
+        self.max_duration = self.MAX_DURATION
+        self.session: Optional[ProfilingSession] = None
+        self._lock = threading.Lock()
+
+    def apply_config(self, config: dict):
+        self.path = config.get("sessions_path", self.DEFAULT_PATH)
+        self.max_duration = config.get("max_duration", self.MAX_DURATION)
+
+    @property
+    def active(self) -> bool:
+        return self.session is not None and self.session.active
+
+    def start_session(self, duration: float = 30, interval: float = 0.01, memory: bool = False) -> ProfilingSession:
+        with self._lock:
+            if self.active:
+                raise RuntimeError(f"Profiling session {self.session.id} is already running")
+            if not duration > 0 or not interval > 0:
+                raise ValueError(f"Profiling duration and interval must be positive, got {duration} and {interval}")
+            duration = min(duration, self.max_duration)
+            self.session = ProfilingSession(self.path, duration=duration, interval=interval, memory=memory)
+            self.session.start()
+        log("ProfilingSession %(session_id)s started for %(duration)s secs",
+            params={log_const.KEY_NAME: "profiling_session", "session_id": self.session.id, "duration": duration},
+            level="WARNING")
+        return self.session
+
+    def stop_session(self) -> Optional[ProfilingSession]:
+        session = self.session
+        if session is not None:
+            session.stop()
+        return session
+
+    def record_stage(self, stage: str, secs: float):
+        session = self.session
+        if session is not None and session.active:
+            session.stages.record(stage, secs)
+
+    def status(self) -> dict:
+        return self.session.status() if self.session is not None else {"active": False}
+
+
+profiler = Profiler()
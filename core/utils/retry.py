@@ -0,0 +1,234 @@
+# coding: utf-8
+import asyncio
+import inspect
+import random
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+
+import core.logging.logger_constants as log_const
+from core.logging.logger_utils import log
+from core.monitoring.monitoring import monitoring
+
+ExceptionTypes = Union[Type[BaseException], Tuple[Type[BaseException], ...]]
+
+
+class CircuitOpenError(ConnectionError):
+    pass
+
+
+class RetryBudget:
+    """Ведро токенов: не больше rate повторов в секунду в среднем и burst подряд"""
+
+    def __init__(self, rate: float, burst: float, timer: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.timer = timer
+        self.tokens = burst
+        self._updated = timer()
+
+    def try_acquire(self) -> bool:
+        now = self.timer()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CircuitBreaker:
+    """
+    После threshold неудачных подряд вызовов размыкается на timeout секунд: вызовы сразу завершаются
+    CircuitOpenError. Затем пропускает один пробный вызов (half-open): успех замыкает, неудача снова размыкает.
+    Состояние отправляется в метрику circuit_breaker_state.
+    """
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, threshold: int, timeout: float, timer: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.threshold = threshold
+        self.timeout = timeout
+        self.timer = timer
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            log("Circuit breaker %(breaker)s is %(state)s",
+                params={log_const.KEY_NAME: "circuit_breaker", "breaker": self.name, "state": state},
+                level="WARNING")
+            monitoring.gauge_circuit_breaker(self.name, self.STATE_VALUES[state])
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if self.timer() - self._opened_at < self.timeout:
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return True
+
+    def release(self) -> None:
+        """Вызов завершился не по вине сервиса (чужое исключение, отмена) - состояние не меняется"""
+        self._trial_running = False
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self._trial_running = False
+        self._set_state(self.CLOSED)
+
+    def on_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self._opened_at = self.timer()
+            self._set_state(self.OPEN)
+
+
+class RetryPolicy:
+    """
+    Повтор действия при исключениях handled без рекурсии. Параметры config (все необязательные):
+        try_count - число попыток (5)
+        backoff_base, backoff_max - пауза перед n-й повторной попыткой: случайная в
+                                    [d/2, d], d = min(backoff_max, backoff_base * 2^n) (0.05 и 1 секунда)
+        budget_rate, budget_burst - ведро токенов на повторы: budget_rate в секунду, budget_burst подряд (20);
+                                    по умолчанию None - без ограничения
+        breaker_threshold, breaker_timeout - размыкатель после breaker_threshold неудачных подряд вызовов
+                                             на breaker_timeout секунд (10); по умолчанию None - без размыкателя
+    Исключения expected (ожидаемые вызывающим, например FileNotFoundError) выбрасываются сразу: без повторов
+    и не считаются неудачей для размыкателя.
+    """
+    DEFAULTS = {
+        "try_count": 5,
+        "backoff_base": 0.05,
+        "backoff_max": 1.0,
+        "budget_rate": None,
+        "budget_burst": 20,
+        "breaker_threshold": None,
+        "breaker_timeout": 10,
+    }
+
+    def __init__(self, name: str, config: Optional[Dict[str, Any]] = None,
+                 timer: Callable[[], float] = time.monotonic):
+        config = {**self.DEFAULTS, **{key: value for key, value in (config or {}).items() if key in self.DEFAULTS}}
+        self.name = name
+        self.try_count = config["try_count"]
+        self.backoff_base = config["backoff_base"]
+        self.backoff_max = config["backoff_max"]
+        self.budget = RetryBudget(config["budget_rate"], config["budget_burst"], timer) \
+            if config["budget_rate"] is not None else None
+        self.breaker = CircuitBreaker(name, config["breaker_threshold"], config["breaker_timeout"], timer) \
+            if config["breaker_threshold"] is not None else None
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.random() * delay / 2
+
+    def _before_call(self) -> None:
+        if self.breaker is not None and not self.breaker.allow():
+            monitoring.counter_retry_events(self.name, "rejected")
+            raise CircuitOpenError(f"Circuit breaker {self.name} is open")
+
+    def _on_success(self) -> None:
+        if self.breaker is not None:
+            self.breaker.on_success()
+
+    def _may_retry(self, error: BaseException, tries_left: int) -> bool:
+        log("%(policy_name)s run failed with %(exception)s.\n Got %(try_count)s tries left.",
+            params={"policy_name": self.name, "exception": str(error), "try_count": tries_left,
+                    log_const.KEY_NAME: log_const.HANDLED_EXCEPTION_VALUE},
+            level="ERROR")
+        if tries_left <= 0:
+            return False
+        if self.budget is not None and not self.budget.try_acquire():
+            monitoring.counter_retry_events(self.name, "budget_exhausted")
+            return False
+        monitoring.counter_retry_events(self.name, "retry")
+        return True
+
+    def _on_failure(self) -> None:
+        if self.breaker is not None:
+            self.breaker.on_failure()
+
+    def _release(self) -> None:
+        if self.breaker is not None:
+            self.breaker.release()
+
+    def run(self, action: Callable, *args, handled: ExceptionTypes, on_retry: Optional[Callable] = None,
+            on_all_tries_fail: Optional[Callable] = None, try_count: Optional[int] = None,
+            expected: ExceptionTypes = (), **kwargs):
+        """
+        Вызывает action(*args, **kwargs) до try_count раз. Перед повтором вызывается on_retry(), после последней
+        неудачи - on_all_tries_fail() внутри обработчика исключения (без него исключение выбрасывается дальше).
+        """
+        self._before_call()
+        try_count = self.try_count if try_count is None else try_count
+        for attempt in range(try_count):
+            try:
+                result = action(*args, **kwargs)
+            except expected:
+                self._release()
+                raise
+            except handled as error:
+                if self._may_retry(error, try_count - attempt - 1):
+                    if on_retry is not None:
+                        on_retry()
+                    time.sleep(self.delay(attempt))
+                    continue
+                self._on_failure()
+                if on_all_tries_fail is not None:
+                    return on_all_tries_fail()
+                raise
+            except BaseException:
+                self._release()
+                raise
+            self._on_success()
+            return result
+        self._release()
+        if on_all_tries_fail is not None:
+            return on_all_tries_fail()
+
+    async def async_run(self, action: Callable, *args, handled: ExceptionTypes, on_retry: Optional[Callable] = None,
+                        on_all_tries_fail: Optional[Callable] = None, try_count: Optional[int] = None,
+                        expected: ExceptionTypes = (), **kwargs):
+        """То же, что run, для корутин; action, on_retry и on_all_tries_fail могут быть как корутинами, так и нет"""
+        self._before_call()
+        try_count = self.try_count if try_count is None else try_count
+        for attempt in range(try_count):
+            try:
+                result = action(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+            except expected:
+                self._release()
+                raise
+            except handled as error:
+                if self._may_retry(error, try_count - attempt - 1):
+                    if on_retry is not None:
+                        prepared = on_retry()
+                        if inspect.isawaitable(prepared):
+                            await prepared
+                    await asyncio.sleep(self.delay(attempt))
+                    continue
+                self._on_failure()
+                if on_all_tries_fail is not None:
+                    result = on_all_tries_fail()
+                    return await result if inspect.isawaitable(result) else result
+                raise
+            except BaseException:
+                self._release()
+                raise
+            self._on_success()
+            return result
+        self._release()
+        if on_all_tries_fail is not None:
+            result = on_all_tries_fail()
+            return await result if inspect.isawaitable(result) else result
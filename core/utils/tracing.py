@@ -0,0 +1,213 @@
+# coding: utf-8
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional, Dict, Any, List
+
+import core.logging.logger_constants as log_const
+from core.logging.logger_utils import log
+from core.monitoring.monitoring import monitoring
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("tracing_current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start_time", "duration", "error",
+                 "_start")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else "%016x" % random.getrandbits(64)
+        self.span_id = "%08x" % random.getrandbits(32)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes or {}
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent_id is None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = error.__class__.__name__
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": self.duration * 1000 if self.duration is not None else None,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class NoopSpan:
+    """Заглушка, которую получает вызывающий код при выключенной трассировке"""
+    name = None
+    attributes = {}
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "span", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.span = Span(name, _current_span.get(), attributes)
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.span.finish(exc_val)
+        _current_span.reset(self._token)
+        self.tracer.export(self.span)
+        return False
+
+
+class SpanExporter:
+    def export(self, span: Span):
+        raise NotImplementedError
+
+
+class HistogramSpanExporter(SpanExporter):
+    """Пишет длительность каждого завершенного span в гистограмму <app_name>_span_time с меткой span"""
+
+    def __init__(self, app_name: str):
+        self.app_name = app_name
+
+    def export(self, span: Span):
+        monitoring.sampling_span_time(self.app_name, span.name, span.duration)
+
+
+class TraceFileExporter(SpanExporter):
+    """
+    Сохраняет sample_rate долю трасс целиком в файл, по одной трассе в строке (json lines).
+    Решение о сэмплировании принимается по trace_id, поэтому span-ы трассы не попавшей в выборку не копятся.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 0.01):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._threshold = int(sample_rate * (1 << 64))
+        self._traces: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def is_sampled(self, trace_id: str) -> bool:
+        return int(trace_id, 16) < self._threshold
+
+    def export(self, span: Span):
+        if not self.is_sampled(span.trace_id):
+            return
+        with self._lock:
+            spans = self._traces.setdefault(span.trace_id, [])
+            spans.append(span.as_dict())
+            if not span.is_root:
+                return
+            del self._traces[span.trace_id]
+        self._write({"trace_id": span.trace_id, "name": span.name, "duration_ms": span.duration * 1000,
+                     "spans": spans})
+
+    def _write(self, trace: Dict[str, Any]):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock, open(self.path, "a") as f:
+                f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+        except Exception:
+            log("TraceFileExporter failed to write trace %(trace_id)s",
+                params={log_const.KEY_NAME: "tracing_export_error", "trace_id": trace["trace_id"]},
+                level="ERROR", exc_info=True)
+
+
+class Tracer:
+    """
+    Точка входа трассировки. По умолчанию выключена: span() возвращает NOOP_SPAN
+    и не создает объектов. Текущий span хранится в contextvars, поэтому вложенность
+    сохраняется внутри каждой asyncio задачи.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.exporters: List[SpanExporter] = []
+
+    def apply_config(self, config: Dict[str, Any], app_name: str):
+        self.enabled = config.get("enabled", False)
+        exporters = []
+        if config.get("histograms", True):
+            exporters.append(HistogramSpanExporter(app_name))
+        trace_file = config.get("trace_file")
+        if trace_file:
+            exporters.append(TraceFileExporter(trace_file["path"], trace_file.get("sample_rate", 0.01)))
+        self.exporters = exporters
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return _SpanContext(self, name, attributes)
+
+    @staticmethod
+    def current_span():
+        return _current_span.get() or NOOP_SPAN
+
+    def traced(self, name: str):
+        """Decorator wrapping each call of the function in a span"""
+        def decor(func):
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrap(*args, **kwargs):
+                    if not self.enabled:
+                        return await func(*args, **kwargs)
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrap
+
+            @wraps(func)
+            def wrap(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrap
+        return decor
+
+    def export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                log("Span exporter %(exporter)s failed",
+                    params={log_const.KEY_NAME: "tracing_export_error", "exporter": exporter.__class__.__name__},
+                    level="ERROR", exc_info=True)
+
+
+tracer = Tracer()
@@ -1,7 +1,6 @@
 # coding=utf-8
 import datetime
 import gc
-import json
 import os
 import re
 import weakref
@@ -11,6 +10,8 @@ from math import isnan, isinf
 from typing import Optional
 from time import time
 
+from core.utils import json_codec
+
 from scenarios.user.user_model import User
 
 
@@ -121,7 +122,7 @@ class HashableDict(dict):
 
 
 def ordered_loader(coded):
-    return json.loads(coded, object_pairs_hook=OrderedDict)
+    return json_codec.loads(coded, object_pairs_hook=OrderedDict)
 
 
 def current_time_ms():
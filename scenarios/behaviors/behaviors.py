@@ -269,6 +269,9 @@ class Behaviors:
                     )
                 return last_scenario_equal_callback_scenario
 
+    def next_expire_time(self):
+        return min((callback.expire_time for callback in self._callbacks.values()), default=None)
+
     def expire(self):
         callback_id_for_delete = []
         for callback_id, (behavior_id, expiration_time, *_) in self._callbacks.items():
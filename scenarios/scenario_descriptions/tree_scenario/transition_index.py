@@ -0,0 +1,59 @@
+# coding: utf-8
+from typing import Dict, List, Hashable, Tuple, Any
+
+from core.basic_models.requirement.basic_requirements import Requirement
+
+
+class TransitionIndex:
+    """
+    Переходы из одного узла TreeScenario, сгруппированные по дешевому признаку условий (Requirement.transition_key):
+    значение признака считается один раз на сообщение, полностью проверяются только кандидаты из совпавших групп
+    и узлы, условия которых индексировать нельзя. Порядок кандидатов совпадает с available_nodes.
+    """
+
+    def __init__(self, node_ids: List[str], requirements: List[Requirement]):
+        self.node_ids = list(node_ids)
+        self._unindexed: List[int] = []
+        # key -> (requirement для вычисления значения, value -> позиции в node_ids)
+        self._groups: Dict[Hashable, Tuple[Requirement, Dict[Hashable, List[int]]]] = {}
+        for position, requirement in enumerate(requirements):
+            discriminator = self._discriminator(requirement)
+            if discriminator is None:
+                self._unindexed.append(position)
+                continue
+            key, values = discriminator
+            _, buckets = self._groups.setdefault(key, (requirement, {}))
+            for value in set(values):
+                buckets.setdefault(value, []).append(position)
+
+    @staticmethod
+    def _discriminator(requirement: Requirement):
+        discriminator = getattr(type(requirement), "transition_discriminator", None) and \
+            requirement.transition_discriminator()
+        if not discriminator:
+            return None
+        key, values = discriminator
+        if isinstance(values, (str, bytes)):
+            return None
+        try:
+            hash(key)
+            set(values)
+        except TypeError:
+            return None
+        return key, values
+
+    @property
+    def is_useful(self) -> bool:
+        return bool(self._groups)
+
+    def candidates(self, text_preprocessing_result: Any, user: Any) -> List[str]:
+        positions = list(self._unindexed)
+        for requirement, buckets in self._groups.values():
+            try:
+                value = requirement.transition_value(text_preprocessing_result, user)
+                positions.extend(buckets.get(value, ()))
+            except Exception:
+                # полная проверка сама обработает (или выбросит) ошибку - как без индекса
+                return self.node_ids
+        positions.sort()
+        return [self.node_ids[position] for position in positions]
@@ -3,10 +3,12 @@ from typing import Dict, Any, List
 
 from core.basic_models.actions.command import Command
 from scenarios.scenario_descriptions.form_filling_scenario import FormFillingScenario
+from scenarios.scenario_descriptions.tree_scenario.transition_index import TransitionIndex
 from scenarios.scenario_descriptions.tree_scenario.tree_scenario_node import TreeScenarioNode
 from core.model.factory import dict_factory
 from core.monitoring.monitoring import monitoring
 from core.logging.logger_utils import log
+from core.utils.tracing import tracer
 import scenarios.logging.logger_constants as log_const
 from scenarios.scenario_models.history import Event, HistoryConstants
 
@@ -19,6 +21,9 @@ class TreeScenario(FormFillingScenario):
         self._start_node_key = items["start_node_key"]
         self._scenario_nodes = items["scenario_nodes"]
         self.scenario_nodes = self.build_scenario_nodes()
+        self.use_transition_index = items.get("transition_index", True)
+        self.debug_transitions = items.get("debug_transitions", False)
+        self._transition_indexes: Dict[str, TransitionIndex] = {}
 
     @dict_factory(TreeScenarioNode)
     def build_scenario_nodes(self):
@@ -43,21 +48,61 @@ class TreeScenario(FormFillingScenario):
         current_node = self.scenario_nodes[current_node_id]
         return current_node
 
-    def get_next_node(self, user, node, text_preprocessing_result, params):
-        available_node_keys = node.available_nodes
-        for key in available_node_keys:
+    def get_transition_index(self, node):
+        index = self._transition_indexes.get(node.id)
+        if index is None:
+            available_nodes = node.available_nodes or []
+            index = TransitionIndex(available_nodes,
+                                    [self.scenario_nodes[key].requirement for key in available_nodes])
+            self._transition_indexes[node.id] = index
+        return index
+
+    def _get_candidate_node_keys(self, user, node, text_preprocessing_result):
+        if not self.use_transition_index or not node.available_nodes:
+            return node.available_nodes
+        index = self.get_transition_index(node)
+        if not index.is_useful:
+            return node.available_nodes
+        return index.candidates(text_preprocessing_result, user)
+
+    def _find_next_node(self, user, node_keys, text_preprocessing_result, params, logging=True):
+        for key in node_keys or []:
             node = self.scenario_nodes[key]
-            log_params = {log_const.KEY_NAME: log_const.CHECKING_NODE_ID_VALUE,
-                          log_const.CHECKING_NODE_ID_VALUE: node.id}
-            log(log_const.CHECKING_NODE_ID_MESSAGE, user, log_params)
-            requirement_result = node.requirement.check(text_preprocessing_result, user, params)
+            if logging:
+                log_params = {log_const.KEY_NAME: log_const.CHECKING_NODE_ID_VALUE,
+                              log_const.CHECKING_NODE_ID_VALUE: node.id}
+                log(log_const.CHECKING_NODE_ID_MESSAGE, user, log_params)
+            with tracer.span("requirement", scenario=self.id, node=node.id):
+                requirement_result = node.requirement.check(text_preprocessing_result, user, params)
             if requirement_result:
-                log_params = {log_const.KEY_NAME: log_const.CHOSEN_NODE_ID_VALUE,
-                              log_const.CHOSEN_NODE_ID_VALUE: node.id}
-                log(log_const.CHOSEN_NODE_ID_MESSAGE, user, log_params)
-                self._add_loop_count(user, node.id)
                 return node
 
+    def _check_transition(self, user, node, next_node, text_preprocessing_result, params):
+        # отладочный режим: индекс переходов должен выбирать тот же узел, что и полный перебор
+        linear_node = self._find_next_node(user, node.available_nodes, text_preprocessing_result, params,
+                                           logging=False)
+        linear_node_id = linear_node.id if linear_node else None
+        next_node_id = next_node.id if next_node else None
+        if linear_node_id != next_node_id:
+            log_params = self._log_params()
+            log_params.update({"node": node.id, "indexed": next_node_id, "linear": linear_node_id})
+            log("Transition index mismatch in node %(node)s: indexed %(indexed)s, linear %(linear)s",
+                user, log_params, level="ERROR")
+            raise AssertionError(f"Transition index of scenario {self.id} in node {node.id} chose {next_node_id}, "
+                                 f"linear check chose {linear_node_id}")
+
+    def get_next_node(self, user, node, text_preprocessing_result, params):
+        node_keys = self._get_candidate_node_keys(user, node, text_preprocessing_result)
+        next_node = self._find_next_node(user, node_keys, text_preprocessing_result, params)
+        if self.debug_transitions and node_keys is not node.available_nodes:
+            self._check_transition(user, node, next_node, text_preprocessing_result, params)
+        if next_node:
+            log_params = {log_const.KEY_NAME: log_const.CHOSEN_NODE_ID_VALUE,
+                          log_const.CHOSEN_NODE_ID_VALUE: next_node.id}
+            log(log_const.CHOSEN_NODE_ID_MESSAGE, user, log_params)
+            self._add_loop_count(user, next_node.id)
+        return next_node
+
     def _get_form(self, user):
         forms = user.forms
         form = forms[self.form_type]
@@ -107,7 +152,8 @@ class TreeScenario(FormFillingScenario):
             for field_key, field_descr in internal_form.description.fields.items():
                 field = internal_form.fields[field_key]
                 if field.available:
-                    extracted = field_descr.filler.run(user, text_preprocessing_result, params)
+                    with tracer.span("filler", scenario=self.id, node=current_node.id, field=field_key):
+                        extracted = field_descr.filler.run(user, text_preprocessing_result, params)
                     if extracted is not None:
                         event = Event(type=HistoryConstants.types.FIELD_EVENT,
                                       scenario=self.root_id,
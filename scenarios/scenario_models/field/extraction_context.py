@@ -0,0 +1,60 @@
+import copy
+from functools import cached_property
+from typing import Any, Callable, Dict, Set
+
+from core.text_preprocessing.base import BaseTextPreprocessingResult
+from core.text_preprocessing.constants import SENTENCE_ENDPOINT_TOKEN
+
+
+class ExtractionContext:
+    """Общие для filler'ов представления одного сообщения и результаты filler'ов.
+
+    Создается один раз на сообщение (хранится в user.message_vars) и отдается всем filler'ам всех форм:
+    производные от текста представления считаются при первом обращении, результаты filler'ов с cache_result
+    запоминаются по содержимому описания filler'а, поэтому одинаковые filler'ы в разных формах не извлекают повторно.
+    Токенные представления (num_token_values, ccy_token_values, org/geo_token_values) считает за один проход
+    сам TextPreprocessingResult.
+    """
+    MESSAGE_VAR = "filler_extraction_context"
+
+    def __init__(self, text_preprocessing_result: BaseTextPreprocessingResult, message: Any = None) -> None:
+        self.text_preprocessing_result = text_preprocessing_result
+        self.message = message
+        self._filler_results: Dict[str, Any] = {}
+
+    @classmethod
+    def get(cls, text_preprocessing_result: BaseTextPreprocessingResult, user) -> "ExtractionContext":
+        if user is None:
+            return cls(text_preprocessing_result)
+        context = user.message_vars.get(cls.MESSAGE_VAR)
+        if isinstance(context, cls) and context.message is user.message:
+            if context.text_preprocessing_result is text_preprocessing_result:
+                return context
+            # другой текст в рамках того же сообщения (например, предыдущие сообщения): контекст не подменяем
+            return cls(text_preprocessing_result, user.message)
+        context = cls(text_preprocessing_result, user.message)
+        user.message_vars.set(cls.MESSAGE_VAR, context)
+        return context
+
+    @cached_property
+    def lowered_text(self) -> str:
+        return self.text_preprocessing_result.original_text.lower()
+
+    @cached_property
+    def original_words_set(self) -> Set[str]:
+        return {*self.text_preprocessing_result.original_text.split()}
+
+    @cached_property
+    def raw_text_phrase(self) -> str:
+        return " ".join(self.lowered_text.split()).rstrip("!.)")
+
+    @cached_property
+    def normalized_lemmas_set(self) -> Set[str]:
+        return {norm.get("lemma") for norm in self.text_preprocessing_result.tokenized_elements_list_pymorphy
+                if norm.get("token_type") != SENTENCE_ENDPOINT_TOKEN}
+
+    def filler_result(self, key: str, extract: Callable[[], Any]) -> Any:
+        if key not in self._filler_results:
+            self._filler_results[key] = extract()
+        # значение может изменить поле, в которое его запишут
+        return copy.deepcopy(self._filler_results[key])
@@ -1,4 +1,5 @@
 import collections
+import hashlib
 import json
 import operator
 import re
@@ -24,6 +25,7 @@ from core.utils.exception_handlers import exc_handler
 from core.utils.pickle_copy import pickle_deepcopy
 from core.utils.stats_timer import StatsTimer
 from core.utils.period_determiner import extract_words_describing_period, period_determiner
+from scenarios.scenario_models.field.extraction_context import ExtractionContext
 from scenarios.user.user_model import User
 
 field_filler_description = Registered()
@@ -32,14 +34,32 @@ field_filler_factory = build_factory(field_filler_description)
 
 
 class FieldFillerDescription:
-    """Базовый класс для filler'ов, содержайщий логику извлечения сущностей из текущего состояния смартапа"""
+    """Базовый класс для filler'ов, содержайщий логику извлечения сущностей из текущего состояния смартапа
+
+    Параметры:
+        items["cache_result"]   Запоминать ли результат в рамках обработки сообщения (ExtractionContext).
+                                Включено по умолчанию у filler'ов, результат которых зависит только от сообщения.
+                                Наследник, переопределяющий extract, не наследует cache_result - включает явно.
+                                Вызовы с params не запоминаются.
+    """
     version: Optional[int]
     id: Optional[str]
+    cache_result = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "extract" in cls.__dict__ and "cache_result" not in cls.__dict__:
+            cls.cache_result = False
 
     def __init__(self, items: Dict[str, Any], id: Optional[str] = None) -> None:
         items = items or {}
         self.id = id
         self.version = items.get("version", -1)
+        if "cache_result" in items:
+            self.cache_result = items["cache_result"]
+        self.hash_for_cache = hashlib.md5(
+            f"{self.__class__.__name__}{json.dumps(items, sort_keys=True, default=str)}".encode()
+        ).hexdigest() if self.cache_result else None
 
     def _log_params(self):
         return {
@@ -60,7 +80,11 @@ class FieldFillerDescription:
 
     def run(self, user: User, text_preprocessing_result: BaseTextPreprocessingResult,
             params: Optional[Dict[str, Any]] = None) -> None:
-        return self.extract(text_preprocessing_result, user, params)
+        if not self.cache_result or params:
+            return self.extract(text_preprocessing_result, user, params)
+        context = ExtractionContext.get(text_preprocessing_result, user)
+        return context.filler_result(self.hash_for_cache,
+                                     lambda: self.extract(text_preprocessing_result, user, params))
 
     def _postprocessing(self, user: User, item: str) -> None:
         last_scenario_name = user.last_scenarios.last_scenario_name
@@ -140,6 +164,8 @@ class AvailableInfoFiller(FieldFillerDescription):
 
 
 class FirstNumberFiller(FieldFillerDescription):
+    cache_result = True
+
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[int]:
@@ -153,6 +179,7 @@ class FirstNumberFiller(FieldFillerDescription):
 
 
 class FirstCurrencyFiller(FieldFillerDescription):
+    cache_result = True
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
@@ -167,6 +194,7 @@ class FirstCurrencyFiller(FieldFillerDescription):
 
 
 class FirstOrgFiller(FieldFillerDescription):
+    cache_result = True
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
@@ -181,6 +209,7 @@ class FirstOrgFiller(FieldFillerDescription):
 
 
 class FirstGeoFiller(FieldFillerDescription):
+    cache_result = True
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
@@ -195,6 +224,7 @@ class FirstGeoFiller(FieldFillerDescription):
 
 
 class RegexpFieldFiller(FieldFillerDescription):
+    cache_result = True
     regexp: str
     delimiter: Optional[str]
 
@@ -217,6 +247,7 @@ class RegexpFieldFiller(FieldFillerDescription):
 
 
 class RegexpAndStringOperationsFieldFiller(RegexpFieldFiller):
+    cache_result = True
     regexp: str
     delimiter: Optional[str]
     operations: List[Dict]
@@ -250,6 +281,7 @@ class RegexpAndStringOperationsFieldFiller(RegexpFieldFiller):
 
 
 class AllRegexpsFieldFiller(FieldFillerDescription):
+    cache_result = True
     exps: Optional[List[str]]
     delimiter: Optional[str]
     original_text_lower: Optional[bool]
@@ -264,9 +296,10 @@ class AllRegexpsFieldFiller(FieldFillerDescription):
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[str]:
-        original_text = text_preprocessing_result.original_text
         if self.original_text_lower:
-            original_text = original_text.lower()
+            original_text = ExtractionContext.get(text_preprocessing_result, user).lowered_text
+        else:
+            original_text = text_preprocessing_result.original_text
         matches = []
         for r in self.regexps:
             matches.extend(r.findall(original_text))
@@ -280,6 +313,7 @@ class AllRegexpsFieldFiller(FieldFillerDescription):
 
 
 class FirstPersonFiller(FieldFillerDescription):
+    cache_result = True
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: BaseTextPreprocessingResult, user: User,
@@ -335,45 +369,107 @@ class UserIdFiller(FieldFillerDescription):
 
 
 class IntersectionFieldFiller(FieldFillerDescription):
+    """Заполняет поле ключом первого кейса, все леммы которого есть в сообщении (strict - леммы совпадают).
+
+    Кейсы нормализуются при загрузке; если задан app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH,
+    результаты нормализации сохраняются в файл и при следующем старте берутся из него.
+    Для поиска строится индекс: кейс попадает в список своей самой редкой леммы (strict - в словарь по набору лемм),
+    на сообщение проверяются только кейсы из списков лемм сообщения.
+    """
+    cache_result = True
     cases: Optional[Dict[str, List[str]]]
+    _cases_normalizers: Dict[str, Any] = {}
+    _unsaved_cases_normalizers: Dict[str, Any] = {}
 
     def __init__(self, items: Optional[Dict[str, Any]], id: Optional[str] = None) -> None:
         super(IntersectionFieldFiller, self).__init__(items, id)
         self.cases = items.get("cases") or {}
         self.default = items.get("default")
-        if items.get("strict"):
+        self.strict = bool(items.get("strict"))
+        if self.strict:
             self.operator = operator.eq
         else:
             self.operator = operator.ge
 
         from smart_kit.configs import get_app_config
         app_config = get_app_config()
+        normalizer = self._get_cases_normalizer(app_config)
+        cached_count = len(normalizer.cache.storage) if normalizer is not app_config.NORMALIZER else None
 
         self.normalized_cases = []
         for key, val in self.cases.items():
             tokens_list = []
-            for message in app_config.NORMALIZER.normalize_sequence(val):
+            for message in normalizer.normalize_sequence(val):
                 case = set()
                 for norm in message["tokenized_elements_list"]:
                     if norm.get("token_type") != "SENTENCE_ENDPOINT_TOKEN":
                         case.add(norm.get("lemma"))
                 tokens_list.append(case)
             self.normalized_cases.append((key, tokens_list))
+        if cached_count is not None and len(normalizer.cache.storage) != cached_count:
+            self._unsaved_cases_normalizers[app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH] = normalizer
+        self._build_index()
+
+    @classmethod
+    def save_cases_normalization(cls) -> None:
+        """Сохраняет новые результаты нормализации кейсов; вызывается после загрузки описаний"""
+        while cls._unsaved_cases_normalizers:
+            path, normalizer = cls._unsaved_cases_normalizers.popitem()
+            normalizer.save(path)
+
+    @classmethod
+    def _get_cases_normalizer(cls, app_config):
+        path = getattr(app_config, "DESCRIPTIONS_NORMALIZATION_CACHE_PATH", None)
+        if not isinstance(path, str):
+            return app_config.NORMALIZER
+        normalizer = cls._cases_normalizers.get(path)
+        if normalizer is None or normalizer.normalizer is not app_config.NORMALIZER:
+            from smart_kit.text_preprocessing.cached_text_normalizer import CachedTextNormalizer
+            normalizer = CachedTextNormalizer.from_file(app_config.NORMALIZER, path)
+            cls._cases_normalizers[path] = normalizer
+        return normalizer
+
+    def _build_index(self):
+        # кейсы в порядке проверки, индексы хранят позиции в этом списке
+        self._cases = [(key, tokens) for key, tokens_list in self.normalized_cases for tokens in tokens_list]
+        self._exact_index: Dict[frozenset, int] = {}
+        self._lemma_index: Dict[str, List[int]] = collections.defaultdict(list)
+        self._always_matched: List[int] = []
+        if self.strict:
+            for position, (_, tokens) in enumerate(self._cases):
+                self._exact_index.setdefault(frozenset(tokens), position)
+            return
+        frequency = collections.Counter(lemma for _, tokens in self._cases for lemma in tokens)
+        for position, (_, tokens) in enumerate(self._cases):
+            if not tokens:
+                self._always_matched.append(position)
+                continue
+            rarest = min(tokens, key=lambda lemma: (frequency[lemma], str(lemma)))
+            self._lemma_index[rarest].append(position)
+
+    def _find_case(self, tpr_tokenized_set):
+        if self.strict:
+            return self._exact_index.get(frozenset(tpr_tokenized_set))
+        candidates = list(self._always_matched)
+        for lemma in tpr_tokenized_set:
+            candidates.extend(self._lemma_index.get(lemma, ()))
+        for position in sorted(candidates):
+            if self.operator(tpr_tokenized_set, self._cases[position][1]):
+                return position
 
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: TextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[str]:
-        tpr_tokenized_set = {norm.get("lemma") for norm in text_preprocessing_result.tokenized_elements_list_pymorphy if
-                             norm.get("token_type") != "SENTENCE_ENDPOINT_TOKEN"}
-        for key, tokens_list in self.normalized_cases:
-            for tokens in tokens_list:
-                if self.operator(tpr_tokenized_set, tokens):
-                    log_params = self._log_params()
-                    log_params["words_tokenized_set"] = str(tpr_tokenized_set)
-                    log_params["tokens"] = str(tokens)
-                    message = "Filler: %(filler)s, words_normalized_set: %(words_tokenized_set)s, tokens: %(tokens)s"
-                    log(message, user, log_params)
-                    return key
+        tpr_tokenized_set = ExtractionContext.get(text_preprocessing_result, user).normalized_lemmas_set
+        position = self._find_case(tpr_tokenized_set)
+        if position is not None:
+            key, tokens = self._cases[position]
+            log_params = self._log_params()
+            log_params["words_tokenized_set"] = str(tpr_tokenized_set)
+            log_params["tokens"] = str(tokens)
+            message = "Filler: %(filler)s, words_normalized_set: %(words_tokenized_set)s, tokens: %(tokens)s"
+            log(message, user, log_params)
+            return key
         if self.default:
             return self.default
 
@@ -435,6 +531,7 @@ class DatePeriodFiller(FieldFillerDescription):
 
 
 class IntersectionOriginalTextFiller(FieldFillerDescription):
+    cache_result = True
 
     def __init__(self, items: Optional[Dict[str, Any]], id: Optional[str] = None) -> None:
         super(IntersectionOriginalTextFiller, self).__init__(items, id)
@@ -454,7 +551,7 @@ class IntersectionOriginalTextFiller(FieldFillerDescription):
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: TextPreprocessingResult, user: User,
                 params: Dict[str, Any] = None) -> Optional[str]:
-        tpr_original_set = {*text_preprocessing_result.original_text.split()}
+        tpr_original_set = ExtractionContext.get(text_preprocessing_result, user).original_words_set
         for key, tokens_list in self.original_cases:
             for tokens in tokens_list:
                 if tpr_original_set >= tokens and not self._check_exceptions(key, tpr_original_set):
@@ -467,6 +564,7 @@ class IntersectionOriginalTextFiller(FieldFillerDescription):
 
 
 class ApproveFiller(FieldFillerDescription):
+    cache_result = True
     yes_words: Optional[List]
     no_words: Optional[List]
 
@@ -512,10 +610,12 @@ class ApproveFiller(FieldFillerDescription):
 
 
 class ApproveRawTextFiller(ApproveFiller):
+    cache_result = True
+
     @exc_handler(on_error_obj_method_name="on_extract_error")
     def extract(self, text_preprocessing_result: TextPreprocessingResult,
                 user: User, params: Dict[str, Any] = None) -> Optional[bool]:
-        original_text = ' '.join(text_preprocessing_result.original_text.split()).lower().rstrip('!.)')
+        original_text = ExtractionContext.get(text_preprocessing_result, user).raw_text_phrase
         if original_text in self.set_yes_words:
             params = self._log_params()
             params["original_text"] = original_text
@@ -540,6 +640,7 @@ class ClassifierFiller(FieldFillerDescription):
     Запрос клиента проходит классификацию на основе внешнего классификатора, после чего в качестве ответа
     берётся класс с максимальной вероятностью.
     """
+    cache_result = True
 
     def __init__(self, items: Optional[Dict[str, Any]], id: Optional[str] = None) -> None:
         super(ClassifierFiller, self).__init__(items, id)
@@ -62,6 +62,12 @@ class Forms(LazyItems):
         for descr_id in to_remove:
             self.remove_item(descr_id)
 
+    def next_expire_time(self):
+        raw = self.raw
+        if any(description_id not in self.descriptions for description_id in raw):
+            return 0
+        return min((item["remove_time"] for item in raw.values() if item and item.get("remove_time")), default=None)
+
     def clear_all(self):
         self._raw_items.clear()
         self._items.clear()
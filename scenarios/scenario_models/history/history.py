@@ -1,5 +1,7 @@
+import sys
+from collections import deque
 from time import time
-from typing import Dict, Any, Optional, NamedTuple, List, Union, TYPE_CHECKING
+from typing import Dict, Any, Optional, NamedTuple, List, Union, Deque, TYPE_CHECKING
 
 from core.logging.logger_utils import log
 
@@ -8,58 +10,146 @@ if TYPE_CHECKING:
     from scenarios.user.user_model import User
 
 
-class Event(NamedTuple):
+class _EventFields(NamedTuple):
     type: Optional[str] = None
     scenario: Optional[str] = None
     scenario_version: Optional[str] = None
     node: Optional[str] = None
     result: Optional[str] = None
     content: Optional[Dict[str, str]] = None
-    created_time: float = time()
+    created_time: Optional[float] = None
+
+
+class Event(_EventFields):
+    """Событие истории; created_time по умолчанию - время создания события"""
+    __slots__ = ()
+
+    def __new__(cls, type=None, scenario=None, scenario_version=None, node=None, result=None, content=None,
+                created_time=None):
+        return super().__new__(cls, type, scenario, scenario_version, node, result, content,
+                               time() if created_time is None else created_time)
 
     def to_dict(self) -> Dict[str, Any]:
         return self._asdict()
 
 
 class History:
-
-    _events: List[Event]
+    """
+    События хранятся по колонкам (Event._fields), типы событий и имена сценариев интернированы.
+    Колонки - кольцевые буферы на description.max_events последних событий.
+    raw в формате description.encoding:
+        columnar - {"columns": {колонка: [значения]}, "values": {"type"/"scenario": [словарь]}}, в колонках type и
+                   scenario - индексы в словаре, колонки из одних None не пишутся
+        events - список событий {"events": [{...}]}, как до columnar
+    При загрузке читаются оба формата.
+    """
+    COLUMNAR_ENCODING = "columnar"
+    EVENTS_ENCODING = "events"
+    INTERNED_COLUMNS = ("type", "scenario")
+
+    _columns: Dict[str, Deque]
     _description: 'HistoryDescription'
 
     def __init__(self, items: Dict[str, Any], description: 'HistoryDescription', user: 'User'):
         items = items or {}
         self._description = description
-        self._events = [Event(**e) for e in items.get('events', [])]
+        self._columns = {name: deque(maxlen=description.max_events) for name in Event._fields}
+        self._ordered = True
+        if "columns" in items:
+            self._load_columns(items["columns"], items.get("values", {}))
+        else:
+            for event in items.get("events", []):
+                self._append(Event(**event))
         if not self._description.enabled:
             log("History: scenario history events logging disabled", level="WARNING")
 
+    def _load_columns(self, columns: Dict[str, List], values: Dict[str, List[str]]):
+        size = len(columns.get("created_time", []))
+        for name in Event._fields:
+            column = columns.get(name)
+            if column is None:
+                column = [None] * size
+            elif name in self.INTERNED_COLUMNS:
+                dictionary = [sys.intern(value) for value in values[name]]
+                column = [dictionary[index] if index is not None else None for index in column]
+            self._columns[name].extend(column)
+        self._check_order()
+
+    def _check_order(self):
+        created_time = self._columns["created_time"]
+        self._ordered = all(created_time[i] <= created_time[i + 1] for i in range(len(created_time) - 1))
+
+    def _append(self, event: Event):
+        created_time = self._columns["created_time"]
+        if created_time and event.created_time < created_time[-1]:
+            self._ordered = False
+        for name, value in zip(Event._fields, event):
+            if name in self.INTERNED_COLUMNS and isinstance(value, str):
+                value = sys.intern(value)
+            self._columns[name].append(value)
+
     @property
     def raw(self) -> Dict[str, Any]:
-        return {
-            "events": [e.to_dict() for e in self.get_raw_events()]
-        }
+        if self._description.encoding == self.EVENTS_ENCODING:
+            return {
+                "events": [e.to_dict() for e in self.get_raw_events()]
+            }
+        if not self._columns["created_time"]:
+            return {}
+        columns = {}
+        values = {}
+        for name, column in self._columns.items():
+            if all(value is None for value in column):
+                continue
+            if name in self.INTERNED_COLUMNS:
+                indexes = {}
+                column = [indexes.setdefault(value, len(indexes)) if value is not None else None for value in column]
+                values[name] = list(indexes)
+            else:
+                column = list(column)
+            columns[name] = column
+        return {"columns": columns, "values": values}
 
     @property
     def enabled(self) -> bool:
         return self._description.enabled
 
     def get_events(self) -> List[Union[NamedTuple, Dict[str, Any]]]:
-        return self._description.formatter.format(self._events)
+        return self._description.formatter.format(self.get_raw_events())
 
     def get_raw_events(self) -> List[Event]:
-        return self._events
+        return [Event._make(row) for row in zip(*self._columns.values())]
 
     def add_event(self, event: Event):
         if self.enabled:
-            self._events.append(event)
+            self._append(event)
 
     def clear(self):
-        self._events.clear()
+        for column in self._columns.values():
+            column.clear()
+        self._ordered = True
+
+    def next_expire_time(self) -> Optional[float]:
+        created_time = self._columns["created_time"]
+        if not created_time:
+            return None
+        oldest = created_time[0] if self._ordered else min(created_time)
+        return oldest + self._description.event_expiration_delay
 
     def expire(self):
         now = time()
-        non_expired = []
-        for event in self._events:
-            if event.created_time + self._description.event_expiration_delay > now:
-                non_expired.append(event)
-        self._events = non_expired
+        delay = self._description.event_expiration_delay
+        created_time = self._columns["created_time"]
+        if self._ordered:
+            # события упорядочены по времени: удаляем с начала до первого неистекшего
+            count = 0
+            while count < len(created_time) and created_time[count] + delay <= now:
+                count += 1
+            for column in self._columns.values():
+                for _ in range(count):
+                    column.popleft()
+            return
+        keep = [created + delay > now for created in created_time]
+        for name, column in self._columns.items():
+            self._columns[name] = deque((value for value, kept in zip(column, keep) if kept), maxlen=column.maxlen)
+        self._check_order()
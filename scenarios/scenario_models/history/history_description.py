@@ -1,5 +1,5 @@
 from functools import cached_property
-from typing import Union
+from typing import Optional, Union
 
 from core.model.factory import factory
 from scenarios.scenario_models.history import EventFormatter
@@ -8,13 +8,20 @@ from scenarios.scenario_models.history import EventFormatter
 class HistoryDescription:
     enabled: bool
     event_expiration_delay: Union[int, float]
+    max_events: Optional[int]
+    encoding: str
 
     EVENT_EXPIRATION_DELAY = 60
+    MAX_EVENTS = 100
+    # "columnar" включается в history.json, когда все инстансы приложения умеют его читать
+    ENCODING = "events"
 
     def __init__(self, items, id=None):
         self.id = id
         self.enabled = items.get("enabled", False)
         self.event_expiration_delay = items.get("event_expiration_delay", self.EVENT_EXPIRATION_DELAY)
+        self.max_events = items.get("max_events", self.MAX_EVENTS)
+        self.encoding = items.get("encoding", self.ENCODING)
         self._formatter = items.get("formatter")
 
     @cached_property
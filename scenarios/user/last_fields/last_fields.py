@@ -32,6 +32,9 @@ class LastFields:
             if remove_time and remove_time <= int(time.time()):
                 self.remove(key)
 
+    def next_expire_time(self):
+        return min((item["remove_time"] for item in self.raw.values() if item.get("remove_time")), default=None)
+
     def remove(self, key):
         if key in self._raw_items:
             self._raw_items.pop(key)
@@ -32,7 +32,7 @@ class LastScenarios:
     def clear_all(self):
         self.scenarios_names = []
 
-    def expire(self):
+    def _get_expired(self):
         to_remove = []
         scenario_descriptions = self.user.descriptions["scenarios"]
         forms = self.user.forms
@@ -50,10 +50,16 @@ class LastScenarios:
             form_key = scenario_description.form_type
             if not forms[form_key]:
                 to_remove.append(scenario_id)
+        return to_remove
 
-        for scenario_id in to_remove:
+    def expire(self):
+        for scenario_id in self._get_expired():
             self.delete(scenario_id)
 
+    def next_expire_time(self):
+        """Сценарии удаляются не по времени, а вместе с формами: срок наступает сразу, если удалять есть что"""
+        return 0 if self._get_expired() else None
+
     @property
     def raw(self):
         return self.scenarios_names
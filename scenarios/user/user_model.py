@@ -1,9 +1,9 @@
-import json
 from functools import cached_property
 
 from core.logging.logger_utils import log
-from core.model.field import Field
+from core.model.field import Field, UserDescription
 from core.model.base_user import BaseUser
+from core.utils import json_codec
 
 from scenarios.scenario_models.scenario_models import ScenarioModels
 from scenarios.scenario_models.forms.forms import Forms
@@ -27,10 +27,24 @@ class User(BaseUser):
     behaviors: Behaviors
     history: History
 
+    FIELDS = BaseUser.FIELDS + [
+        Field("forms", Forms, UserDescription("forms")),
+        Field("last_fields", LastFields),
+        Field("last_scenarios", LastScenarios, UserDescription("last_scenarios")),
+        Field("scenario_models", ScenarioModels, UserDescription("scenarios")),
+        Field("preprocessing_messages_for_scenarios", PreprocessingScenariosMessages,
+              UserDescription("preprocessing_messages_for_scenarios")),
+        Field("behaviors", Behaviors, UserDescription("behaviors")),
+        Field("history", History, UserDescription("history")),
+        Field("gender_selector", ReplySelector),
+    ]
+    EXPIRABLE_FIELDS = BaseUser.EXPIRABLE_FIELDS + ["behaviors", "forms", "last_fields", "last_scenarios", "history"]
+    EXPIRY_DEPENDENCIES = {"last_scenarios": ("forms",)}
+
     def __init__(self, id, message, db_data, settings, descriptions, parametrizer_cls, load_error=False):
         self.settings = settings
         try:
-            user_values = json.loads(db_data) if db_data else None
+            user_values = json_codec.loads(db_data) if db_data else None
         except ValueError:
             user_values = None
             monitoring.counter_load_error(settings.app_name)
@@ -51,26 +65,19 @@ class User(BaseUser):
                     "uid": str(self.id), log_const.KEY_NAME: "user_load"})
         self.behaviors.initialize()
 
-    @property
-    def fields(self):
-        return super().fields + [Field("forms", Forms, self.descriptions["forms"]),
-                                 Field("last_fields", LastFields),
-                                 Field("last_scenarios", LastScenarios, self.descriptions["last_scenarios"]),
-                                 Field("scenario_models", ScenarioModels, self.descriptions["scenarios"]),
-                                 Field("preprocessing_messages_for_scenarios", PreprocessingScenariosMessages,
-                                       self.descriptions["preprocessing_messages_for_scenarios"]),
-                                 Field("behaviors", Behaviors, self.descriptions["behaviors"]),
-                                 Field("history", History, self.descriptions["history"]),
-                                 Field("gender_selector", ReplySelector)]
-
     @cached_property
     def parametrizer(self):
         return self.__parametrizer_cls(self, {})
 
-    def expire(self):
-        super().expire()
-        self.behaviors.expire()
-        self.forms.expire()
-        self.last_fields.expire()
-        self.last_scenarios.expire()
-        self.history.expire()
+    def _need_expire(self, name, expired) -> bool:
+        if super()._need_expire(name, expired):
+            return True
+        # описания могли обновиться после сохранения, элементы удаленных описаний удаляются в expire
+        if name == "forms":
+            forms = self.descriptions["forms"]
+            return any(form_id not in forms for form_id in self.get_lazy_raw(name) or {})
+        if name == "last_scenarios":
+            scenarios = self.descriptions["scenarios"]
+            return any(scenario_id not in scenarios or not hasattr(scenarios[scenario_id], "form_type")
+                       for scenario_id in self.get_lazy_raw(name) or [])
+        return False
@@ -9,11 +9,16 @@ from smart_kit.names.message_names import ANSWER_TO_USER
 
 
 def combine_answer_to_user(commands: typing.List[Command]) -> Command:
-    from smart_kit.configs import get_app_config
-    _ = get_app_config()
-
-    answer = Command(name=ANSWER_TO_USER, request_data=commands[0].request_data, request_type=commands[0].request_type)
+    """
+    Объединяет ANSWER_TO_USER в одну команду за один проход. Payload ответа - payload первой команды,
+    остальные вливаются в него без копирования; payload исходных команд при этом изменяются.
+    """
+    first = commands[0]
+    answer = Command(name=ANSWER_TO_USER, request_data=first.request_data, request_type=first.request_type)
+    payload = answer.payload = first.payload
     summary_pronounce_text = []
+    items = []
+    has_items = False
     auto_listening = None
     for command in commands:
         if command.request_data != answer.request_data:
@@ -21,64 +26,69 @@ def combine_answer_to_user(commands: typing.List[Command]) -> Command:
         if command.request_type != answer.request_type:
             raise ValueError(f"Cant combine {ANSWER_TO_USER} commands, request_type is different")
 
-        payload = command.payload
-
-        pronounce_text = payload.pop(field.PRONOUNCE_TEXT, None)
-        items = payload.pop(field.ITEMS, None)
+        command_payload = command.payload
+        pronounce_text = command_payload.pop(field.PRONOUNCE_TEXT, None)
+        command_items = command_payload.pop(field.ITEMS, None)
 
         if auto_listening is None:
-            auto_listening = payload.get(field.AUTO_LISTENING, None)
+            auto_listening = command_payload.get(field.AUTO_LISTENING, None)
 
         if pronounce_text:
             summary_pronounce_text.append(pronounce_text)
 
-        if items is not None:
-            answer.payload.setdefault(field.ITEMS, []).extend(items)
+        if command_items is not None:
+            has_items = True
+            items.extend(command_items)
 
-        answer.payload.update(payload)
+        if command_payload is not payload:
+            payload.update(command_payload)
 
+    if has_items:
+        payload[field.ITEMS] = items
     if summary_pronounce_text:
-        answer.payload[field.PRONOUNCE_TEXT] = " ".join(summary_pronounce_text)
-    answer.payload[field.AUTO_LISTENING] = auto_listening
+        payload[field.PRONOUNCE_TEXT] = " ".join(summary_pronounce_text)
+    payload[field.AUTO_LISTENING] = auto_listening
 
     return answer
 
 
 def combine_commands(commands: typing.List[Command], user: User, **kwargs) -> typing.List[Command]:
+    """Заменяет в commands все ANSWER_TO_USER одной объединенной командой в конце списка"""
     user_answers = []
-
+    other_commands = []
     for command in commands:
         if command.name == ANSWER_TO_USER:
             user_answers.append(command)
+        else:
+            other_commands.append(command)
 
-    for user_answer in user_answers:
-        commands.remove(user_answer)
+    if not user_answers:
+        return commands
+    commands[:] = other_commands
 
-    if user_answers:
-        answer_to_user = combine_answer_to_user(user_answers)
-        last_scenario_name = user.last_scenarios.last_scenario_name
-        if field.INTENT not in answer_to_user.payload:
-            if last_scenario_name is not None:
-                answer_to_user.payload[field.INTENT] = last_scenario_name
+    answer_to_user = combine_answer_to_user(user_answers)
+    payload = answer_to_user.payload
+    last_scenario_name = user.last_scenarios.last_scenario_name
+    if field.INTENT not in payload:
+        if last_scenario_name is not None:
+            payload[field.INTENT] = last_scenario_name
 
-        debug_info = answer_to_user.payload.setdefault(field.DEBUG_INFO, {})
-        debug_info[field.INTENT] = last_scenario_name
-        debug_info[field.DEBUG_INFO_APP_KEY] = user.message.app_info.project_id
+    debug_info = payload.setdefault(field.DEBUG_INFO, {})
+    debug_info[field.INTENT] = last_scenario_name
+    debug_info[field.DEBUG_INFO_APP_KEY] = user.message.app_info.project_id
 
-        if field.FINISHED not in answer_to_user.payload:
-            finished = last_scenario_name is None
-            answer_to_user.payload[field.FINISHED] = finished
+    if field.FINISHED not in payload:
+        payload[field.FINISHED] = last_scenario_name is None
 
+    if payload.get(field.AUTO_LISTENING) is None:
         from smart_kit.configs import get_app_config
-        config = get_app_config()
-        if answer_to_user.payload.get(field.AUTO_LISTENING) is None:
-            answer_to_user.payload[field.AUTO_LISTENING] = config.AUTO_LISTENING
+        payload[field.AUTO_LISTENING] = get_app_config().AUTO_LISTENING
 
-        events = user.history.get_events()
-        if events and user.history.enabled:
-            history_data = dict()
-            history_data[field.EVENTS] = events
-            answer_to_user.payload[field.HISTORY_DATA] = history_data
+    history = user.history
+    if history.enabled:
+        events = history.get_events()
+        if events:
+            payload[field.HISTORY_DATA] = {field.EVENTS: events}
 
-        commands.append(answer_to_user)  # Order isnt important
+    commands.append(answer_to_user)  # Order isnt important
     return commands
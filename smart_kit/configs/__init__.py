@@ -72,6 +72,8 @@ def get_app_config(environment_variable=ENVIRONMENT_VARIABLE):
 
     set_default(app_config, "NORMALIZATION_CACHE_TTL", 0)
     set_default(app_config, "NORMALIZATION_CACHE", JSONCache)
+    # файл с нормализованными заранее текстами описаний (кейсы IntersectionFieldFiller), None - не сохранять
+    set_default(app_config, "DESCRIPTIONS_NORMALIZATION_CACHE_PATH", None)
 
     set_default(app_config, "PLUGINS", ())
     set_default(app_config, "TO_MSG_VALIDATORS", ())
@@ -41,6 +41,14 @@ class TestsCommand(AppCommand):
         run_command = self.parser.add_argument_group("Running")
         run_command.add_argument("--make-csv", dest="make_csv", help="Create csv file for tests results",
                                  action="store_true")
+        run_command.add_argument("--workers", dest="workers", type=int, default=None,
+                                 help="Run test files in N forked processes")
+        run_command.add_argument("--concurrency", dest="concurrency", type=int, default=None,
+                                 help="Run up to N test cases concurrently in each process")
+        run_command.add_argument("--durations", dest="durations", default=None,
+                                 help="Write per test case durations to csv file")
+        run_command.add_argument("--normalization-cache", dest="normalization_cache", default=None,
+                                 help="Json file to keep normalization results between runs")
         run_command.add_argument("--ssml-off", dest="ssml_off", help="Do not run SSML tests", action="store_true")
         run_command.add_argument("--scenarios-off", dest="scenarios_off", help="Do not run scenarios tests",
                                  action="store_true")
@@ -74,7 +82,7 @@ class TestsCommand(AppCommand):
                         self.parser.error("Scenario tests require path")
                     print("Testing scenarios...")
                     tests_ok = self.run_scenario_tests(namespace.path, namespace.predefined_fields_storage,
-                                                       namespace.make_csv)
+                                                       namespace.make_csv, **self._suite_options(namespace))
                     print("Testing scenarios done\n")
                 else:
                     print("Scenarios tests are off. Skipping them.")
@@ -118,7 +126,17 @@ class TestsCommand(AppCommand):
                     if not update:
                         raise
 
-    def run_scenario_tests(self, path, predefined_fields_storage, make_csv) -> bool:
+    @staticmethod
+    def _suite_options(namespace) -> dict:
+        options = {
+            "workers": namespace.workers,
+            "concurrency": namespace.concurrency,
+            "durations_path": namespace.durations,
+            "normalization_cache_path": namespace.normalization_cache,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+    def run_scenario_tests(self, path, predefined_fields_storage, make_csv, **suite_options) -> bool:
         path = define_path(path)
         predefined_fields_storage = define_path(predefined_fields_storage)
         if not os.path.exists(path):
@@ -128,7 +146,7 @@ class TestsCommand(AppCommand):
             print(f"[!] Predefined fields storage file does not found, check file path: {predefined_fields_storage}")
             return False
         else:
-            return TestSuite(path, self.app_config, predefined_fields_storage, make_csv).run()
+            return TestSuite(path, self.app_config, predefined_fields_storage, make_csv, **suite_options).run()
 
     def run_ssml_tests(self) -> bool:
         settings = self.app_config.SETTINGS(
@@ -3,15 +3,36 @@ from typing import Iterable
 import json
 from copy import copy
 
-from core.utils.masking_message import masking
+from core.utils.masking_message import masking, MaskedView
+from core.utils import json_codec
 from core.message.msg_validator import MessageValidator
 from smart_kit.request.kafka_request import SmartKitKafkaRequest
 from smart_kit.utils import SmartAppToMessage_pb2
 
 
+def _set_protobuf_value(target, value):
+    """Fill google.protobuf.Value in place, without intermediate JSON serialization"""
+    if value is None:
+        target.null_value = 0
+    elif isinstance(value, bool):
+        target.bool_value = value
+    elif isinstance(value, (int, float)):
+        target.number_value = value
+    elif isinstance(value, str):
+        target.string_value = value
+    elif isinstance(value, dict):
+        target.struct_value.update(value)
+    elif isinstance(value, (list, tuple)):
+        target.list_value.extend(value)
+    else:
+        raise ValueError(f"Unexpected type {type(value)} for protobuf value")
+
+
 class SmartAppToMessage:
     ROOT_NODES_KEY = "root_nodes"
     PAYLOAD = "payload"
+    JSON_LOADER = "json.dumps"
+    PROTOBUF_LOADER = "protobuf"
 
     def __init__(self, command, message, request: SmartKitKafkaRequest, forward_fields=None, masking_fields=None,
                  validators: Iterable[MessageValidator] = ()):
@@ -53,28 +74,44 @@ class SmartAppToMessage:
         message.messageId = data_as_dict["messageId"]
         message.sessionId = data_as_dict["sessionId"]
         message.messageName = data_as_dict["messageName"]
-        message.payload = data_as_dict["payload"]
-        uuid = message.uuid.add()
-        uuid.userId = data_as_dict["uuid"]["userId"]
-        uuid.userChannel = data_as_dict["uuid"]["userChannel"]
+        for key, value in data_as_dict["payload"].items():
+            _set_protobuf_value(message.payload[key], value)
+        message.uuid.userId = data_as_dict["uuid"]["userId"]
+        message.uuid.userChannel = data_as_dict["uuid"]["userChannel"]
         return message
 
+    @cached_property
+    def protobuf_message(self):
+        # as_dict is built anyway for validation and masked views; it is a shallow container, so the only real
+        # work here is converting payload values into google.protobuf.Value once
+        return self.as_protobuf_message(self.as_dict)
+
+    @cached_property
+    def masked_view(self) -> MaskedView:
+        """Masked representation for logs, masking is done only if the record is actually written"""
+        return MaskedView(self.as_dict, self.masking_fields)
+
     @cached_property
     def masked_value(self):
-        masked_data = masking(self.as_dict, self.masking_fields)
-        if self.command.loader == "json.dumps":
-            return json.dumps(masked_data, ensure_ascii=False)
-        elif self.command.loader == "protobuf":
-            protobuf_message = self.as_protobuf_message(masked_data)
+        if self.command.loader == self.JSON_LOADER:
+            return str(self.masked_view)
+        elif self.command.loader == self.PROTOBUF_LOADER:
+            protobuf_message = self.as_protobuf_message(masking(self.as_dict, self.masking_fields))
             return protobuf_message.SerializeToString()
 
+    @property
+    def masked_request_value(self):
+        """Masked value in the format of the loader: lazy masked_view for JSON, masked protobuf bytes for protobuf"""
+        if self.command.loader == self.PROTOBUF_LOADER:
+            return self.masked_value
+        return self.masked_view
+
     @cached_property
     def value(self):
-        if self.command.loader == "json.dumps":
-            return json.dumps(self.as_dict, ensure_ascii=False)
-        elif self.command.loader == "protobuf":
-            protobuf_message = self.as_protobuf_message(self.as_dict)
-            return protobuf_message.SerializeToString()
+        if self.command.loader == self.JSON_LOADER:
+            return json_codec.dumps(self.as_dict, ensure_ascii=False)
+        elif self.command.loader == self.PROTOBUF_LOADER:
+            return self.protobuf_message.SerializeToString()
 
     def validate(self):
         for validator in self.validators:
@@ -9,6 +9,7 @@ import scenarios.logging.logger_constants as log_const
 from scenarios.scenario_descriptions.form_filling_scenario import FormFillingScenario
 from smart_kit.system_answers.nothing_found_action import NothingFoundAction
 from core.monitoring.monitoring import monitoring
+from core.utils.tracing import tracer
 
 
 class DialogueManager:
@@ -19,11 +20,15 @@ class DialogueManager:
             params={log_const.KEY_NAME: log_const.STARTUP_VALUE})
         self.scenario_descriptions = scenario_descriptions
         self.scenarios = scenario_descriptions["scenarios"]
-        self.scenario_keys = set(self.scenarios.get_keys())
         self.actions = scenario_descriptions["external_actions"]
         self.app_name = app_name
         log(f"{self.__class__.__name__}.__init__ finished.", params={log_const.KEY_NAME: log_const.STARTUP_VALUE})
 
+    @property
+    def scenario_keys(self):
+        # описания сценариев обновляются на месте при горячей перезагрузке, поэтому ключи не кешируются
+        return set(self.scenarios.get_keys())
+
     @cached_property
     def _nothing_found_action(self):
         return self.actions.get(self.NOTHING_FOUND_ACTION) or NothingFoundAction()
@@ -56,7 +61,8 @@ class DialogueManager:
                   log_const.SCENARIO_DESCRIPTION_VALUE: scenario.scenario_description
                   }
         log(log_const.LAST_SCENARIO_MESSAGE, user, params)
-        run_scenario_result = await scenario.run(text_preprocessing_result, user)
+        with tracer.span("scenario", scenario=scen_id):
+            run_scenario_result = await scenario.run(text_preprocessing_result, user)
 
         actual_last_scenario = user.last_scenarios.last_scenario_name
         if actual_last_scenario and actual_last_scenario != initial_last_scenario:
@@ -8,6 +8,7 @@ from core.descriptions.descriptions import Descriptions
 from core.logging.logger_utils import log
 from core.message.from_message import SmartAppFromMessage
 from core.utils.exception_handlers import exc_handler
+from core.utils.tracing import tracer
 
 import scenarios.logging.logger_constants as log_const
 from scenarios.user.user_model import User
@@ -79,7 +80,8 @@ class SmartAppModel:
         handler = self.get_handler(message.type)
 
         if not user.load_error:
-            commands = await handler.run(message.payload, user)
+            with tracer.span("handler", handler=handler.__class__.__name__, message_name=message.type):
+                commands = await handler.run(message.payload, user)
         else:
             log("Error in loading user data", user, level="ERROR", exc_info=True)
             raise Exception("Error in loading user data")
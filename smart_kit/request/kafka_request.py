@@ -12,22 +12,27 @@ class SmartKitKafkaRequest(KafkaRequest):
         self._callback_id = items.get(self._callback_id_header_name)
         self._kafka_replyTopic = items.get(self.KAFKA_REPLY_TOPIC)
         self._kafka_extraHeaders = items.get(self.KAFKA_EXTRA_HEADERS) or {}
+        self._headers_template = self._get_headers_template()
 
     @property
     def _callback_id_header_name(self):
         return CALLBACK_ID_HEADER
 
-    def _get_new_headers(self, source_mq_message):
-        headers_dict = dict(super(SmartKitKafkaRequest, self)._get_new_headers(source_mq_message))
+    def _get_headers_template(self):
+        """Заголовки запроса, которые дописываются к заголовкам входящего сообщения"""
+        headers = {}
         if self._callback_id:
-            headers_dict[self._callback_id_header_name] = str(self._callback_id).encode()
+            headers[self._callback_id_header_name] = str(self._callback_id).encode()
         if self._kafka_replyTopic:
-            headers_dict[self.KAFKA_REPLY_TOPIC] = str(self._kafka_replyTopic).encode()
-        if self._kafka_extraHeaders:
-            for k, v in self._kafka_extraHeaders.items():
-                headers_dict[k] = str(v).encode()
-        headers_list = list(headers_dict.items())
-        return headers_list
+            headers[self.KAFKA_REPLY_TOPIC] = str(self._kafka_replyTopic).encode()
+        for k, v in self._kafka_extraHeaders.items():
+            headers[k] = str(v).encode()
+        return headers
+
+    def _get_new_headers(self, source_mq_message):
+        headers_dict = dict(super(SmartKitKafkaRequest, self)._get_new_headers(source_mq_message))
+        headers_dict.update(self._headers_template)
+        return list(headers_dict.items())
 
     def __str__(self):
         return f"KafkaRequest: kafka_key={self.kafka_key}"
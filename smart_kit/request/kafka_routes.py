@@ -0,0 +1,20 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class KafkaRoutes:
+    """
+    Таблица маршрутов route_kafka_broker: (канал входящего сообщения, topic_key ответа) -> kafka_key брокера.
+    При нескольких маршрутах с одним ключом действует последний, как при прежнем переборе настроек.
+    """
+    FROM_CHANNEL = "from_channel"
+    TO_TOPIC = "to_topic"
+    ROUTE_TO_BROKER = "route_to_broker"
+
+    def __init__(self, settings: Optional[List[Dict[str, Any]]]):
+        self.settings = settings
+        self._routes: Dict[Tuple[str, str], str] = {
+            (route[self.FROM_CHANNEL], route[self.TO_TOPIC]): route[self.ROUTE_TO_BROKER] for route in settings or []
+        }
+
+    def get(self, channel: str, topic_key: str) -> Optional[str]:
+        return self._routes.get((channel, topic_key))
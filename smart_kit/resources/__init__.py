@@ -47,13 +47,17 @@ from core.configs.base_config import BaseConfig
 from core.db_adapter.aioredis_adapter import AIORedisAdapter
 from core.db_adapter.db_adapter import db_adapters
 from core.db_adapter.ignite_adapter import IgniteAdapter
+from core.db_adapter.pooled_ignite_adapter import PooledIgniteAdapter
 from core.db_adapter.memory_adapter import MemoryAdapter
-from core.descriptions.descriptions import registered_description_factories
+from core.db_adapter.sharded_memory_adapter import ShardedMemoryAdapter
+from core.descriptions.descriptions import registered_description_factories, registered_descriptions_loaded_hooks
+from core.utils.concurrency_limiter import concurrency_limiters, ConcurrencyLimiter, AIMDConcurrencyLimiter, \
+    GradientConcurrencyLimiter
 from core.model.queued_objects.limited_queued_hashable_objects_description import \
     LimitedQueuedHashableObjectsDescriptionsItems
 from core.model.registered import registered_factories
 from core.repositories.file_repository import FileRepository
-from core.repositories.folder_repository import FolderRepository
+from core.repositories.folder_repository import FolderRepository, UpdatableFolderRepository
 from core.request.base_request import requests_registered
 from core.request.rest_request import RestRequest
 from core.utils.loader import ordered_json
@@ -104,11 +108,17 @@ class SmartAppResources(BaseConfig):
     def __init__(self, source, references_path, settings):
         super(SmartAppResources, self).__init__(source=source)
         self.references_path = references_path
+        hot_reload = (settings["template_settings"].get("descriptions_hot_reload") or {}) if settings else {}
+        folder_repository_kwargs = {}
+        folder_repository_cls = FolderRepository
+        if hot_reload.get("enabled"):
+            folder_repository_cls = UpdatableFolderRepository
+            folder_repository_kwargs["update_cooldown"] = hot_reload.get("interval", 5)
         self.repositories = [
-            FolderRepository(self.subfolder_path("forms"), loader=ordered_json, source=source,
-                             key="forms"),
-            FolderRepository(self.subfolder_path("scenarios"), loader=ordered_json, source=source,
-                             key="scenarios"),
+            folder_repository_cls(self.subfolder_path("forms"), loader=ordered_json, source=source,
+                                  key="forms", **folder_repository_kwargs),
+            folder_repository_cls(self.subfolder_path("scenarios"), loader=ordered_json, source=source,
+                                  key="scenarios", **folder_repository_kwargs),
             FileRepository(self.subfolder_path("preprocessing_messages_for_scenarios_settings.json"),
                            loader=ordered_json,
                            source=source, key="preprocessing_messages_for_scenarios"),
@@ -116,14 +126,14 @@ class SmartAppResources(BaseConfig):
                            source=source, key="last_scenarios"),
             FileRepository(self.subfolder_path("history.json"), loader=ordered_json, source=source,
                            key="history"),
-            FolderRepository(self.subfolder_path("behaviors"), loader=ordered_json, source=source,
-                             key="behaviors"),
-            FolderRepository(self.subfolder_path("actions"), loader=ordered_json, source=source,
-                             key="external_actions"),
-            FolderRepository(self.subfolder_path("requirements"), loader=ordered_json, source=source,
-                             key="external_requirements"),
-            FolderRepository(self.subfolder_path("field_fillers"), loader=ordered_json, source=source,
-                             key="external_field_fillers"),
+            folder_repository_cls(self.subfolder_path("behaviors"), loader=ordered_json, source=source,
+                                  key="behaviors", **folder_repository_kwargs),
+            folder_repository_cls(self.subfolder_path("actions"), loader=ordered_json, source=source,
+                                  key="external_actions", **folder_repository_kwargs),
+            folder_repository_cls(self.subfolder_path("requirements"), loader=ordered_json, source=source,
+                                  key="external_requirements", **folder_repository_kwargs),
+            folder_repository_cls(self.subfolder_path("field_fillers"), loader=ordered_json, source=source,
+                                  key="external_field_fillers", **folder_repository_kwargs),
             FileRepository(self.subfolder_path("responses.json"), loader=ordered_json, source=source,
                            key="responses"),
             FileRepository(self.subfolder_path("last_action_ids.json"), loader=ordered_json,
@@ -166,6 +176,7 @@ class SmartAppResources(BaseConfig):
         self.init_sdk_items()
         self.init_history_formatters()
         self.init_db_adapters()
+        self.init_concurrency_limiters()
         self.init_classifiers()
         self.init_message_handlers()
 
@@ -265,6 +276,8 @@ class SmartAppResources(BaseConfig):
         registered_description_factories["external_field_fillers"] = ExternalFieldFillerDescriptions
         registered_description_factories["last_action_ids"] = LimitedQueuedHashableObjectsDescriptionsItems
         registered_description_factories["external_classifiers"] = ExternalClassifiers
+        registered_descriptions_loaded_hooks["cases_normalization"] = \
+            ffd.IntersectionFieldFiller.save_cases_normalization
 
     def init_actions(self):
         actions[None] = EmptyAction
@@ -401,10 +414,18 @@ class SmartAppResources(BaseConfig):
     def init_db_adapters(self):
         db_adapters[None] = MemoryAdapter
         db_adapters["ignite"] = IgniteAdapter
+        db_adapters["ignite_pool"] = PooledIgniteAdapter
         db_adapters["memory"] = MemoryAdapter
+        db_adapters["sharded_memory"] = ShardedMemoryAdapter
         db_adapters["aioredis"] = AIORedisAdapter
         db_adapters["aioredis_sentinel"] = AIORedisSentinelAdapter
 
+    def init_concurrency_limiters(self):
+        concurrency_limiters[None] = ConcurrencyLimiter
+        concurrency_limiters["fixed"] = ConcurrencyLimiter
+        concurrency_limiters["aimd"] = AIMDConcurrencyLimiter
+        concurrency_limiters["gradient"] = GradientConcurrencyLimiter
+
     def init_classifiers(self):
         classifiers[None] = Classifier
         classifiers["external"] = ExternalClassifier
@@ -12,6 +12,7 @@ from core.message.from_message import SmartAppFromMessage
 from core.monitoring.monitoring import monitoring
 from core.monitoring.healthcheck_handler import RootResource
 from core.monitoring.twisted_server import TwistedServer
+from core.utils.bounded_cache import cache_registry
 from core.model.base_user import BaseUser
 from core.basic_models.parametrizers.parametrizer import BasicParametrizer
 from core.message.msg_validator import MessageValidator
@@ -59,6 +60,7 @@ class BaseMainLoop:
 
             self.health_check_server = self._create_health_check_server(template_settings)
             self._init_monitoring_config(template_settings)
+            cache_registry.apply_config(template_settings.get("caches") or {})
 
             log("%(class_name)s.__init__ completed.", params={log_const.KEY_NAME: log_const.STARTUP_VALUE,
                                                               "class_name": self.__class__.__name__})
@@ -89,7 +91,8 @@ class BaseMainLoop:
                 health_check["port"],
                 health_check["interface"],
                 RootResource,
-                settings["environment"] in health_check.get("debug_envs", [])
+                settings["environment"] in health_check.get("debug_envs", []),
+                profiling=health_check.get("profiling", False),
             )
         return health_check_server
 
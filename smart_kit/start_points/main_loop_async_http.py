@@ -1,4 +1,3 @@
-import json
 import typing
 import os
 
@@ -10,6 +9,8 @@ import scenarios.logging.logger_constants as log_const
 from core.db_adapter.db_adapter import DBAdapterException, db_adapter_factory
 from core.logging.logger_utils import log
 from core.message.from_message import SmartAppFromMessage
+from core.utils.bounded_cache import cache_registry
+from core.utils import json_codec
 from core.utils.stats_timer import StatsTimer
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
 from smart_kit.start_points.main_loop_http import BaseHttpMainLoop
@@ -102,6 +103,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
             log("aiohttp.yml is empty or missing. Server will be started with default parameters", level="WARN")
         asyncio.get_event_loop().run_until_complete(self.async_init())
         aiohttp.web.run_app(app=self.app, **aiohttp_config)
+        cache_registry.report_metrics()
 
     def stop(self, signum, frame):
         pass
@@ -169,7 +171,7 @@ class AIOHttpMainLoop(BaseHttpMainLoop):
     async def iterate(self, request: aiohttp.web.Request):
         headers = self._get_headers(request.headers)
         body = await request.text()
-        message = SmartAppFromMessage(json.loads(body), headers=headers, headers_required=False,
+        message = SmartAppFromMessage(json_codec.loads(body), headers=headers, headers_required=False,
                                       validators=self.from_msg_validators)
 
         status, reason, answer = await self.handle_message(message)
@@ -9,6 +9,8 @@ from core.basic_models.actions.command import Command
 from core.configs.global_constants import CALLBACK_ID_HEADER
 from core.logging.logger_utils import log
 from core.message.from_message import SmartAppFromMessage, basic_error_message
+from core.utils.bounded_cache import cache_registry
+from core.utils import json_codec
 from core.utils.stats_timer import StatsTimer
 from smart_kit.compatibility.commands import combine_commands
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
@@ -140,7 +142,7 @@ class HttpMainLoop(BaseHttpMainLoop):
             log("Error in request data", level="ERROR")
             raise Exception("Error in request data")
 
-        message = SmartAppFromMessage(json.loads(body), headers=headers, headers_required=False,
+        message = SmartAppFromMessage(json_codec.loads(body), headers=headers, headers_required=False,
                                       validators=self.from_msg_validators)
 
         status, reason, answer = self.handle_message(message)
@@ -161,4 +163,5 @@ class HttpMainLoop(BaseHttpMainLoop):
     def stop(self, signum, frame):
         if self._server:
             self._server.server_close()
+        cache_registry.report_metrics()
         exit(0)
@@ -3,7 +3,6 @@ import cProfile
 import concurrent.futures
 import gc
 import hashlib
-import json
 import pstats
 import signal
 import time
@@ -24,15 +23,21 @@ from core.model.heapq.heapq_storage import HeapqKV
 from core.monitoring.monitoring import monitoring
 from core.mq.kafka.async_kafka_publisher import AsyncKafkaPublisher
 from core.mq.kafka.kafka_consumer import KafkaConsumer
+from core.utils.bounded_cache import cache_registry
+from core.utils.concurrency_limiter import concurrency_limiter_factory
+from core.utils import json_codec
 from core.utils.memstats import get_top_malloc
 from core.utils.pickle_copy import pickle_deepcopy
+from core.utils.profiling import profiler
 from core.utils.stats_timer import StatsTimer
+from core.utils.tracing import tracer
 from smart_kit.compatibility.commands import combine_commands
 from smart_kit.message.get_to_message import get_to_message
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
 from smart_kit.names import message_names
 from smart_kit.names.message_names import ANSWER_TO_USER, RUN_APP, MESSAGE_TO_SKILL, SERVER_ACTION, CLOSE_APP
 from smart_kit.request.kafka_request import SmartKitKafkaRequest
+from smart_kit.request.kafka_routes import KafkaRoutes
 from smart_kit.start_points.base_main_loop import BaseMainLoop
 from smart_kit.start_points.constants import WORKER_EXCEPTION, POD_UP
 
@@ -67,15 +72,19 @@ class MainLoop(BaseMainLoop):
         self.profile_memory = self.profiling_settings.get("memory", False)
         self.profile_memory_log_delta = self.profiling_settings.get("memory_log_delta", 30)
         self.profile_memory_depth = self.profiling_settings.get("memory_depth", 4)
+        profiler.apply_config(self.profiling_settings)
         self.behavior_timers_tear_down_delay = self.template_settings.get("behavior_timers_tear_down_delay", 15)
         self.no_kafka_messages_poll_time = self.template_settings.get("no_kafka_messages_poll_time", 0.01)
         self.waiting_message_timeout = self.settings["template_settings"].get("waiting_message_timeout", {})
         self.kafka_broker_settings = self.settings["template_settings"].get("route_kafka_broker") or []
+        self._kafka_routes = KafkaRoutes(self.settings["template_settings"].get("route_kafka_broker"))
         self.warning_delay = self.waiting_message_timeout.get('warning', 200)
         self.skip_delay = self.waiting_message_timeout.get('skip', 8000)
         self.worker_tasks = []
         self.max_concurrent_messages = self.template_settings.get("max_concurrent_messages", 10)
         self.queues = [asyncio.Queue() for _ in range(self.max_concurrent_messages)]
+        self.descriptions_hot_reload = self.template_settings.get("descriptions_hot_reload") or {}
+        self.concurrency_limiter = concurrency_limiter_factory(self.template_settings.get("concurrency_limiter") or {})
         self.total_messages = 0
 
         try:
@@ -99,6 +108,7 @@ class MainLoop(BaseMainLoop):
             )
 
             self.app_name = self.settings.app_name
+            tracer.apply_config(self.template_settings.get("tracing") or {}, self.app_name)
             self.consumers = consumers
             for key in self.consumers:
                 self.consumers[key].subscribe()
@@ -131,14 +141,29 @@ class MainLoop(BaseMainLoop):
             self.consumers[kafka_key].close()
         for kafka_key in self.publishers:
             self.publishers[kafka_key].close()
+        loop.run_until_complete(self.db_adapter.close())
+        cache_registry.report_metrics()
         log("%(class_name)s EXIT.", level="WARNING", params={"class_name": self.__class__.__name__})
 
     async def general_coro(self):
         tasks = [self.process_consumer(kafka_key) for kafka_key in self.consumers]
         if self.health_check_server is not None:
             tasks.append(self.healthcheck_coro())
+        if self.descriptions_hot_reload.get("enabled"):
+            tasks.append(self.descriptions_reload_coro())
         await asyncio.gather(*tasks)
 
+    async def descriptions_reload_coro(self):
+        interval = self.descriptions_hot_reload.get("interval", 5)
+        while self.is_work:
+            try:
+                await self.model.scenario_descriptions.reload()
+            except Exception:
+                log("Descriptions reload failed", params={log_const.KEY_NAME: "descriptions_reload_error"},
+                    level="ERROR", exc_info=True)
+            await asyncio.sleep(interval)
+        log("descriptions_reload_coro stopped")
+
     async def healthcheck_coro(self):
         while self.is_work:
             if (
@@ -264,19 +289,33 @@ class MainLoop(BaseMainLoop):
         consumer = self.consumers[kafka_key]
         log_params = {log_const.KEY_NAME: "timings_polling"}
         while self.is_work:
-            with StatsTimer() as poll_timer:
-                # Max delay between polls configured in consumer.poll_timeout param
-                mq_message = consumer.poll()
-            log_params["kafka_polling"] = poll_timer.msecs
-            if poll_timer.msecs > self.MAX_LOG_TIME:
-                log("Long poll time: %(kafka_polling)s msecs\n", params=log_params, level="WARNING")
+            if self.concurrency_limiter.is_limited:
+                log("Concurrency limit %(limit)s reached, consumption paused",
+                    params={log_const.KEY_NAME: "concurrency_limit_reached",
+                            "limit": self.concurrency_limiter.limit}, level="DEBUG")
+            # blocks polling while in-flight messages count is at the limit
+            await self.concurrency_limiter.acquire()
+            try:
+                with StatsTimer() as poll_timer:
+                    # Max delay between polls configured in consumer.poll_timeout param
+                    mq_message = consumer.poll()
+                log_params["kafka_polling"] = poll_timer.msecs
+                if poll_timer.msecs > self.MAX_LOG_TIME:
+                    log("Long poll time: %(kafka_polling)s msecs\n", params=log_params, level="WARNING")
+                if mq_message:
+                    kwargs = {"kafka_key": kafka_key,
+                              "mq_message": mq_message,
+                              "polled_time": self.loop.time()}
+                    not_empty_queues_count = await self.put_to_queue(mq_message, self.do_incoming_handling, kwargs)
+            except Exception:
+                # сообщение не попало в очередь, и воркер слот не освободит
+                self._release_concurrency_slot({}, error=True)
+                raise
             if mq_message:
-                kwargs = {"kafka_key": kafka_key,
-                          "mq_message": mq_message}
-                not_empty_queues_count = await self.put_to_queue(mq_message, self.do_incoming_handling, kwargs)
                 log(f"Poll time: %(kafka_polling)s msecs\n, not_empty_queues count: {not_empty_queues_count}.",
                     params=log_params, level="INFO")
             else:
+                self.concurrency_limiter.release()
                 await asyncio.sleep(self.no_kafka_messages_poll_time)  # callbacks can work here
 
         log("Stop poll_kafka consumer.")
@@ -299,36 +338,50 @@ class MainLoop(BaseMainLoop):
         stats = worker_kwargs.get("stats")
         worker_id = worker_kwargs.get("worker_id")
         consumer = self.consumers[kafka_key]
+        processed = False
 
-        if mq_message:
-            self.concurrent_messages += 1
-            print(f"-- Processing {self.concurrent_messages} msgs at {worker_id} iter")
+        try:
+            if mq_message:
+                self.concurrent_messages += 1
+                print(f"-- Processing {self.concurrent_messages} msgs at {worker_id} iter")
 
-            headers = mq_message.headers()
-            if headers is None:
-                self.concurrent_messages -= 1
-                raise Exception("No incoming message headers found.")
+                headers = mq_message.headers()
+                if headers is None:
+                    self.concurrent_messages -= 1
+                    raise Exception("No incoming message headers found.")
 
-            try:
-                await self.process_message(mq_message, consumer, kafka_key, stats)
-            finally:
-                self.concurrent_messages -= 1
+                try:
+                    with tracer.span("process_message", kafka_key=kafka_key, worker_id=worker_id):
+                        processed = await self.process_message(mq_message, consumer, kafka_key, stats)
+                finally:
+                    self.concurrent_messages -= 1
+            else:
+                processed = True
+        finally:
+            self._release_concurrency_slot(kwargs, error=not processed)
+
+    def _release_concurrency_slot(self, kwargs, error: bool):
+        polled_time = kwargs.get("polled_time")
+        latency = self.loop.time() - polled_time if polled_time is not None else None
+        self.concurrency_limiter.release(latency, error=error)
+        if self.concurrency_limiter.limit is not None:
+            monitoring.gauge_concurrency_limit(self.app_name, self.concurrency_limiter.limit,
+                                               self.concurrency_limiter.in_flight)
 
     def _generate_answers(self, user, commands, message, **kwargs):
-        topic_key = kwargs["topic_key"]
-        kafka_key = kwargs["kafka_key"]
         answers = []
         commands = commands or []
 
         commands = combine_commands(commands, user)
+        if not commands:
+            return answers
 
+        # маршрут ответа общий для всех команд сообщения, топик ответа пользователю читается один раз
+        routing = {"kafka_key": kwargs["kafka_key"], "topic_key": kwargs["topic_key"], "topic": None}
+        answer_routing = dict(routing, topic=user.local_vars.get(KAFKA_REPLY_TOPIC))
         for command in commands:
             request = SmartKitKafkaRequest(id=None, items=command.request_data)
-            request.update_empty_items({
-                "kafka_key": kafka_key,
-                "topic_key": topic_key,
-                "topic": user.local_vars.get(KAFKA_REPLY_TOPIC) if command.name == ANSWER_TO_USER else None
-            })
+            request.update_empty_items(answer_routing if command.name == ANSWER_TO_USER else routing)
 
             to_message = get_to_message(command.name)
             answer = to_message(command=command, message=message, request=request,
@@ -385,40 +438,53 @@ class MainLoop(BaseMainLoop):
                 level=log_level)
         return make_break
 
-    async def process_message(self, mq_message: KafkaMessage, consumer, kafka_key, stats):
+    async def process_message(self, mq_message: KafkaMessage, consumer, kafka_key, stats) -> bool:
+        """
+        :return: False, если сообщение пропущено из-за долгого ожидания или пользователя не удалось сохранить
+        за user_save_collisions_tries попыток - ограничитель конкурентности учитывает это как ошибку
+        """
         topic_key = self._get_topic_key(mq_message, kafka_key)
 
         save_tries = 0
         user_save_no_collisions = False
         skip_message = False
+        processed = True
         user = None
         db_uid = None
         message = None
         while save_tries < self.user_save_collisions_tries and not user_save_no_collisions:
             save_tries += 1
-            message_value = json.loads(mq_message.value())
+            with tracer.span("json_parse"):
+                message_value = json_codec.loads(mq_message.value())
             message = SmartAppFromMessage(message_value,
                                           headers=mq_message.headers(),
                                           masking_fields=self.masking_fields,
                                           creation_time=consumer.get_msg_create_time(mq_message))
 
-            if message.validate():
+            with tracer.span("validate"):
+                is_valid_message = message.validate()
+            if is_valid_message:
                 waiting_message_time = 0
                 if message.creation_time:
                     waiting_message_time = time.time() * 1000 - message.creation_time
                     stats += "Waiting message: {} msecs\n".format(waiting_message_time)
 
                 stats += "Mid: {}\n".format(message.incremental_id)
+                trace_span = tracer.current_span()
+                trace_span.set_attribute("message_id", message.incremental_id)
+                trace_span.set_attribute("message_name", message.message_name)
                 monitoring.sampling_mq_waiting_time(self.app_name, waiting_message_time / 1000)
 
                 if self._is_message_timeout_to_skip(message, waiting_message_time):
                     skip_message = True
+                    processed = False
                     break
 
                 db_uid = message.db_uid
-                with StatsTimer() as load_timer:
+                with StatsTimer() as load_timer, tracer.span("load_user"):
                     user = await self.load_user(db_uid, message)
                 monitoring.sampling_load_time(self.app_name, load_timer.secs)
+                profiler.record_stage("load_user", load_timer.secs)
                 stats += "Loading time: {} msecs\n".format(load_timer.msecs)
 
                 # check_message_key
@@ -486,19 +552,22 @@ class MainLoop(BaseMainLoop):
                                 user=user, level="WARNING")
                         user.local_vars.set(KAFKA_REPLY_TOPIC, message.headers[KAFKA_REPLY_TOPIC])
 
-                    with StatsTimer() as script_timer:
+                    with StatsTimer() as script_timer, tracer.span("answer"):
                         commands = await self.model.answer(message, user)
 
-                    answers = self._generate_answers(user=user, commands=commands, message=message,
-                                                     topic_key=topic_key,
-                                                     kafka_key=kafka_key)
+                    with tracer.span("generate_answers"):
+                        answers = self._generate_answers(user=user, commands=commands, message=message,
+                                                         topic_key=topic_key,
+                                                         kafka_key=kafka_key)
                     monitoring.sampling_script_time(self.app_name, script_timer.secs)
+                    profiler.record_stage("answer", script_timer.secs)
                     stats += "Script time: {} msecs\n".format(script_timer.msecs)
 
-                    with StatsTimer() as save_timer:
+                    with StatsTimer() as save_timer, tracer.span("save_user"):
                         user_save_no_collisions = await self.save_user(db_uid, user, message)
 
                     monitoring.sampling_save_time(self.app_name, save_timer.secs)
+                    profiler.record_stage("save_user", save_timer.secs)
                     stats += "Saving time: {} msecs\n".format(save_timer.msecs)
                     if not user_save_no_collisions:
                         log("MainLoop.iterate: save user got collision on uid %(uid)s db_version %(db_version)s.",
@@ -516,9 +585,11 @@ class MainLoop(BaseMainLoop):
                     if answers:
                         self.save_behavior_timeouts(user, mq_message, kafka_key)
                         for answer in answers:
-                            with StatsTimer() as publish_timer:
+                            with StatsTimer() as publish_timer, \
+                                    tracer.span("send", message_name=answer.command.name):
                                 self._send_request(user, answer, mq_message)
                             stats += "Publishing time: {} msecs\n".format(publish_timer.msecs)
+                            profiler.record_stage("send", publish_timer.secs)
                             log(stats, user=user)
             else:
                 try:
@@ -545,10 +616,13 @@ class MainLoop(BaseMainLoop):
                 level="WARNING")
             await self.postprocessor.postprocess(user, message)
             monitoring.counter_save_collision_tries_left(self.app_name)
-        consumer.commit_offset(mq_message)
+            processed = False
+        with tracer.span("commit"):
+            consumer.commit_offset(mq_message)
 
         if user and message and message.callback_id:
             self.remove_timer(message)
+        return processed
 
     def _get_valid_message_key(self, from_message: SmartAppFromMessage):
         return "_".join([i for i in [from_message.channel, from_message.sub, from_message.uid] if i])
@@ -567,34 +641,38 @@ class MainLoop(BaseMainLoop):
 
         return message_key
 
-    def _send_request(self, user: BaseUser, answer: SmartAppToMessage, mq_message: KafkaMessage):
-        kafka_broker_settings = self.settings["template_settings"].get(
-            "route_kafka_broker"
-        ) or []
+    @property
+    def kafka_routes(self) -> KafkaRoutes:
+        """Таблица route_kafka_broker, перестраивается, если настройки перечитаны"""
+        kafka_broker_settings = self.settings["template_settings"].get("route_kafka_broker")
+        if kafka_broker_settings is not self._kafka_routes.settings:
+            self._kafka_routes = KafkaRoutes(kafka_broker_settings)
+        return self._kafka_routes
 
+    def _send_request(self, user: BaseUser, answer: SmartAppToMessage, mq_message: KafkaMessage):
         request = answer.request
-
-        for kb_setting in kafka_broker_settings:
-            if (
-                    kb_setting["from_channel"] == answer.incoming_message.channel and
-                    kb_setting["to_topic"] == request.topic_key
-            ):
-                request.kafka_key = kb_setting["route_to_broker"]
+        kafka_key = self.kafka_routes.get(answer.incoming_message.channel, request.topic_key)
+        if kafka_key is not None:
+            request.kafka_key = kafka_key
+        headers = request._get_new_headers(mq_message)
 
         request_params = dict()
         request_params["publishers"] = self.publishers
         request_params["mq_message"] = mq_message
+        request_params["headers"] = headers
         request_params["payload"] = answer.value
-        request_params["masked_value"] = answer.masked_value
+        request_params["masked_value"] = answer.masked_request_value
         request.run(answer.value, request_params)
-        self._log_request(user, request, answer, mq_message)
+        self._log_request(user, request, answer, mq_message, headers)
 
-    def _log_request(self, user, request, answer, original_mq_message):
+    def _log_request(self, user, request, answer, original_mq_message, headers=None):
+        if headers is None:
+            headers = request._get_new_headers(original_mq_message)
         log("OUTGOING TO TOPIC_KEY: %(topic_key)s DATA: %(data)s",
             params={log_const.KEY_NAME: "outgoing_message",
                     "topic_key": request.topic_key,
-                    "headers": request._get_new_headers(original_mq_message),
-                    "data": answer.masked_value,
+                    "headers": headers,
+                    "data": answer.masked_view,
                     "length": len(answer.value),
                     "message_key": (original_mq_message.key() or b"").decode('utf-8', 'backslashreplace')},
             user=user)
@@ -646,7 +724,7 @@ class MainLoop(BaseMainLoop):
             timeout_from_message = None
             while save_tries < self.user_save_collisions_tries and not user_save_no_collisions:
                 save_tries += 1
-                orig_message_raw = json.loads(mq_message.value())
+                orig_message_raw = json_codec.loads(mq_message.value())
                 orig_message_raw[SmartAppFromMessage.MESSAGE_NAME] = message_names.LOCAL_TIMEOUT
                 timeout_from_message = self._get_timeout_from_message(orig_message_raw, callback_id,
                                                                       headers=mq_message.headers())
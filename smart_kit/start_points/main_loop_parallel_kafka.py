@@ -1,5 +1,4 @@
 import concurrent.futures
-import json
 import os
 import threading
 from time import sleep
@@ -9,6 +8,7 @@ from confluent_kafka.cimpl import KafkaException
 import scenarios.logging.logger_constants as log_const
 from core.logging.logger_utils import log
 from core.message.from_message import SmartAppFromMessage
+from core.utils import json_codec
 from smart_kit.start_points.main_loop_kafka import MainLoop as KafkaMainLoop
 
 
@@ -46,7 +46,7 @@ class ParallelKafkaMainLoop(KafkaMainLoop):
         # ну тут чутка копипасты
         mutex = None
         try:
-            message_value = json.loads(mq_message.value())
+            message_value = json_codec.loads(mq_message.value())
             message = SmartAppFromMessage(message_value,
                                           headers=mq_message.headers(),
                                           masking_fields=self.masking_fields)
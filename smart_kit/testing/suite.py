@@ -1,9 +1,13 @@
 import asyncio
+import copy
 import json
+import multiprocessing
 import os
+import time
+from collections import defaultdict
 from csv import DictWriter, QUOTE_MINIMAL
 from functools import cached_property
-from typing import AnyStr, Optional, Tuple, Any, Dict, Callable
+from typing import AnyStr, Optional, Tuple, Any, Dict, Callable, List, NamedTuple
 
 from core.configs.global_constants import LINK_BEHAVIOR_FLAG
 from smart_kit.compatibility.commands import combine_commands
@@ -12,6 +16,7 @@ from smart_kit.message.smartapp_to_message import SmartAppToMessage
 from smart_kit.models.smartapp_model import SmartAppModel
 from smart_kit.request.kafka_request import SmartKitKafkaRequest
 from smart_kit.testing.utils import Environment
+from smart_kit.text_preprocessing.cached_text_normalizer import CachedTextNormalizer
 from smart_kit.utils.diff import partial_diff
 
 
@@ -62,31 +67,72 @@ def run_testfile(
     return len(json_obj), success
 
 
+class CaseResult(NamedTuple):
+    file: str
+    test_case: str
+    success: bool
+    duration: float
+    csv_rows: List[Tuple[int, Any]]
+    output: str = ""
+
+    def print_output(self) -> None:
+        # одной записью, чтобы вывод одновременно выполняемых кейсов не перемешивался
+        print(self.output, end="", flush=True)
+
+
+def shard_files(files: List[Tuple[str, str]], shards: int) -> List[List[Tuple[str, str]]]:
+    """Greedy split of test files into shards of similar total size: the biggest file goes to the lightest shard"""
+    result = [[] for _ in range(shards)]
+    loads = [0] * shards
+    for path, file in sorted(files, key=lambda item: os.path.getsize(os.path.join(*item)), reverse=True):
+        index = loads.index(min(loads))
+        result[index].append((path, file))
+        loads[index] += os.path.getsize(os.path.join(path, file))
+    return [shard for shard in result if shard]
+
+
+_forked_suite: Optional["TestSuite"] = None
+
+
+def _run_forked_shard(files: List[Tuple[str, str]]) -> List[CaseResult]:
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    # вывод кейсов печатает родительский процесс
+    _forked_suite.print_cases_output = False
+    return _forked_suite.run_shard(files)
+
+
 class TestSuite:
-    def __init__(self, path: AnyStr, app_config: Any, predefined_fields_storage: AnyStr, make_csv: bool):
+    """
+    Прогон json-тестов сценариев. Приложение загружается один раз,
+    с workers > 1 файлы тестов распределяются по дочерним процессам (fork), которые наследуют уже загруженное
+    приложение, а внутри процесса до concurrency кейсов выполняются одновременно в одном event loop.
+    Результаты нормализации можно сохранять между прогонами в normalization_cache_path.
+    Вывод кейса собирается в CaseResult.output и печатается целиком после завершения кейса.
+    """
+    print_cases_output = True
+
+    def __init__(self, path: AnyStr, app_config: Any, predefined_fields_storage: AnyStr, make_csv: bool,
+                 workers: int = 1, concurrency: int = 1, durations_path: Optional[str] = None,
+                 normalization_cache_path: Optional[str] = None):
         self.path = path
         self.app_config = app_config
-
-        self.csv_callback = None
+        self.workers = workers
+        self.concurrency = concurrency
+        self.durations_path = durations_path
+        self.normalization_cache_path = normalization_cache_path
+        if normalization_cache_path:
+            self.app_config.NORMALIZER = CachedTextNormalizer.from_file(self.app_config.NORMALIZER,
+                                                                        normalization_cache_path)
+
+        self.results_csv_writer = None
         if make_csv:
-            field_names = ['file', 'test_case', 'success', 'diff']
-            results_csv_writer = DictWriter(
+            self.csv_field_names = ['file', 'test_case', 'success', 'diff']
+            self.results_csv_writer = DictWriter(
                 open(os.path.join(path, 'tests_results.csv'), 'wt'),
-                fieldnames=field_names,
+                fieldnames=self.csv_field_names,
                 quoting=QUOTE_MINIMAL
             )
-            results_csv_writer.writeheader()
-
-            def __csv_file_callback(file):
-                def __csv_test_case_callback(test_case_name):
-                    def __write_csv_line(diff):
-                        results_csv_writer.writerow(dict(zip(
-                            field_names,
-                            [file, test_case_name, 0 if diff else 1, diff.serialize()]
-                        )))
-                    return __write_csv_line
-                return __csv_test_case_callback
-            self.csv_callback = __csv_file_callback
+            self.results_csv_writer.writeheader()
 
         with open(predefined_fields_storage, "r") as f:
             self.storaged_predefined_fields = json.load(f)
@@ -111,43 +157,130 @@ class TestSuite:
                                         references_path=self.app_config.REFERENCES_PATH,
                                         app_name=self.app_config.APP_NAME)
 
-    def run(self) -> bool:
-        total = 0
-        total_success = 0
-        for path, dirs, files in os.walk(self.path):
-            for file in files:
-                if not file.endswith(".json"):
-                    continue
-                if self.csv_callback:
-                    csv_file_callback = self.csv_callback(file)
-                else:
-                    csv_file_callback = None
-                file_total, file_success = run_testfile(
-                    path,
-                    file,
-                    self.app_model,
-                    self.settings,
-                    self.app_config.USER,
-                    self.app_config.PARAMETRIZER,
-                    self.app_config.FROM_MSG,
-                    self.app_config.TEST_CASE,
-                    self.storaged_predefined_fields,
-                    csv_file_callback,
-                    test_suite=self,
-                )
-                total += file_total
-                total_success += file_success
+    def collect_files(self) -> List[Tuple[str, str]]:
+        return sorted(
+            (path, file) for path, dirs, files in os.walk(self.path) for file in files if file.endswith(".json")
+        )
+
+    async def run_case(self, file: str, test_case: str, test_params) -> CaseResult:
+        if isinstance(test_params, list):
+            test_params = {"messages": test_params, "user": {}}
+        csv_rows = []
+        output = [f"[+] Processing test case {test_case} from {file}"]
+
+        def csv_case_callback(diff):
+            csv_rows.append((0 if diff else 1, diff.serialize()))
+
+        start = time.perf_counter()
+        success = await self.app_config.TEST_CASE(
+            self.app_model,
+            self.settings,
+            self.app_config.USER,
+            self.app_config.PARAMETRIZER,
+            self.app_config.FROM_MSG,
+            **test_params,
+            storaged_predefined_fields=self.storaged_predefined_fields,
+            interactive=False,
+            csv_case_callback=csv_case_callback if self.results_csv_writer else None,
+            test_suite=self,
+            output=output,
+        ).run()
+        duration = time.perf_counter() - start
+        if success:
+            output.append(f"[+] {test_case} OK")
+        result = CaseResult(file, test_case, success, duration, csv_rows, "".join(f"{line}\n" for line in output))
+        if self.print_cases_output:
+            result.print_output()
+        return result
+
+    async def _run_shard(self, files: List[Tuple[str, str]]) -> List[CaseResult]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_limited(*args):
+            async with semaphore:
+                return await self.run_case(*args)
+
+        cases = []
+        for path, file in files:
+            with open(os.path.join(path, file), "r") as test_file:
+                json_obj = json.load(test_file)
+            cases.extend((file, test_case, test_params) for test_case, test_params in json_obj.items())
+        return list(await asyncio.gather(*(run_limited(*case) for case in cases)))
+
+    def run_shard(self, files: List[Tuple[str, str]]) -> List[CaseResult]:
+        try:
+            loop = asyncio.get_event_loop()
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+        return loop.run_until_complete(self._run_shard(files))
+
+    def _run_in_workers(self, files: List[Tuple[str, str]]) -> List[CaseResult]:
+        global _forked_suite
+        # приложение загружается до fork, чтобы дочерние процессы получили его готовым
+        self.app_model
+        _forked_suite = self
+        shards = shard_files(files, self.workers)
+        context = multiprocessing.get_context("fork")
+        results = []
+        with context.Pool(len(shards)) as pool:
+            for shard_results in pool.imap_unordered(_run_forked_shard, shards):
+                for result in shard_results:
+                    result.print_output()
+                results.extend(shard_results)
+        return results
 
+    def run(self) -> bool:
+        files = self.collect_files()
+        if self.workers > 1 and len(files) > 1 and "fork" in multiprocessing.get_all_start_methods():
+            results = self._run_in_workers(files)
+        else:
+            results = self.run_shard(files)
+
+        by_file = defaultdict(list)
+        for result in results:
+            by_file[result.file].append(result)
+            if self.results_csv_writer:
+                for success, diff in result.csv_rows:
+                    self.results_csv_writer.writerow(dict(zip(
+                        self.csv_field_names, [result.file, result.test_case, success, diff]
+                    )))
+        for file, file_results in by_file.items():
+            print(f"[+] {file} {sum(result.success for result in file_results)}/{len(file_results)}")
+
+        total = len(results)
+        total_success = sum(result.success for result in results)
+        self.report_durations(results)
+        if self.normalization_cache_path:
+            self.app_config.NORMALIZER.save(self.normalization_cache_path)
         print(f"[+] Total: {total_success}/{total}")
         return total_success == total
 
+    def report_durations(self, results: List[CaseResult], top: int = 10):
+        results = sorted(results, key=lambda result: result.duration, reverse=True)
+        if self.durations_path:
+            with open(self.durations_path, "wt") as f:
+                writer = DictWriter(f, fieldnames=["file", "test_case", "success", "duration_sec"])
+                writer.writeheader()
+                for result in results:
+                    writer.writerow({"file": result.file, "test_case": result.test_case,
+                                     "success": int(result.success), "duration_sec": round(result.duration, 6)})
+        if results:
+            print(f"[+] Slowest {min(top, len(results))} test cases:")
+            for result in results[:top]:
+                print(f"    {result.duration:.3f}s {result.file} {result.test_case}")
+
 
 class TestCase:
     def __init__(self, app_model: SmartAppModel, settings: Settings, user_cls: type, parametrizer_cls: type,
                  from_msg_cls: type, messages: dict, storaged_predefined_fields: Dict[str, Any], interactive: bool,
                  csv_case_callback: Optional[Callable[[Any], None]] = None, test_suite: Optional[TestSuite] = None,
-                 user: Optional[dict] = None):
+                 user: Optional[dict] = None, output: Optional[List[str]] = None):
+        """
+        :param output: список, в который собираются строки вывода кейса; None - печатать сразу
+        """
         self.messages = messages
+        self.output = output
         self.user_state = json.dumps(user)
         self.interactive = interactive
 
@@ -161,12 +294,18 @@ class TestCase:
         self.__user_cls = user_cls
         self.__from_msg_cls = from_msg_cls
 
+    def print(self, *values) -> None:
+        if self.output is None:
+            print(*values)
+        else:
+            self.output.append(" ".join(str(value) for value in values))
+
     async def _run(self) -> bool:
         success = True
 
         app_callback_id = None
         for index, message in enumerate(self.messages):
-            print('Шаг', index)
+            self.print('Шаг', index)
             if index and self.interactive:
                 print("Нажмите ENTER, чтобы продолжить...")
                 input()
@@ -203,7 +342,7 @@ class TestCase:
             expected_user = response["user"]
 
             if len(commands) != len(response["messages"]):
-                print(
+                self.print(
                     f"[!] Expected quantity of messages differ from received.\n"
                     f" Expected: {len(response['messages'])}. Actual: {len(answers)}."
                 )
@@ -216,7 +355,7 @@ class TestCase:
                 diff = partial_diff(expected, actual_value)
                 if diff:
                     success = False
-                    print(diff)
+                    self.print(diff)
                 if self.csv_case_callback:
                     self.csv_case_callback(diff)
                 # Последний app_callback_id в answers, используется в заголовках следующего сообщения
@@ -228,7 +367,7 @@ class TestCase:
             user_diff = partial_diff(expected_user, user.raw)
             if user_diff:
                 success = False
-                print(user_diff)
+                self.print(user_diff)
             self.user_state = user.raw_str
         return success
 
@@ -256,7 +395,7 @@ class TestCase:
         predefined_fields = data.get("predefined_fields")
         is_payload_field = data.get("payload")
         if predefined_fields:
-            predefined_fields_data = self.storaged_predefined_fields[predefined_fields]
+            predefined_fields_data = copy.deepcopy(self.storaged_predefined_fields[predefined_fields])
             if not is_payload_field and not predefined_fields_data.get("payload"):
                 predefined_fields_data = {"payload": predefined_fields_data}
             if is_payload_field and predefined_fields_data.get("payload"):
@@ -272,7 +411,7 @@ class TestCase:
         return self.__from_msg_cls(defaults, headers=headers)
 
     def handle_predefined_fields_response(self, predefined_fields_resp, response):
-        predefined_fields_resp_data = self.storaged_predefined_fields[predefined_fields_resp]
+        predefined_fields_resp_data = copy.deepcopy(self.storaged_predefined_fields[predefined_fields_resp])
         response.update(predefined_fields_resp_data)
         del response["predefined_fields"]
 
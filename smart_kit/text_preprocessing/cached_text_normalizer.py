@@ -0,0 +1,72 @@
+import json
+from typing import List, Optional, Sequence
+
+from smart_kit.text_preprocessing.base_text_normalizer import BaseTextNormalizer
+from smart_kit.utils.cache import JSONCache, ItemExpired
+
+
+class CachedTextNormalizer(BaseTextNormalizer):
+    """
+    Обертка над нормализатором, запоминающая результаты нормализации.
+    Кэш можно сохранить в файл и загрузить в следующем запуске - тогда нормализатор
+    (и загрузка его словарей) нужен только для текстов, которых еще нет в кэше.
+    """
+    CACHE = JSONCache
+    CACHE_NAME = "normalization"
+
+    def __init__(self, normalizer: BaseTextNormalizer, cache_lifetime: float = float("+inf"),
+                 max_entries: Optional[int] = None):
+        self.normalizer = normalizer
+        self.cache = self.CACHE(cache_lifetime, max_entries=max_entries, name=self.CACHE_NAME)
+
+    @classmethod
+    def from_file(cls, normalizer: BaseTextNormalizer, path: str, **kwargs) -> "CachedTextNormalizer":
+        inst = cls(normalizer, **kwargs)
+        try:
+            inst.cache.load(path)
+        except FileNotFoundError:
+            pass
+        return inst
+
+    def save(self, path: str):
+        self.cache.save(path)
+
+    @staticmethod
+    def _key(text: str, kwargs) -> str:
+        return json.dumps([text, kwargs], ensure_ascii=False, sort_keys=True) if kwargs else text
+
+    def _get(self, key):
+        # в кэше хранится json: каждый вызов получает свою копию результата
+        try:
+            return json.loads(self.cache[key])
+        except (KeyError, ItemExpired):
+            return None
+
+    def _set(self, key, value):
+        self.cache[key] = json.dumps(value, ensure_ascii=False)
+
+    def load_everything(self) -> None:
+        self.normalizer.load_everything()
+
+    def with_cache(self, *args, **kwargs) -> BaseTextNormalizer:
+        return self
+
+    def __call__(self, text: str, **kwargs):
+        key = self._key(text, kwargs)
+        result = self._get(key)
+        if result is None:
+            self._set(key, self.normalizer(text, **kwargs))
+            result = self._get(key)
+        return result
+
+    def normalize_sequence(self, texts: Sequence, batch_size=None) -> List:
+        texts = list(texts)
+        results = [self._get(text) for text in texts]
+        missed = [text for text, result in zip(texts, results) if result is None]
+        if missed:
+            normalized = iter(self.normalizer.normalize_sequence(missed, batch_size))
+            for index, result in enumerate(results):
+                if result is None:
+                    self._set(texts[index], next(normalized))
+                    results[index] = self._get(texts[index])
+        return results
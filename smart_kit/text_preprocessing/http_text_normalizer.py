@@ -4,7 +4,7 @@ from tqdm import tqdm
 from typing import List, Sequence
 
 from smart_kit.text_preprocessing.base_text_normalizer import BaseTextNormalizer
-from smart_kit.utils.cache import ItemExpired
+from smart_kit.utils.cache import Cache, ItemExpired
 
 
 def words_tokenized_set(text):
@@ -16,6 +16,7 @@ class NormalizationError(Exception):
 
 
 class HttpTextNormalizer(BaseTextNormalizer):
+    CACHE_NAME = "http_normalization"
 
     def __init__(self, url: str, batch_size: int = 128, timeout=10, verbose=False, cache_lifetime=0):
         url = url.rstrip("/") + "/"
@@ -28,7 +29,10 @@ class HttpTextNormalizer(BaseTextNormalizer):
         self._tqdm_func = tqdm if verbose else (lambda x: x)
         self.set_normalize_mode()
 
-        self.cache = self.CACHE(cache_lifetime)
+        if isinstance(self.CACHE, type) and issubclass(self.CACHE, Cache):
+            self.cache = self.CACHE(cache_lifetime, name=self.CACHE_NAME)
+        else:
+            self.cache = self.CACHE(cache_lifetime)
 
     @classmethod
     def with_cache(cls, app_config, **kwargs):
@@ -1,5 +1,8 @@
 import time
 import json
+from typing import Optional
+
+from core.utils.bounded_cache import BoundedCache
 
 
 class ItemExpired(Exception):
@@ -7,9 +10,16 @@ class ItemExpired(Exception):
 
 
 class Cache:
-    def __init__(self, lifetime: float = 0):
+    """Кэш со временем жизни lifetime (по времени создания записи) и не более max_entries записями (LRU).
+    Размер можно переопределить в template_settings["caches"][name].
+    """
+    NAME = "cache"
+    MAX_ENTRIES = 100000
+
+    def __init__(self, lifetime: float = 0, max_entries: Optional[int] = None, name: Optional[str] = None):
         self.lifetime = lifetime
-        self.storage = dict()
+        # key -> (create_time, value)
+        self.storage = BoundedCache(name or self.NAME, max_entries=max_entries or self.MAX_ENTRIES)
 
     def __getitem__(self, item):
         create_time, value = self.storage[item]
@@ -18,8 +28,14 @@ class Cache:
         return value
 
     def __setitem__(self, key, value):
+        if self.lifetime <= 0:
+            # запись с нулевым временем жизни никогда не будет прочитана
+            return
         self.storage[key] = time.time(), value
 
+    def __len__(self):
+        return len(self.storage)
+
     def load(self, *args, **kwargs):
         pass
 
@@ -27,10 +43,9 @@ class Cache:
         pass
 
     def invalidate(self):
-        for key in list(self.storage):
-            try:
-                self[key]
-            except ItemExpired:
+        expire_time = time.time() - self.lifetime
+        for key, (create_time, _) in self.storage.items():
+            if create_time <= expire_time:
                 del self.storage[key]
 
     def clear(self):
@@ -40,14 +55,22 @@ class Cache:
 class JSONCache(Cache):  # Pathetic Non OOP Design, Sorry
     def load(self, path):
         with open(path) as file:
-            self.storage = json.load(file)
+            data = json.load(file)
+        self.storage.clear()
+        for key, (create_time, value) in data.items():
+            self.storage[key] = create_time, value
 
     def save(self, path, update=False):
         if update:
-            tmp = JSONCache(lifetime=float("+inf"))
-            tmp.load(path)
-            tmp.storage.update(self.storage)
-            self.storage = tmp.storage
+            with open(path) as file:
+                data = json.load(file)
+            entries = list(self.storage.items())
+            self.storage.clear()
+            # записи из файла старше своих: при переполнении вытесняются первыми
+            for key, (create_time, value) in data.items():
+                self.storage[key] = create_time, value
+            for key, entry in entries:
+                self.storage[key] = entry
         self.invalidate()
         with open(path, "w+", encoding='utf-8') as file:
-            json.dump(self.storage, file, ensure_ascii=False)
+            json.dump({key: list(entry) for key, entry in self.storage.items()}, file, ensure_ascii=False)
@@ -7,6 +7,7 @@ from pythonjsonlogger import jsonlogger
 import logging
 from core.model.factory import build_factory
 from core.model.registered import Registered
+from core.utils import json_codec
 
 
 def to_num(s):
@@ -43,6 +44,7 @@ class SmartKitJsonFormatter(jsonlogger.JsonFormatter):
 
     def __init__(self, *args, **kwargs):
         self.fields_type: dict = kwargs.pop("fields_type", None)
+        kwargs.setdefault("json_serializer", json_codec.dumps)
         super().__init__(*args, **kwargs)
 
     def add_fields(self, log_record, record, message_dict):
@@ -35,6 +35,9 @@ from core.basic_models.answer_items.answer_items import SdkAnswerItem, items_fac
     ItemCard, PronounceText, SuggestText, SuggestDeepLink
 from core.basic_models.requirement.basic_requirements import requirement_factory, Requirement, requirements
 from core.model.registered import registered_factories
+from core.model.queued_objects.limited_queued_hashable_objects import LimitedQueuedHashableObjects
+from core.model.queued_objects.limited_queued_hashable_objects_description import \
+    LimitedQueuedHashableObjectsDescription
 from core.text_preprocessing.base import BaseTextPreprocessingResult
 from core.unified_template.unified_template import UnifiedTemplate, UNIFIED_TEMPLATE_TYPE_NAME
 from smart_kit.action.http import HTTPRequestAction
@@ -858,9 +861,19 @@ class NonRepeatingActionTest(unittest.IsolatedAsyncioTestCase):
             }
         )
         self.user = PicklableMagicMock()
+        self.user.last_action_ids["last_action_ids_storage"].key.side_effect = lambda id: id
         registered_factories[Action] = action_factory
         actions["action_mock"] = MockAction
 
+    async def test_run_fingerprints(self):
+        description = LimitedQueuedHashableObjectsDescription({"max_len": 3, "fingerprint_size": 8})
+        last_ids = LimitedQueuedHashableObjects([], description)
+        self.user.last_action_ids = {"last_action_ids_storage": last_ids}
+        results = [await self.action.run(self.user, None) for _ in range(4)]
+        self.assertIn(results[0], [self.expected, self.expected1])
+        for previous, result in zip(results, results[1:]):
+            self.assertNotEqual(result, previous)
+
     async def test_run_available_indexes(self):
         self.user.last_action_ids["last_action_ids_storage"].get_list.side_effect = [[0]]
         result = await self.action.run(self.user, None)
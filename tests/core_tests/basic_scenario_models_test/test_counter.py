@@ -350,3 +350,25 @@ class CountersTest(unittest.TestCase):
         counters = Counters({name_1: counter_1, name_2: counter_2}, None)
         counters.expire()
         self.assertDictEqual(counters.raw, {name_1: counter_1, name_2: counter_2})
+
+    def test_expire_after_changes(self):
+        current_time = int(time())
+        counters = Counters({
+            "short": {"value": 1, "create_time": current_time - 50, "update_time": None, "lifetime": 100},
+            "long": {"value": 1, "create_time": current_time, "update_time": None, "lifetime": 1000},
+        }, None)
+        self.assertEqual(counters.next_expire_time(), current_time + 50)
+        counters["short"].set(reset_time=True, time_shift=-200)
+        counters["new"].inc(lifetime=10)
+        counters["new"].create_time -= 11
+        counters.expire()
+        self.assertEqual(set(counters.raw), {"long"})
+        self.assertEqual(counters.next_expire_time(), current_time + 1000)
+
+    def test_expire_untouched_not_created(self):
+        current_time = int(time())
+        counters = Counters({"name_%d" % index: {"value": index, "create_time": current_time, "update_time": None,
+                                                 "lifetime": 100} for index in range(100)}, None)
+        counters.expire()
+        self.assertEqual(counters._items, {})
+        self.assertEqual(len(counters.raw), 100)
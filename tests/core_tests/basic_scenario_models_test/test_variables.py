@@ -50,3 +50,36 @@ class VariablesTest(unittest.TestCase):
         self.variables.set("key_2", "value_2")
         self.variables.clear()
         self.assertEqual(self.variables.values, {})
+
+    def test_expire_by_deadline(self):
+        with unittest.mock.patch("time.time", return_value=100):
+            variables = Variables({"a": ["a", 105], "b": ["b", 110], "c": ["c", 200]}, None)
+            self.assertEqual(variables.values, {"a": "a", "b": "b", "c": "c"})
+            variables.set("a", "new_a", ttl=50)
+            self.assertEqual(variables.next_expire_time(), 110)
+        with unittest.mock.patch("time.time", return_value=110):
+            self.assertEqual(variables.values, {"a": "new_a", "c": "c"})
+            self.assertEqual(variables.raw, {"a": ("new_a", 150), "c": ["c", 200]})
+
+    def test_view_follows_changes(self):
+        view = self.variables.view
+        self.variables.set("key", "value")
+        self.assertEqual(dict(self.variables.view), {"key": "value"})
+        self.variables.update("key", "new_value")
+        self.variables.set("other", 1)
+        self.variables.delete("other")
+        self.assertEqual(dict(view), {"key": "new_value"})
+        with self.assertRaises(TypeError):
+            view["key"] = "value"
+        values = self.variables.values
+        values["key"] = "changed"
+        self.assertEqual(self.variables.get("key"), "new_value")
+
+    def test_repeated_set(self):
+        with unittest.mock.patch("time.time", return_value=100):
+            self.variables.expire()
+            for ttl in range(1000):
+                self.variables.set("key", ttl, ttl=ttl + 1)
+            self.assertLess(len(self.variables._deadlines._heap), 100)
+        with unittest.mock.patch("time.time", return_value=500):
+            self.assertEqual(self.variables.values, {"key": 999})
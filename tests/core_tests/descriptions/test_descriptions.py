@@ -1,4 +1,5 @@
 import unittest
+from unittest.mock import Mock, patch
 
 from core.descriptions.descriptions import Descriptions, registered_description_factories, default_description_factory
 from core.repositories.base_repository import BaseRepository
@@ -47,3 +48,10 @@ class DescriptionsTest(unittest.TestCase):
     def test_get3(self):
         item2 = self.descriptions["repo_key3"]
         assert item2 == "raw_3"
+
+    def test_loaded_hooks(self):
+        hook = Mock()
+        with patch.dict("core.descriptions.descriptions.registered_descriptions_loaded_hooks", {"test": hook}):
+            self.descriptions["repo_key1"]
+            self.descriptions["repo_key1"]
+        hook.assert_called_once_with()
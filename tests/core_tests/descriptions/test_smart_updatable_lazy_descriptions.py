@@ -1,6 +1,12 @@
+import json
+import os
+import tempfile
 import unittest
 
+from core.descriptions.descriptions import Descriptions, registered_description_factories
 from core.descriptions.smart_updatable_descriptions_items import SmartUpdatableDescriptionsItems
+from core.repositories.folder_repository import UpdatableFolderRepository
+from core.utils.loader import ordered_json
 
 
 class MockFactory:
@@ -21,3 +27,75 @@ class SmartUpdatableLazyDescriptionsTest(unittest.TestCase):
         expected = "raw_data_value3"
         obj1 = self.descr["id1"]
         self.assertEqual(obj1.data, expected)
+
+    def test_update_data_reuses_unchanged_items(self):
+        obj2 = self.descr["id2"]
+        self.descr.update_data(dict(id1={"data": "raw_data_value3", "version": 0},
+                                    id2={"data": "raw_data_value2", "version": 0}))
+        self.assertIs(self.descr["id2"], obj2)
+        self.assertEqual(self.descr["id1"].data, "raw_data_value3")
+
+    def test_update_data_removes_items(self):
+        self.descr.update_data(dict(id1={"data": "raw_data_value1", "version": 0}))
+        self.assertNotIn("id2", self.descr)
+        self.assertIsNone(self.descr.get("id2"))
+
+    def test_update_data_force_update(self):
+        obj1 = self.descr["id1"]
+        self.descr.update_data(dict(id1={"data": "raw_data_value1", "version": 0, "force_update": True}))
+        self.assertIsNot(self.descr["id1"], obj1)
+
+    def test_prepare_update_keeps_current_version(self):
+        obj1 = self.descr["id1"]
+        update = self.descr.prepare_update(dict(id1={"data": "raw_data_value3", "version": 0},
+                                                id3={"data": "raw_data_value4", "version": 0}))
+        self.assertEqual(update.changed, frozenset(["id1", "id2", "id3"]))
+        self.assertIs(self.descr["id1"], obj1)
+        self.descr.apply_update(update)
+        self.assertEqual(self.descr["id1"].data, "raw_data_value3")
+        self.assertEqual(self.descr["id3"].data, "raw_data_value4")
+
+
+class SmartUpdatableDescriptionsAsyncTest(unittest.IsolatedAsyncioTestCase):
+    async def test_update_data_async(self):
+        descr = SmartUpdatableDescriptionsItems(MockFactory, dict(id1={"data": "raw_data_value1", "version": 0},
+                                                                  id2={"data": "raw_data_value2", "version": 0}))
+        obj2 = descr["id2"]
+        changed = await descr.update_data_async(dict(id1={"data": "raw_data_value3", "version": 0},
+                                                     id2={"data": "raw_data_value2", "version": 0}))
+        self.assertEqual(changed, frozenset(["id1"]))
+        self.assertEqual(descr["id1"].data, "raw_data_value3")
+        self.assertIs(descr["id2"], obj2)
+
+
+class DescriptionsReloadTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name
+        self._write("a.json", {"id1": {"data": "raw_data_value1", "version": 0}})
+        self._write("b.json", {"id2": {"data": "raw_data_value2", "version": 0}})
+        self.repository = UpdatableFolderRepository(self.path, loader=ordered_json, key="test", update_cooldown=0)
+        self.repository.load()
+        registered_description_factories["test"] = lambda items: SmartUpdatableDescriptionsItems(MockFactory, items)
+        self.descriptions = Descriptions({"test": self.repository})
+
+    def tearDown(self):
+        registered_description_factories.pop("test", None)
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, data, mtime_shift=0):
+        filename = os.path.join(self.path, name)
+        with open(filename, "w") as f:
+            json.dump(data, f)
+        if mtime_shift:
+            stat = os.stat(filename)
+            os.utime(filename, (stat.st_atime, stat.st_mtime + mtime_shift))
+
+    async def test_reload_changed_file(self):
+        obj2 = self.descriptions["test"]["id2"]
+        self.assertEqual(await self.descriptions.reload(), {})
+        self._write("a.json", {"id1": {"data": "raw_data_value3", "version": 0}}, mtime_shift=10)
+        changed = await self.descriptions.reload()
+        self.assertEqual(changed, {"test": frozenset(["id1"])})
+        self.assertEqual(self.descriptions["test"]["id1"].data, "raw_data_value3")
+        self.assertIs(self.descriptions["test"]["id2"], obj2)
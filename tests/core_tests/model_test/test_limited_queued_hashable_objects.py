@@ -55,3 +55,63 @@ class LimitedQueuedHashableObjectsDescriptionTest(unittest.TestCase):
         limited_queued_hashable_objects_description = LimitedQueuedHashableObjectsDescription({})
         self.assertEqual(limited_queued_hashable_objects_description.max_len,
                          LimitedQueuedHashableObjectsDescription.DEFAULT_MAX_LEN)
+
+
+class LimitedQueuedHashableObjectsCountsTest(unittest.TestCase):
+    def test_check_after_eviction(self):
+        descr = LimitedQueuedHashableObjectsDescription({"max_len": 3})
+        last_messages_id = LimitedQueuedHashableObjects([1, 2, 1], descr)
+        self.assertFalse(last_messages_id.check(4))
+        self.assertTrue(last_messages_id.check(1))
+        self.assertListEqual(last_messages_id.raw, [2, 1, 4])
+        last_messages_id.add(5)
+        last_messages_id.add(6)
+        self.assertFalse(last_messages_id.check(2))
+        self.assertListEqual(last_messages_id.raw, [5, 6, 2])
+
+    def test_clear(self):
+        last_messages_id = LimitedQueuedHashableObjects([1, 2], LimitedQueuedHashableObjectsDescription(None))
+        last_messages_id.clear()
+        self.assertFalse(last_messages_id.check(1))
+        self.assertListEqual(last_messages_id.raw, [1])
+
+
+class UnboundedQueuedHashableObjectsTest(unittest.TestCase):
+    def test_unbounded(self):
+        descr = LimitedQueuedHashableObjectsDescription({"max_len": None})
+        last_messages_id = LimitedQueuedHashableObjects([], descr)
+        for id in range(20):
+            last_messages_id.add(id)
+        self.assertListEqual(last_messages_id.get_list(), list(range(20)))
+        self.assertTrue(last_messages_id.check(1))
+
+    def test_zero_length(self):
+        descr = LimitedQueuedHashableObjectsDescription({"max_len": 0})
+        last_messages_id = LimitedQueuedHashableObjects([1], descr)
+        self.assertListEqual(last_messages_id.get_list(), [])
+        self.assertFalse(last_messages_id.check(1))
+
+
+class LimitedQueuedHashableObjectsFingerprintTest(unittest.TestCase):
+    def setUp(self):
+        self.descr = LimitedQueuedHashableObjectsDescription({"max_len": 3, "fingerprint_size": 8})
+
+    def test_raw_fingerprints(self):
+        last_messages_id = LimitedQueuedHashableObjects(["message_1", "message_2"], self.descr)
+        raw = last_messages_id.raw
+        self.assertEqual(len(raw), 2)
+        self.assertTrue(all(item.startswith("#") and len(item) == 17 for item in raw))
+        self.assertNotEqual(raw[0], raw[1])
+
+    def test_check_restored(self):
+        raw = LimitedQueuedHashableObjects(["message_1", "message_2"], self.descr).raw
+        last_messages_id = LimitedQueuedHashableObjects(raw, self.descr)
+        self.assertListEqual(last_messages_id.raw, raw)
+        self.assertTrue(last_messages_id.check("message_1"))
+        self.assertFalse(last_messages_id.check("message_3"))
+        self.assertFalse(last_messages_id.check("message_4"))
+        self.assertFalse(last_messages_id.check("message_1"))
+
+    def test_description(self):
+        self.assertEqual(self.descr.fingerprint_size, 8)
+        self.assertIsNone(LimitedQueuedHashableObjectsDescription(None).fingerprint_size)
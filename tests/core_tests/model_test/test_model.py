@@ -2,7 +2,7 @@
 import sys
 import unittest
 
-from core.model.field import Field
+from core.model.field import Field, UserDescription
 from core.model.model import Model
 
 
@@ -26,6 +26,28 @@ class MockModel(Model):
         return [Field("field1", MockField, "field1_descr")]
 
 
+class CountingField(MockField):
+    created = 0
+
+    def __init__(self, value, description, *args):
+        super().__init__(value, description, *args)
+        CountingField.created += 1
+
+
+class UserWithDescriptions:
+    descriptions = {"field2": "field2_descr"}
+
+
+class LazyModel(Model):
+    FIELDS = [Field("field1", CountingField, "field1_descr"),
+              Field("field2", CountingField, UserDescription("field2")),
+              Field("field3", CountingField, "field3_descr", lazy=False)]
+
+    @property
+    def fields(self):
+        return self.FIELDS
+
+
 class ModelTest(unittest.TestCase):
     def setUp(self):
         self.model = MockModel(values={"field1": "field1_data"}, user=None)
@@ -45,3 +67,33 @@ class ModelTest(unittest.TestCase):
     def test_raw(self):
         raw = self.model.raw
         assert raw == dict(field1="field1_data")
+
+
+class LazyModelTest(unittest.TestCase):
+    def setUp(self):
+        CountingField.created = 0
+        self.values = {"field1": {"a": [1, 2]}, "field2": "field2_data", "field3": "field3_data"}
+        self.model = LazyModel(values=self.values, user=UserWithDescriptions())
+
+    def test_created_on_first_access(self):
+        self.assertEqual(CountingField.created, 1)
+        self.assertTrue(self.model.is_materialized("field3"))
+        self.assertFalse(self.model.is_materialized("field2"))
+        field2 = self.model.field2
+        self.assertEqual((field2.value, field2.descr), ("field2_data", "field2_descr"))
+        self.assertIs(self.model.field2, field2)
+        self.assertEqual(CountingField.created, 2)
+
+    def test_untouched_raw_passed_through(self):
+        raw = self.model.raw
+        self.assertEqual(raw, self.values)
+        self.assertIs(raw["field1"], self.values["field1"])
+        self.assertEqual(CountingField.created, 1)
+
+    def test_touched_raw(self):
+        self.model.field1.fill("new_value")
+        self.assertEqual(self.model.raw, {**self.values, "field1": "new_value"})
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.model.field_unknown
@@ -47,7 +47,7 @@ class TestFromMessage(TestCase):
         self.assertEqual(input_msg["uuid"]["userChannel"], message.channel)
         self.assertEqual(input_msg["messageName"], message.type)
         self.assertEqual(input_msg["uuid"]["userId"], message.uid)
-        self.assertEqual(json.dumps(input_msg, ensure_ascii=False), message.as_str)
+        self.assertEqual(input_msg, json.loads(message.as_str))
         self.assertEqual("userId_B2C", message.db_uid)
         self.assertDictEqual(input_msg["uuid"], message.uuid)
         self.assertDictEqual(input_msg["payload"], message.payload)
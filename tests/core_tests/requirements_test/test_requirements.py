@@ -1,6 +1,8 @@
 import asyncio
+import hashlib
 import os
 import unittest
+import zlib
 from time import time
 from unittest.mock import Mock, patch
 
@@ -260,6 +262,20 @@ class RequirementTest(unittest.TestCase):
         text_normalization_result = None
         self.assertFalse(requirement.check(text_normalization_result, user))
 
+    def test_rolling_requirement_bucket_once_per_message(self):
+        user = PicklableMock()
+        user.id = "353454"
+        user.message_vars = Variables(None, user, False)
+        bucket = int(hashlib.sha256(b"353454").hexdigest(), 16) % 100
+        requirements = [RollingRequirement({"percent": percent}) for percent in (bucket, bucket + 1, 100)]
+        with patch("hashlib.sha256", wraps=hashlib.sha256) as sha256:
+            self.assertEqual([requirement.check(None, user) for requirement in requirements], [False, True, True])
+        sha256.assert_called_once()
+        fast = RollingRequirement({"percent": zlib.crc32(b"353454") % 100 + 1, "hash": "crc32"})
+        self.assertTrue(fast.check(None, user))
+        self.assertEqual(user.message_vars.get("rolling_buckets"),
+                         {("sha256", "353454"): bucket, ("crc32", "353454"): zlib.crc32(b"353454") % 100})
+
     def test_time_requirement_true(self):
         user = PicklableMock()
         user.id = "353454"
@@ -654,6 +670,14 @@ class RequirementTest(unittest.TestCase):
         mock_user.settings = {"template_settings": {"test_false_toggle_name": False}}
         self.assertFalse(req.check(Mock(), mock_user))
 
+    def test_feature_toggle_updated_in_place(self):
+        req = FeatureToggleRequirement({"toggle_name": "toggle"})
+        mock_user = Mock()
+        mock_user.settings = {"template_settings": {"toggle": True}}
+        self.assertTrue(req.check(Mock(), mock_user))
+        mock_user.settings["template_settings"]["toggle"] = False
+        self.assertFalse(req.check(Mock(), mock_user))
+
     def test_false_caching_different(self):
         user = PicklableMock()
         user.message_vars = Variables(None, user, False)
@@ -0,0 +1,117 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from core.utils.bounded_cache import BoundedCache, CacheRegistry, cache_registry
+
+
+class Timer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBoundedCache(TestCase):
+    def test_lru_max_entries(self):
+        cache = BoundedCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        self.assertEqual(cache["a"], 1)
+        cache["c"] = 3
+        self.assertEqual(list(cache), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats.as_dict(), {"hit": 1, "miss": 1, "eviction": 1, "expiration": 0})
+
+    def test_max_bytes(self):
+        cache = BoundedCache(max_bytes=10, sizeof=len)
+        cache["a"] = "x" * 4
+        cache["b"] = "x" * 4
+        cache["c"] = "x" * 4
+        self.assertEqual((list(cache), cache.bytes), (["b", "c"], 8))
+        cache["b"] = "x"
+        self.assertEqual(cache.bytes, 5)
+        cache["big"] = "x" * 11
+        self.assertNotIn("big", cache)
+        self.assertEqual(cache.bytes, 5)
+
+    def test_ttl(self):
+        timer = Timer()
+        cache = BoundedCache(ttl=10, timer=timer)
+        cache["a"] = 1
+        timer.now = 5
+        cache["b"] = 2
+        timer.now = 10
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.get("b"), 2)
+        self.assertEqual(len(cache), 2)
+        # полный проход не чаще раза в ttl
+        timer.now = 16
+        cache["c"] = 3
+        self.assertEqual(list(cache), ["c"])
+        self.assertEqual(cache.stats.expiration, 2)
+
+    def test_zero_ttl_not_stored(self):
+        cache = BoundedCache(ttl=0)
+        cache["a"] = 1
+        self.assertEqual(len(cache), 0)
+
+    def test_registry_config(self):
+        registry = CacheRegistry()
+        with patch("core.utils.bounded_cache.cache_registry", registry):
+            cache = BoundedCache("test", max_entries=10)
+            for key in range(5):
+                cache[key] = key
+            registry.apply_config({"test": {"max_entries": 2, "unknown": 1}})
+            self.assertEqual((cache.max_entries, list(cache)), (2, [3, 4]))
+            self.assertEqual(BoundedCache("test", max_entries=10).max_entries, 2)
+            self.assertEqual(registry.stats()["test"]["entries"], 2)
+
+    def test_metrics_reported(self):
+        cache = BoundedCache("test_metrics")
+        cache.get("a")
+        cache["a"] = 1
+        cache.get("a")
+        with patch("core.utils.bounded_cache.monitoring") as monitoring:
+            cache.report_metrics()
+            cache.report_metrics()
+        self.assertEqual(sorted(call.args for call in monitoring.counter_cache_events.call_args_list),
+                         [("test_metrics", "hit", 1), ("test_metrics", "miss", 1)])
+        self.assertIn(cache, cache_registry._caches)
+
+    def test_registry_reports_metrics_per_name(self):
+        registry = CacheRegistry()
+        with patch("core.utils.bounded_cache.cache_registry", registry):
+            caches = [BoundedCache("test_shared"), BoundedCache("test_shared")]
+            for cache in caches:
+                cache.get("a")
+            with patch("core.utils.bounded_cache.monitoring") as monitoring:
+                registry.report_metrics()
+                registry.report_metrics()
+        monitoring.counter_cache_events.assert_called_once_with("test_shared", "miss", 2)
+
+
+class TestBoundedCacheAsync(IsolatedAsyncioTestCase):
+    async def test_get_or_load_single_flight(self):
+        cache = BoundedCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0)
+            return "value"
+
+        self.assertEqual(await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5))), ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get("key"), "value")
+
+    async def test_get_or_load_error_not_cached(self):
+        cache = BoundedCache()
+
+        async def loader():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            await cache.get_or_load("key", loader)
+        self.assertNotIn("key", cache)
@@ -0,0 +1,116 @@
+import asyncio
+from unittest import TestCase, IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock
+
+from core.utils.concurrency_limiter import ConcurrencyLimiter, AIMDConcurrencyLimiter, GradientConcurrencyLimiter
+
+
+class TestConcurrencyLimiter(IsolatedAsyncioTestCase):
+    async def test_unlimited_by_default(self):
+        limiter = ConcurrencyLimiter()
+        for _ in range(100):
+            await limiter.acquire()
+        self.assertIsNone(limiter.limit)
+        self.assertFalse(limiter.is_limited)
+        self.assertEqual(limiter.in_flight, 100)
+
+    async def test_acquire_waits_for_release(self):
+        limiter = ConcurrencyLimiter({"limit": 2})
+        await limiter.acquire()
+        await limiter.acquire()
+        self.assertTrue(limiter.is_limited)
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+        limiter.release(0.01)
+        await asyncio.wait_for(waiter, 1)
+        self.assertEqual(limiter.in_flight, 2)
+
+
+class TestAIMDConcurrencyLimiter(TestCase):
+    def setUp(self):
+        self.limiter = AIMDConcurrencyLimiter({"initial_limit": 10, "min_limit": 2, "max_limit": 20,
+                                               "latency_threshold": 0.5, "backoff_ratio": 0.5})
+
+    def test_decrease_on_error(self):
+        self.limiter.in_flight = 1
+        self.limiter.release(0.01, error=True)
+        self.assertEqual(self.limiter.limit, 5)
+
+    def test_decrease_on_slow_message(self):
+        self.limiter.in_flight = 1
+        self.limiter.release(1.0)
+        self.assertEqual(self.limiter.limit, 5)
+
+    def test_min_limit(self):
+        for _ in range(10):
+            self.limiter.in_flight = 1
+            self.limiter.release(1.0)
+        self.assertEqual(self.limiter.limit, 2)
+
+    def test_increase_when_saturated(self):
+        for _ in range(500):
+            self.limiter.in_flight = self.limiter.limit
+            self.limiter.release(0.01)
+        self.assertEqual(self.limiter.limit, 20)
+
+    def test_no_increase_when_underused(self):
+        for _ in range(100):
+            self.limiter.in_flight = 1
+            self.limiter.release(0.01)
+        self.assertEqual(self.limiter.limit, 10)
+
+
+class TestGradientConcurrencyLimiter(TestCase):
+    def setUp(self):
+        self.limiter = GradientConcurrencyLimiter({"initial_limit": 20, "min_limit": 1, "max_limit": 100})
+
+    def _feed(self, latency, count):
+        for _ in range(count):
+            self.limiter.in_flight = self.limiter.limit
+            self.limiter.release(latency)
+
+    def test_grows_with_stable_latency(self):
+        self._feed(0.05, 50)
+        self.assertGreater(self.limiter.limit, 20)
+
+    def test_shrinks_when_latency_grows(self):
+        self._feed(0.05, 200)
+        grown_limit = self.limiter.limit
+        self._feed(1.0, 50)
+        self.assertLess(self.limiter.limit, grown_limit)
+
+
+class TestMainLoopConcurrencySlots(IsolatedAsyncioTestCase):
+    def build_main_loop(self, consumer):
+        from smart_kit.start_points.main_loop_kafka import MainLoop
+        main_loop = MainLoop.__new__(MainLoop)
+        main_loop.consumers = {"main": consumer}
+        main_loop.concurrency_limiter = ConcurrencyLimiter()
+        main_loop.loop = asyncio.get_running_loop()
+        main_loop.concurrent_messages = 0
+        main_loop.is_work = True
+        main_loop.app_name = "test_app"
+        return main_loop
+
+    async def test_slot_released_on_poll_error(self):
+        consumer = Mock()
+        consumer.poll.side_effect = RuntimeError("poll failed")
+        main_loop = self.build_main_loop(consumer)
+        main_loop.concurrency_limiter.release = Mock(wraps=main_loop.concurrency_limiter.release)
+        with self.assertRaises(RuntimeError):
+            await main_loop.poll_kafka("main", [])
+        self.assertEqual(main_loop.concurrency_limiter.in_flight, 0)
+        main_loop.concurrency_limiter.release.assert_called_once_with(None, error=True)
+
+    async def test_skipped_message_is_error(self):
+        main_loop = self.build_main_loop(Mock())
+        main_loop.concurrency_limiter.release = Mock()
+        main_loop.process_message = AsyncMock(return_value=False)
+        kwargs = {"kafka_key": "main", "mq_message": Mock(), "polled_time": main_loop.loop.time()}
+        await main_loop.do_incoming_handling(kwargs, {"stats": "", "worker_id": 0})
+        self.assertTrue(main_loop.concurrency_limiter.release.call_args.kwargs["error"])
+
+        main_loop.process_message = AsyncMock(return_value=True)
+        await main_loop.do_incoming_handling(kwargs, {"stats": "", "worker_id": 0})
+        self.assertFalse(main_loop.concurrency_limiter.release.call_args.kwargs["error"])
@@ -0,0 +1,65 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import Mock
+
+from croniter import croniter
+
+from core.basic_models.requirement.basic_requirements import DateTimeRequirement
+from core.utils.cron import CronSchedule
+
+EXPRESSIONS = [
+    "*/17 14-19 * * mon",
+    "* * * * 6,7",
+    "0-29/5 9-18 * * 1-5",
+    "30 2 * * *",
+    "* * L * *",
+    "0 12 * * 5#2",
+    "15 10 1,15 * 1",
+    "* 0-3 1 2 *",
+]
+
+
+class TestCronSchedule(TestCase):
+    def test_equivalent_to_croniter_match(self):
+        rnd = random.Random(5)
+        start = datetime(2023, 1, 1)
+        for expression in EXPRESSIONS:
+            schedule = CronSchedule(expression)
+            self.assertTrue(schedule.is_compiled)
+            for _ in range(500):
+                dt = start + timedelta(seconds=rnd.randrange(3 * 366 * 86400))
+                self.assertEqual(schedule.match(dt), croniter.match(expression, dt), (expression, dt))
+
+    def test_not_compiled(self):
+        self.assertFalse(CronSchedule("@daily").is_compiled)
+        self.assertTrue(CronSchedule("@daily").match(datetime(2023, 1, 1, 0, 0, 30)))
+        self.assertFalse(CronSchedule("0 0 0 * * *").is_compiled)
+        with self.assertRaises(Exception):
+            CronSchedule("61 * * * *").match(datetime(2023, 1, 1))
+
+
+class TestDateTimeRequirementDST(TestCase):
+    def setUp(self):
+        self.tz = os.environ.get("TZ")
+        os.environ["TZ"] = "Europe/Berlin"
+        time.tzset()
+
+    def tearDown(self):
+        if self.tz is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = self.tz
+        time.tzset()
+
+    def test_minutes_around_transitions(self):
+        requirement = DateTimeRequirement({"match_cron": "*/10 1-3 * * *"})
+        user = Mock()
+        # переход на летнее (26.03.2023) и зимнее (29.10.2023) время
+        for start in (1679788800, 1698537600):
+            for timestamp in range(start - 4 * 3600, start + 4 * 3600, 30):
+                user.message.payload = {"meta": {"time": {"timestamp": timestamp * 1000}}}
+                expected = croniter.match("*/10 1-3 * * *", datetime.fromtimestamp(timestamp))
+                self.assertEqual(requirement.check(None, user), expected, timestamp)
@@ -0,0 +1,95 @@
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from unittest import TestCase, skipUnless
+
+from pythonjsonlogger.jsonlogger import JsonEncoder
+
+from core.utils import json_codec
+from core.utils.loader import ordered_json
+from smart_kit.utils.logger_writer.logger_formatter import SmartKitJsonFormatter
+
+
+@dataclass
+class Point:
+    x: int
+
+
+def non_serializable(o):
+    return f"<non-serializable: {type(o).__qualname__}>"
+
+
+DATA = OrderedDict([("b", 1), ("a", [1.5, None, True]), ("text", "привет \U0001F600"), ("quote", "\"\\")])
+
+
+class BackendTestMixin:
+    BACKEND = None
+
+    def setUp(self):
+        self.initial = json_codec.get_backend()
+        json_codec.set_backend(self.BACKEND)
+
+    def tearDown(self):
+        json_codec.set_backend(self.initial)
+
+    def assertSameJson(self, result, expected):
+        self.assertEqual(json.loads(result), json.loads(expected))
+        self.assertEqual(list(json.loads(result, object_pairs_hook=OrderedDict)),
+                         list(json.loads(expected, object_pairs_hook=OrderedDict)))
+
+    def test_key_order(self):
+        self.assertSameJson(json_codec.dumps(DATA), json.dumps(DATA))
+        self.assertEqual(json_codec.dumps({"b": 1, "a": 2}, sort_keys=True).replace(" ", ""), '{"a":2,"b":1}')
+
+    def test_ensure_ascii(self):
+        result = json_codec.dumps(DATA)
+        self.assertTrue(result.isascii())
+        self.assertEqual(result.replace(" ", ""), json.dumps(DATA).replace(" ", ""))
+        self.assertIn("привет", json_codec.dumps(DATA, ensure_ascii=False))
+
+    def test_default(self):
+        data = {"time": datetime(2020, 1, 2), "point": Point(1), "set": {1}}
+        self.assertSameJson(json_codec.dumps(data, default=non_serializable),
+                            json.dumps(data, default=non_serializable))
+        self.assertSameJson(json_codec.dumps(data, cls=JsonEncoder), json.dumps(data, cls=JsonEncoder))
+        with self.assertRaises(TypeError):
+            json_codec.dumps(data)
+
+    def test_fallback(self):
+        data = {1: 2 ** 70, None: [float("inf")]}
+        self.assertEqual(json_codec.dumps(data), json.dumps(data))
+        self.assertEqual(json_codec.dumps(data, indent=2), json.dumps(data, indent=2))
+        self.assertEqual(json_codec.loads('{"a": NaN, "b": 100000000000000000000000}')["b"], 10 ** 23)
+
+    def test_loads(self):
+        self.assertEqual(json_codec.loads(json.dumps(DATA).encode()), DATA)
+        self.assertIsInstance(ordered_json('{"b": {"c": 1}, "a": 2}')["b"], OrderedDict)
+        with self.assertRaises(json.JSONDecodeError):
+            json_codec.loads("{")
+
+    def test_logger_formatter(self):
+        record = logging.LogRecord("test", logging.INFO, __file__, 0, "привет %(uid)s", None, None)
+        record.args = {"uid": "1", "time": datetime(2020, 1, 2)}
+        result = SmartKitJsonFormatter(json_ensure_ascii=False).format(record)
+        log_record = json.loads(result)
+        self.assertEqual(log_record["args"], {"uid": "1", "time": "2020-01-02T00:00:00"})
+        self.assertEqual(log_record["message"], "привет 1")
+        self.assertEqual(log_record["log_size"], len(result) - len(',"log_size":') - len(str(log_record["log_size"])))
+
+
+class TestJsonBackend(BackendTestMixin, TestCase):
+    BACKEND = json_codec.JSON_BACKEND
+
+
+@skipUnless(json_codec.orjson is not None, "orjson is not installed")
+class TestOrjsonBackend(BackendTestMixin, TestCase):
+    BACKEND = json_codec.ORJSON_BACKEND
+
+
+class TestBackendSelection(TestCase):
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            json_codec.set_backend("unknown")
+        self.assertIn(json_codec.get_backend(), json_codec.available_backends())
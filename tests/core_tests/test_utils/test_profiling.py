@@ -0,0 +1,108 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+from twisted.web.test.requesthelper import DummyRequest
+
+from core.monitoring.healthcheck_handler import ProfilingResource
+from core.utils.profiling import StackSampler, StageTimings, Profiler, profiler, to_collapsed
+
+
+def busy_function(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class TestStackSampler(TestCase):
+    def test_sample_thread(self):
+        stop_event = threading.Event()
+        thread = threading.Thread(target=busy_function, args=(stop_event,))
+        thread.start()
+        try:
+            sampler = StackSampler(thread_ids=[thread.ident])
+            for _ in range(5):
+                sampler.sample()
+        finally:
+            stop_event.set()
+            thread.join()
+        self.assertEqual(sampler.samples, 5)
+        self.assertEqual(sum(sampler.stacks.values()), 5)
+        self.assertTrue(all("busy_function" in stack for stack in sampler.stacks))
+
+    def test_to_collapsed(self):
+        self.assertEqual(to_collapsed({"a;b": 2, "a": 1, "c": 0}), "a 1\na;b 2\n")
+
+
+class TestStageTimings(TestCase):
+    def test_summary(self):
+        timings = StageTimings()
+        for i in range(1, 101):
+            timings.record("load_user", i / 1000)
+        summary = timings.summary()["load_user"]
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["max_ms"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 51)
+        self.assertAlmostEqual(summary["p95_ms"], 96)
+
+
+class TestProfiler(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.profiler = Profiler()
+        self.profiler.apply_config({"sessions_path": self.tmp_dir.name})
+
+    def tearDown(self):
+        self.profiler.stop_session()
+        self.tmp_dir.cleanup()
+
+    def test_session(self):
+        session = self.profiler.start_session(duration=10, interval=0.001, memory=True)
+        self.assertTrue(self.profiler.active)
+        self.assertRaises(RuntimeError, self.profiler.start_session)
+        self.profiler.record_stage("answer", 0.01)
+        data = [list(range(100)) for _ in range(100)]
+        time.sleep(0.05)
+        self.profiler.stop_session()
+        self.assertFalse(self.profiler.active)
+        self.assertGreater(session.sampler.samples, 0)
+        suffixes = sorted(os.path.basename(filename).split(".", 1)[1] for filename in session.files)
+        self.assertEqual(suffixes, ["cpu.folded", "memory.folded", "memory.txt", "stages.json"])
+        with open(os.path.join(self.tmp_dir.name, f"{session.id}.stages.json")) as f:
+            self.assertEqual(json.load(f)["answer"]["count"], 1)
+        self.assertIsNotNone(data)
+
+    def test_session_time_boxed(self):
+        session = self.profiler.start_session(duration=0.05)
+        time.sleep(0.3)
+        self.assertFalse(session.active)
+        self.assertTrue(session.files)
+
+    def test_rejects_non_positive_values(self):
+        self.assertRaises(ValueError, self.profiler.start_session, duration=0)
+        self.assertRaises(ValueError, self.profiler.start_session, duration=-1)
+        self.assertRaises(ValueError, self.profiler.start_session, interval=0)
+        self.assertRaises(ValueError, self.profiler.start_session, interval=-0.01)
+        self.assertFalse(self.profiler.active)
+
+    def test_sampler_min_interval(self):
+        self.assertEqual(StackSampler(interval=1e-9).interval, StackSampler.MIN_INTERVAL)
+
+    def test_record_stage_without_session(self):
+        self.profiler.record_stage("answer", 0.01)
+        self.assertEqual(self.profiler.status(), {"active": False})
+
+
+class TestProfilingResource(TestCase):
+    def test_start_rejects_non_positive_values(self):
+        resource = ProfilingResource()
+        for name in (b"duration", b"interval"):
+            for value in (b"0", b"-1"):
+                request = DummyRequest([b"start"])
+                request.args = {name: [value]}
+                response = json.loads(resource.render_GET(request))
+                self.assertEqual(request.responseCode, 400)
+                self.assertIn("error", response)
+        self.assertFalse(profiler.active)
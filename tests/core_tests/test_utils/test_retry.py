@@ -0,0 +1,178 @@
+# coding: utf-8
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock
+
+from core.db_adapter.os_adapter import OSAdapter
+from core.utils.retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy
+
+
+class HandledException(Exception):
+    pass
+
+
+class Timer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+FAST = {"backoff_base": 0.0001, "backoff_max": 0.001}
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.timer = Timer()
+
+    def test_delay_bounds(self):
+        policy = RetryPolicy("test", {"backoff_base": 0.1, "backoff_max": 1})
+        for attempt, expected in enumerate([0.1, 0.2, 0.4, 0.8, 1, 1]):
+            for _ in range(20):
+                delay = policy.delay(attempt)
+                self.assertGreaterEqual(delay, expected / 2)
+                self.assertLessEqual(delay, expected)
+
+    def test_retry_until_success(self):
+        action = Mock(side_effect=[HandledException(), HandledException(), "ok"])
+        on_retry = Mock()
+        policy = RetryPolicy("test", FAST)
+        self.assertEqual(policy.run(action, 1, handled=HandledException, on_retry=on_retry, key=2), "ok")
+        self.assertEqual(action.call_count, 3)
+        action.assert_called_with(1, key=2)
+        self.assertEqual(on_retry.call_count, 2)
+
+    def test_all_tries_fail(self):
+        action = Mock(side_effect=HandledException())
+        policy = RetryPolicy("test", {**FAST, "try_count": 3})
+        with self.assertRaises(HandledException):
+            policy.run(action, handled=HandledException)
+        self.assertEqual(action.call_count, 3)
+        self.assertEqual(policy.run(action, handled=HandledException, on_all_tries_fail=lambda: "fallback"),
+                         "fallback")
+
+    def test_budget_limits_retries(self):
+        policy = RetryPolicy("test", {**FAST, "try_count": 10, "budget_rate": 1, "budget_burst": 3,
+                                      "breaker_threshold": None}, timer=self.timer)
+        action = Mock(side_effect=HandledException())
+        with self.assertRaises(HandledException):
+            policy.run(action, handled=HandledException)
+        self.assertEqual(action.call_count, 4)
+        action.reset_mock()
+        with self.assertRaises(HandledException):
+            policy.run(action, handled=HandledException)
+        self.assertEqual(action.call_count, 1)
+        self.timer.now += 2
+        action.reset_mock()
+        with self.assertRaises(HandledException):
+            policy.run(action, handled=HandledException)
+        self.assertEqual(action.call_count, 3)
+
+    def test_breaker_fails_fast(self):
+        policy = RetryPolicy("test", {**FAST, "try_count": 1, "breaker_threshold": 2, "breaker_timeout": 5},
+                             timer=self.timer)
+        failing = Mock(side_effect=HandledException())
+        for _ in range(2):
+            with self.assertRaises(HandledException):
+                policy.run(failing, handled=HandledException)
+        self.assertEqual(policy.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            policy.run(failing, handled=HandledException)
+        self.assertEqual(failing.call_count, 2)
+
+        self.timer.now += 5
+        with self.assertRaises(HandledException):
+            policy.run(failing, handled=HandledException)
+        self.assertEqual(policy.breaker.state, CircuitBreaker.OPEN)
+
+        self.timer.now += 5
+        self.assertEqual(policy.run(lambda: "ok", handled=HandledException), "ok")
+        self.assertEqual(policy.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_not_handled_exception_releases_trial(self):
+        breaker = CircuitBreaker("test", threshold=1, timeout=1, timer=self.timer)
+        policy = RetryPolicy("test", FAST, timer=self.timer)
+        policy.breaker = breaker
+        breaker.on_failure()
+        self.timer.now += 1
+        with self.assertRaises(KeyError):
+            policy.run(Mock(side_effect=KeyError()), handled=HandledException)
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(policy.run(lambda: "ok", handled=HandledException), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_budget(self):
+        budget = RetryBudget(rate=2, burst=2, timer=self.timer)
+        self.assertEqual([budget.try_acquire() for _ in range(3)], [True, True, False])
+        self.timer.now += 0.5
+        self.assertEqual([budget.try_acquire() for _ in range(2)], [True, False])
+
+    def test_breaker_and_budget_opt_in(self):
+        policy = RetryPolicy("test")
+        self.assertIsNone(policy.breaker)
+        self.assertIsNone(policy.budget)
+        policy = RetryPolicy("test", {"breaker_threshold": 3, "budget_rate": 5})
+        self.assertEqual(policy.breaker.threshold, 3)
+        self.assertEqual(policy.budget.rate, 5)
+
+    def test_expected_not_retried(self):
+        action = Mock(side_effect=FileNotFoundError())
+        policy = RetryPolicy("test", {**FAST, "breaker_threshold": 1})
+        for _ in range(3):
+            with self.assertRaises(FileNotFoundError):
+                policy.run(action, handled=Exception, expected=FileNotFoundError)
+        self.assertEqual(action.call_count, 3)
+        self.assertEqual(policy.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(policy.run(lambda: "ok", handled=Exception), "ok")
+
+
+class AsyncRetryPolicyTest(unittest.IsolatedAsyncioTestCase):
+    async def test_async_retry(self):
+        calls = []
+
+        async def action(value):
+            calls.append(value)
+            if len(calls) < 3:
+                raise HandledException()
+            return value
+
+        prepared = []
+
+        async def on_retry():
+            prepared.append(True)
+
+        policy = RetryPolicy("test", FAST)
+        self.assertEqual(await policy.async_run(action, "ok", handled=HandledException, on_retry=on_retry), "ok")
+        self.assertEqual(calls, ["ok"] * 3)
+        self.assertEqual(prepared, [True, True])
+
+    async def test_async_all_tries_fail(self):
+        async def action():
+            raise HandledException()
+
+        async def on_all_tries_fail():
+            return "fallback"
+
+        policy = RetryPolicy("test", {**FAST, "try_count": 2})
+        self.assertEqual(await policy.async_run(action, handled=HandledException,
+                                                on_all_tries_fail=on_all_tries_fail), "fallback")
+
+
+class OSAdapterRetryTest(unittest.TestCase):
+    def test_missing_files(self):
+        adapter = OSAdapter({"retry": {"breaker_threshold": 2}})
+        with tempfile.TemporaryDirectory() as path:
+            existing = os.path.join(path, "existing")
+            with open(existing, "w") as f:
+                f.write("data")
+            start = time.monotonic()
+            for index in range(5):
+                with self.assertRaises(FileNotFoundError):
+                    adapter.open(os.path.join(path, f"missing_{index}"))
+            self.assertLess(time.monotonic() - start, 0.5)
+            with adapter.open(existing) as f:
+                self.assertEqual(f.read(), "data")
+        self.assertEqual(adapter.retry_policy.breaker.state, CircuitBreaker.CLOSED)
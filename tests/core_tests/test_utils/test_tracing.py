@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.utils.tracing import Tracer, TraceFileExporter, SpanExporter, NOOP_SPAN
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class TestTracer(TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+        self.exporter = ListExporter()
+
+    def enable(self):
+        self.tracer.enabled = True
+        self.tracer.exporters = [self.exporter]
+
+    def test_disabled_returns_noop(self):
+        with self.tracer.span("answer", scenario="test") as span:
+            span.set_attribute("key", "value")
+        self.assertIs(span, NOOP_SPAN)
+        self.assertIs(self.tracer.current_span(), NOOP_SPAN)
+        self.assertEqual(self.exporter.spans, [])
+
+    def test_nested_spans(self):
+        self.enable()
+        with self.tracer.span("process_message") as root:
+            with self.tracer.span("load_user") as child:
+                self.assertIs(self.tracer.current_span(), child)
+            self.assertIs(self.tracer.current_span(), root)
+        self.assertEqual([span.name for span in self.exporter.spans], ["load_user", "process_message"])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertTrue(root.is_root)
+        self.assertGreaterEqual(root.duration, child.duration)
+
+    def test_error_is_recorded(self):
+        self.enable()
+        with self.assertRaises(ValueError):
+            with self.tracer.span("answer"):
+                raise ValueError()
+        self.assertEqual(self.exporter.spans[0].error, "ValueError")
+
+    def test_async_tasks_have_own_parents(self):
+        self.enable()
+
+        @self.tracer.traced("db_get")
+        async def get():
+            await asyncio.sleep(0)
+
+        async def process(name):
+            with self.tracer.span(name):
+                await get()
+
+        async def main():
+            await asyncio.gather(process("first"), process("second"))
+
+        asyncio.run(main())
+        spans = {span.span_id: span for span in self.exporter.spans}
+        db_spans = [span for span in self.exporter.spans if span.name == "db_get"]
+        self.assertEqual(len(db_spans), 2)
+        self.assertEqual({spans[span.parent_id].name for span in db_spans}, {"first", "second"})
+
+    def test_apply_config(self):
+        self.tracer.apply_config({"enabled": True, "trace_file": {"path": "/tmp/traces.jsonl"}}, "app")
+        self.assertTrue(self.tracer.enabled)
+        self.assertEqual(len(self.tracer.exporters), 2)
+        self.tracer.apply_config({}, "app")
+        self.assertFalse(self.tracer.enabled)
+
+    @patch("core.utils.tracing.monitoring")
+    def test_histogram_exporter(self, monitoring_mock):
+        self.tracer.apply_config({"enabled": True}, "app")
+        with self.tracer.span("save_user"):
+            pass
+        monitoring_mock.sampling_span_time.assert_called_once()
+        self.assertEqual(monitoring_mock.sampling_span_time.call_args[0][:2], ("app", "save_user"))
+
+
+class TestTraceFileExporter(TestCase):
+    def test_sampled_trace_written_on_root_end(self):
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "traces", "traces.jsonl")
+            tracer = Tracer()
+            tracer.enabled = True
+            tracer.exporters = [TraceFileExporter(filename, sample_rate=1)]
+            for _ in range(2):
+                with tracer.span("process_message"):
+                    with tracer.span("requirement", scenario="scenario", node="node"):
+                        pass
+            with open(filename) as f:
+                traces = [json.loads(line) for line in f]
+        self.assertEqual(len(traces), 2)
+        self.assertEqual([span["name"] for span in traces[0]["spans"]], ["requirement", "process_message"])
+        self.assertEqual(traces[0]["spans"][0]["attributes"], {"scenario": "scenario", "node": "node"})
+
+    def test_not_sampled(self):
+        exporter = TraceFileExporter("unused.jsonl", sample_rate=0)
+        self.assertFalse(exporter.is_sampled("f" * 16))
+        self.assertFalse(exporter.is_sampled("0" * 16))
+        self.assertTrue(TraceFileExporter("unused.jsonl", sample_rate=1).is_sampled("f" * 16))
@@ -0,0 +1,108 @@
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+from core.basic_models.actions.string_actions import StringAction
+from core.unified_template.unified_template import UnifiedTemplate, RENDER_STATIC, RENDER_CACHED, RENDER_DYNAMIC
+
+
+class TestTemplateDependencies(TestCase):
+    def test_dependencies(self):
+        cases = {
+            "static text": frozenset(),
+            "{{ 1 + 2 }}": frozenset(),
+            "{{ payload.amount|int }} {{ payload['currency'] }}": {("payload", "amount"), ("payload", "currency")},
+            "{% for item in items %}{{ item.name }}{{ loop.index }}{% endfor %}": {("items",)},
+            "{% set x = payload %}{{ x.a }}": {("payload",)},
+            "{{ payload[key] }}": {("payload",), ("key",)},
+            "{{ payload.get('a') }}": {("payload", "get")},
+            "{{ now() }}": None,
+            "{{ [1, 2]|random }}": None,
+            "{{ range(3)|list }}": frozenset(),
+        }
+        for source, expected in cases.items():
+            self.assertEqual(UnifiedTemplate(source).dependencies, expected, source)
+
+    def test_support_templates(self):
+        template = UnifiedTemplate({"type": "unified_template", "template": "{{ name }}: {{ amount }}",
+                                    "support_templates": {"name": "{{ payload.name|upper }}"}})
+        self.assertEqual(template.dependencies, {("payload", "name"), ("amount",)})
+
+    def test_render_kind(self):
+        self.assertEqual(UnifiedTemplate("text").render_kind, RENDER_STATIC)
+        self.assertEqual(UnifiedTemplate("{{ a }}").render_kind, RENDER_CACHED)
+        self.assertEqual(UnifiedTemplate("{{ uuid4() }}").render_kind, RENDER_DYNAMIC)
+
+    def test_cached_render_equivalence(self):
+        sources = ["{{ payload.amount }} {{ payload.currency|default('RUB') }}",
+                   "{% if payload.list %}{{ payload.list|length }}{% endif %}",
+                   "{{ payload['list'][0] if payload.list else '' }}",
+                   "{{ flag }}",
+                   "{{ payload|tojson }}"]
+        rnd = random.Random(1)
+        values = [None, 1, 1.0, True, "1", [], [1], {"a": 1}, "x"]
+        for source in sources:
+            cached = UnifiedTemplate(source)
+            cached.enable_render_cache(4)
+            for _ in range(300):
+                payload = {key: rnd.choice(values) for key in rnd.sample(["amount", "currency", "items", "list"], 2)}
+                params = {"payload": payload, "flag": rnd.choice(values)}
+                expected = self._render_outcome(UnifiedTemplate(source), params)
+                self.assertEqual(self._render_outcome(cached, params), expected, (source, params))
+
+    @staticmethod
+    def _render_outcome(template, params):
+        try:
+            return template.render(params)
+        except Exception as e:
+            return type(e)
+
+    def test_cache_is_used_and_bounded(self):
+        template = UnifiedTemplate("{{ payload.name }}")
+        template.enable_render_cache(2)
+        with patch.object(UnifiedTemplate, "silent_render", autospec=True,
+                          side_effect=lambda self, params: params["payload"]["name"]) as silent_render:
+            for name in ["a", "a", "b", "a", "c", "b"]:
+                self.assertEqual(template.render({"payload": {"name": name, "other": object()}}), name)
+        self.assertEqual(silent_render.call_count, 4)
+
+    def test_not_cacheable_values(self):
+        template = UnifiedTemplate("{{ user.name }}")
+        template.enable_render_cache()
+        for name in ["a", "b"]:
+            user = type("User", (), {"name": name})()
+            self.assertEqual(template.render({"user": user}), name)
+
+    def test_json_loader_returns_copy(self):
+        template = UnifiedTemplate({"type": "unified_template", "template": '{"a": [1]}', "loader": "json"})
+        template.enable_render_cache()
+        template.render({})["a"].append(2)
+        self.assertEqual(template.render({}), {"a": [1]})
+
+
+class TestStringActionRenderCache(TestCase):
+    def test_render_metadata(self):
+        action = StringAction({
+            "command": "ANSWER_TO_USER",
+            "nodes": {"answer": ["Привет!", "{{ payload.name }}"], "id": "{{ uuid4() }}"},
+            "support_templates": {"greeting": "{{ payload.name|upper }}"},
+        })
+        self.assertEqual(action.render_metadata, {
+            "nodes.answer.0": {"kind": "static", "params": []},
+            "nodes.answer.1": {"kind": "cached", "params": ["payload.name"]},
+            "nodes.id": {"kind": "dynamic", "params": []},
+            "support_templates.greeting": {"kind": "cached", "params": ["payload.name"]},
+        })
+
+    def test_static_tree_skips_support_templates(self):
+        action = StringAction({"command": "ANSWER_TO_USER", "nodes": {"answer": "Привет!"},
+                               "support_templates": {"greeting": "{{ payload.name|upper }}"}})
+        answer = action.nodes["answer"]
+        with patch.object(UnifiedTemplate, "silent_render", autospec=True) as silent_render:
+            self.assertTrue(action._is_static(answer))
+            self.assertEqual(action._get_rendered_tree(answer, {}), "Привет!")
+        silent_render.assert_not_called()
+
+    def test_render_cache_disabled(self):
+        action = StringAction({"command": "ANSWER_TO_USER", "nodes": {"answer": "{{ a }}"}, "render_cache": False})
+        self.assertIsNone(action.nodes["answer"]._render_cache)
@@ -1,6 +1,6 @@
 import unittest
 from typing import Dict, Any, Union, Optional
-from unittest.mock import Mock, ANY
+from unittest.mock import Mock, ANY, patch
 
 from core.basic_models.actions.basic_actions import Action, action_factory, actions
 from core.basic_models.actions.variable_actions import SetVariableAction, DeleteVariableAction, ClearVariablesAction
@@ -664,11 +664,13 @@ class AddHistoryEventActionTest(unittest.IsolatedAsyncioTestCase):
             result='result',
             content={'foo': 'bar'},
             scenario='name',
-            scenario_version='1.0'
+            scenario_version='1.0',
+            created_time=1000.0
         )
 
         action = AddHistoryEventAction(items)
-        await action.run(self.user, None, None)
+        with patch("scenarios.scenario_models.history.history.time", return_value=1000.0):
+            await action.run(self.user, None, None)
 
         self.user.history.add_event.assert_called_once()
         self.user.history.add_event.assert_called_once_with(expected)
@@ -701,11 +703,13 @@ class AddHistoryEventActionTest(unittest.IsolatedAsyncioTestCase):
             result='CLIENT_INFO_RESPONSE',
             content={'field_1': 'value_1'},
             scenario='name',
-            scenario_version='1.0'
+            scenario_version='1.0',
+            created_time=1000.0
         )
 
         action = AddHistoryEventAction(items)
-        await action.run(self.user, None, None)
+        with patch("scenarios.scenario_models.history.history.time", return_value=1000.0):
+            await action.run(self.user, None, None)
 
         self.user.history.add_event.assert_called_once()
         self.user.history.add_event.assert_called_once_with(expected)
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import patch
+
+from core.basic_models.variables.variables import Variables
+from core.text_preprocessing.preprocessing_result import TextPreprocessingResult
+from scenarios.scenario_models.field.extraction_context import ExtractionContext
+from scenarios.scenario_models.field.field_filler_description import FirstNumberFiller, RegexpFieldFiller, \
+    AvailableInfoFiller
+from smart_kit.utils.picklable_mock import PicklableMock
+
+
+def num_token(value):
+    return {"text": str(value), "list_of_token_types_data": [{"token_type": "NUM_TOKEN",
+                                                              "token_value": {"value": value}}]}
+
+
+class TestExtractionContext(unittest.TestCase):
+    def setUp(self):
+        self.user = PicklableMock()
+        self.user.message = PicklableMock()
+        self.user.message.masked_value = ""
+        self.user.message_vars = Variables(None, self.user, savable=False)
+        self.text_preprocessing_result = TextPreprocessingResult({
+            "original_text": "Перевести 10 и 20 РУБЛЕЙ",
+            "tokenized_elements_list": [num_token(10), num_token(20)],
+        })
+
+    def test_one_context_per_message(self):
+        context = ExtractionContext.get(self.text_preprocessing_result, self.user)
+        self.assertIs(ExtractionContext.get(self.text_preprocessing_result, self.user), context)
+        self.assertEqual(context.lowered_text, "перевести 10 и 20 рублей")
+        self.assertEqual(context.original_words_set, {"Перевести", "10", "и", "20", "РУБЛЕЙ"})
+
+        other = ExtractionContext.get(TextPreprocessingResult({"original_text": "раньше"}), self.user)
+        self.assertIsNot(other, context)
+        self.assertIs(ExtractionContext.get(self.text_preprocessing_result, self.user), context)
+
+        self.user.message = PicklableMock()
+        self.assertIsNot(ExtractionContext.get(self.text_preprocessing_result, self.user), context)
+
+    def test_same_fillers_extract_once(self):
+        first = RegexpFieldFiller({"exp": "[0-9]+"})
+        second = RegexpFieldFiller({"exp": "[0-9]+"})
+        with patch("re.findall", return_value=["10", "20"]) as findall:
+            self.assertEqual(first.run(self.user, self.text_preprocessing_result), "10,20")
+            self.assertEqual(second.run(self.user, self.text_preprocessing_result), "10,20")
+        findall.assert_called_once()
+        self.assertEqual(RegexpFieldFiller({"exp": "[0-9]+", "delimiter": ";"}).run(
+            self.user, self.text_preprocessing_result), "10;20")
+
+    def test_cache_result_disabled(self):
+        filler = FirstNumberFiller({"cache_result": False})
+        self.assertIsNone(filler.hash_for_cache)
+        self.assertEqual(filler.run(self.user, self.text_preprocessing_result), 10)
+        self.assertFalse(AvailableInfoFiller({"value": "x"}).cache_result)
+
+    def test_cache_result_not_inherited_by_extract_override(self):
+        class CustomFiller(FirstNumberFiller):
+            def extract(self, text_preprocessing_result, user, params=None):
+                return params
+
+        class CachedCustomFiller(CustomFiller):
+            cache_result = True
+
+        class SubclassFiller(FirstNumberFiller):
+            pass
+
+        self.assertFalse(CustomFiller({}).cache_result)
+        self.assertTrue(CachedCustomFiller({}).cache_result)
+        self.assertTrue(SubclassFiller({}).cache_result)
+
+    def test_params_not_cached(self):
+        filler = RegexpFieldFiller({"exp": "[0-9]+"})
+        with patch.object(RegexpFieldFiller, "extract", side_effect=lambda tpr, user, params: params) as extract:
+            self.assertEqual(filler.run(self.user, self.text_preprocessing_result, {"a": 1}), {"a": 1})
+            self.assertEqual(filler.run(self.user, self.text_preprocessing_result, {"a": 2}), {"a": 2})
+        self.assertEqual(extract.call_count, 2)
+
+    def test_token_values_single_pass(self):
+        self.assertEqual(self.text_preprocessing_result.num_token_values, [10, 20])
+        self.assertEqual(self.text_preprocessing_result.ccy_token_values, [])
+        self.assertEqual(self.text_preprocessing_result.get_token_values_by_type("NUM_TOKEN"), [10, 20])
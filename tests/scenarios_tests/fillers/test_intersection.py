@@ -1,4 +1,6 @@
 import os
+import random
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -148,6 +150,80 @@ class TestIntersectionFieldFiller(unittest.TestCase):
         self.assertEqual(expected, result)
 
 
+class SplitNormalizer:
+    """Нормализатор без словарей: леммы - слова текста"""
+
+    def __init__(self):
+        self.normalized = []
+
+    def normalize_sequence(self, texts, batch_size=None):
+        self.normalized.extend(texts)
+        return [{"tokenized_elements_list": [{"lemma": word} for word in text.split()]} for text in texts]
+
+
+class TestIntersectionFieldFillerIndex(unittest.TestCase):
+    def setUp(self):
+        self.app_config = PicklableMock()
+        self.app_config.NORMALIZER = SplitNormalizer()
+        self.app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH = None
+
+    @staticmethod
+    def tpr(words):
+        text_preprocessing_result = PicklableMock()
+        text_preprocessing_result.tokenized_elements_list_pymorphy = [{"lemma": word} for word in words]
+        return text_preprocessing_result
+
+    @staticmethod
+    def linear_extract(filler, words):
+        for key, tokens_list in filler.normalized_cases:
+            for tokens in tokens_list:
+                if filler.operator(set(words), tokens):
+                    return key
+        return filler.default or None
+
+    def test_random_equivalence(self):
+        rnd = random.Random(3)
+        vocabulary = ["w{}".format(i) for i in range(30)]
+        cases = {"key{}".format(i): [" ".join(rnd.sample(vocabulary, rnd.randint(1, 3)))
+                                     for _ in range(rnd.randint(1, 3))] for i in range(200)}
+        with patch("smart_kit.configs.get_app_config", return_value=self.app_config):
+            fillers = [IntersectionFieldFiller({"cases": cases}),
+                       IntersectionFieldFiller({"cases": cases, "strict": True, "default": "none"})]
+        for _ in range(300):
+            words = rnd.sample(vocabulary, rnd.randint(0, 6))
+            for filler in fillers:
+                self.assertEqual(filler.extract(self.tpr(words), None), self.linear_extract(filler, words))
+
+    def test_first_case_wins(self):
+        cases = {"rare": ["a b c"], "common": ["a"], "empty": [""]}
+        with patch("smart_kit.configs.get_app_config", return_value=self.app_config):
+            filler = IntersectionFieldFiller({"cases": cases})
+        self.assertEqual(filler.extract(self.tpr(["c", "b", "a"]), None), "rare")
+        self.assertEqual(filler.extract(self.tpr(["a", "b"]), None), "common")
+        self.assertEqual(filler.extract(self.tpr(["x"]), None), "empty")
+
+    def test_persisted_normalization(self):
+        cases = {"salmon": ["good fish"], "sprat": ["canned"]}
+        with tempfile.TemporaryDirectory() as path:
+            self.app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH = os.path.join(path, "cases.json")
+            IntersectionFieldFiller._cases_normalizers.clear()
+            with patch("smart_kit.configs.get_app_config", return_value=self.app_config):
+                IntersectionFieldFiller({"cases": cases})
+                IntersectionFieldFiller({"cases": {"sprat": ["canned"]}})
+                self.assertEqual(self.app_config.NORMALIZER.normalized, ["good fish", "canned"])
+                # файл пишется один раз, после загрузки описаний
+                self.assertFalse(os.path.exists(self.app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH))
+                IntersectionFieldFiller.save_cases_normalization()
+                self.assertTrue(os.path.exists(self.app_config.DESCRIPTIONS_NORMALIZATION_CACHE_PATH))
+
+                IntersectionFieldFiller._cases_normalizers.clear()
+                self.app_config.NORMALIZER.normalized.clear()
+                filler = IntersectionFieldFiller({"cases": cases})
+            IntersectionFieldFiller._cases_normalizers.clear()
+        self.assertEqual(self.app_config.NORMALIZER.normalized, [])
+        self.assertEqual(filler.extract(self.tpr(["fish", "good"]), None), "salmon")
+
+
 class TestIntersectionOriginalTextFiller(unittest.TestCase):
     @patch('smart_kit.configs.get_app_config')
     def test_1(self, mock_get_app_config):
@@ -1,8 +1,7 @@
 from time import time
 from unittest import TestCase
 
-from scenarios.scenario_models.history import Event, History, HistoryEventFormatter
-from smart_kit.utils.picklable_mock import PicklableMock
+from scenarios.scenario_models.history import Event, History, HistoryDescription, HistoryEventFormatter
 
 
 class ScenarioHistoryTest(TestCase):
@@ -40,7 +39,7 @@ class ScenarioHistoryTest(TestCase):
         self.assertDictEqual(event.to_dict(), expected)
 
     def test_history_add_event(self):
-        descriptions = PicklableMock()
+        descriptions = HistoryDescription({"enabled": True, "encoding": History.EVENTS_ENCODING})
         item = {
             'type': 'event_type',
             'content': {'foo': 'bar'}
@@ -54,7 +53,7 @@ class ScenarioHistoryTest(TestCase):
         self.assertEqual(history.get_raw_events()[0], expected)
 
     def test_history_clear(self):
-        descriptions = PicklableMock()
+        descriptions = HistoryDescription({"enabled": True, "encoding": History.EVENTS_ENCODING})
         items = {
             'events': [
                 {
@@ -75,7 +74,7 @@ class ScenarioHistoryTest(TestCase):
 
     def test_history_raw(self):
         now = time()
-        descriptions = PicklableMock()
+        descriptions = HistoryDescription({"enabled": True, "encoding": History.EVENTS_ENCODING})
         items = {
             'events': [
                 {
@@ -105,7 +104,7 @@ class ScenarioHistoryTest(TestCase):
 
     def test_history_expire(self):
         now = time()
-        descriptions = PicklableMock()
+        descriptions = HistoryDescription({"enabled": True, "encoding": History.EVENTS_ENCODING})
         descriptions.event_expiration_delay = 5
         items = {
             'events': [
@@ -161,7 +160,7 @@ class ScenarioHistoryTest(TestCase):
         self.assertListEqual(formatter.format(events), expected)
 
     def test_get_events(self):
-        descriptions = PicklableMock()
+        descriptions = HistoryDescription({"enabled": True, "encoding": History.EVENTS_ENCODING})
         descriptions.formatter = HistoryEventFormatter()
         items = {
             'events': [
@@ -189,3 +188,68 @@ class ScenarioHistoryTest(TestCase):
         events = history.get_events()
 
         self.assertDictEqual(events[0], expected[0])
+
+
+class ColumnarHistoryTest(TestCase):
+    def setUp(self):
+        self.description = HistoryDescription({"enabled": True, "max_events": 3, "event_expiration_delay": 10,
+                                               "encoding": History.COLUMNAR_ENCODING})
+        self.now = time()
+        self.events = [
+            Event(type="field_event", scenario="pay", node="node", result="filled", content={"field": "amount"},
+                  created_time=self.now - 2),
+            Event(type="field_event", scenario="pay", result="ask_question", created_time=self.now - 1),
+            Event(type="end_scenario", scenario="other", created_time=self.now),
+        ]
+
+    def _history(self, events):
+        history = History({}, self.description, None)
+        for event in events:
+            history.add_event(event)
+        return history
+
+    def test_event_created_time_default(self):
+        event = Event(type="type")
+        self.assertGreaterEqual(event.created_time, self.now)
+
+    def test_columnar_round_trip(self):
+        raw = self._history(self.events).raw
+        self.assertEqual(raw["values"], {"type": ["field_event", "end_scenario"], "scenario": ["pay", "other"]})
+        self.assertEqual(raw["columns"]["type"], [0, 0, 1])
+        self.assertNotIn("scenario_version", raw["columns"])
+        self.assertEqual(History(raw, self.description, None).get_raw_events(), self.events)
+
+    def test_default_encoding(self):
+        description = HistoryDescription({"enabled": True})
+        history = History({}, description, None)
+        history.add_event(self.events[0])
+        self.assertEqual(history.raw, {"events": [self.events[0].to_dict()]})
+
+    def test_read_events_record(self):
+        raw = {"events": [event.to_dict() for event in self.events]}
+        history = History(raw, self.description, None)
+        self.assertEqual(history.get_raw_events(), self.events)
+        self.assertIn("columns", history.raw)
+
+    def test_ring_buffer(self):
+        extra = Event(type="field_event", scenario="pay", created_time=self.now)
+        history = self._history(self.events + [extra])
+        self.assertEqual(history.get_raw_events(), self.events[1:] + [extra])
+
+    def test_expire_by_oldest(self):
+        self.description.event_expiration_delay = 1.5
+        history = self._history(self.events)
+        self.assertEqual(history.next_expire_time(), self.now - 0.5)
+        history.expire()
+        self.assertEqual(history.get_raw_events(), self.events[1:])
+
+    def test_expire_unordered(self):
+        self.description.event_expiration_delay = 1.5
+        history = self._history([self.events[2], self.events[0], self.events[1]])
+        history.expire()
+        self.assertEqual(history.get_raw_events(), [self.events[2], self.events[1]])
+
+    def test_empty(self):
+        history = self._history([])
+        self.assertEqual(history.raw, {})
+        self.assertEqual(History(history.raw, self.description, None).get_raw_events(), [])
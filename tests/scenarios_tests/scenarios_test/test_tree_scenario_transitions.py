@@ -0,0 +1,117 @@
+import random
+from unittest import TestCase
+from unittest.mock import Mock, MagicMock
+
+from core.basic_models.requirement.basic_requirements import Requirement, requirement_factory, requirements, \
+    AndRequirement, FormFieldValueRequirement, TopicRequirement, CharacterIdRequirement, RandomRequirement
+from core.model.registered import registered_factories
+from scenarios.scenario_descriptions.tree_scenario.transition_index import TransitionIndex
+from scenarios.scenario_descriptions.tree_scenario.tree_scenario import TreeScenario
+
+
+class OverriddenTopicRequirement(TopicRequirement):
+    def _check(self, text_preprocessing_result, user, params=None):
+        return True
+
+
+class TestTreeScenarioTransitions(TestCase):
+    def setUp(self):
+        registered_factories[Requirement] = requirement_factory
+        requirements[None] = Requirement
+        requirements["and"] = AndRequirement
+        requirements["form_field_value"] = FormFieldValueRequirement
+        requirements["topic"] = TopicRequirement
+        requirements["character_id"] = CharacterIdRequirement
+        requirements["random"] = RandomRequirement
+        requirements["overridden_topic"] = OverriddenTopicRequirement
+
+    @staticmethod
+    def field_value(value):
+        return {"type": "form_field_value", "form_name": "form", "field_name": "choice", "value": value}
+
+    def build_scenario(self, node_requirements, **kwargs):
+        nodes = {"start": {"form_key": "start_form", "available_nodes": list(node_requirements)}}
+        for key, requirement in node_requirements.items():
+            nodes[key] = {"form_key": key + "_form", "requirement": requirement}
+        items = {"form": "form", "start_node_key": "start", "scenario_nodes": nodes, **kwargs}
+        return TreeScenario(items, "tree")
+
+    @staticmethod
+    def build_user(choice=None, topic="topic", character="sber"):
+        user = MagicMock()
+        user.forms = {"form": Mock(fields={"choice": Mock(value=choice)})}
+        user.message.topic_key = topic
+        user.message.payload = {"character": {"id": character}}
+        return user
+
+    def next_node_id(self, scenario, user):
+        node = scenario.get_next_node(user, scenario.scenario_nodes["start"], None, {})
+        return node.id if node else None
+
+    def test_index_groups_by_field_value(self):
+        scenario = self.build_scenario({"node_{}".format(i): self.field_value(i) for i in range(100)})
+        index = scenario.get_transition_index(scenario.scenario_nodes["start"])
+        self.assertEqual(index.candidates(None, self.build_user(42)), ["node_42"])
+        self.assertEqual(index.candidates(None, self.build_user(1000)), [])
+        self.assertEqual(self.next_node_id(scenario, self.build_user(42)), "node_42")
+
+    def test_unindexed_keep_order(self):
+        scenario = self.build_scenario({
+            "first": self.field_value("a"),
+            "random": {"type": "random", "percent": 0},
+            "and": {"type": "and", "requirements": [{"type": "random", "percent": 100},
+                                                    {"type": "topic", "topics": ["topic"]}]},
+            "other_topic": {"type": "topic", "topics": ["other"]},
+            "fallback": None,
+        })
+        index = scenario.get_transition_index(scenario.scenario_nodes["start"])
+        self.assertEqual(index.candidates(None, self.build_user("a")), ["first", "random", "and", "fallback"])
+        self.assertEqual(index.candidates(None, self.build_user("b", topic="other")),
+                         ["random", "other_topic", "fallback"])
+        self.assertEqual(self.next_node_id(scenario, self.build_user("b", topic="unknown")), "fallback")
+
+    def test_overridden_check_is_not_indexed(self):
+        index = TransitionIndex(["node"], [OverriddenTopicRequirement({"topics": ["topic"]})])
+        self.assertFalse(index.is_useful)
+
+    def test_string_values_are_not_indexed(self):
+        index = TransitionIndex(["node"], [TopicRequirement({"topics": "topic"})])
+        self.assertFalse(index.is_useful)
+
+    def test_value_error_falls_back_to_all_nodes(self):
+        scenario = self.build_scenario({"node_a": self.field_value("a"), "node_b": self.field_value(["b"])})
+        index = scenario.get_transition_index(scenario.scenario_nodes["start"])
+        self.assertEqual(index.candidates(None, self.build_user(["b"])), ["node_a", "node_b"])
+        self.assertEqual(self.next_node_id(scenario, self.build_user(["b"])), "node_b")
+
+    def test_random_equivalence_in_debug_mode(self):
+        rnd = random.Random(7)
+        node_requirements = {}
+        for i in range(60):
+            kind = rnd.choice(["field", "topic", "character", "and", "none"])
+            if kind == "field":
+                requirement = self.field_value(rnd.randrange(10))
+            elif kind == "topic":
+                requirement = {"type": "topic", "topics": rnd.sample(["t1", "t2", "t3", "t4"], 2)}
+            elif kind == "character":
+                requirement = {"type": "character_id", "values": [rnd.choice(["sber", "joy", "athena"])]}
+            elif kind == "and":
+                requirement = {"type": "and", "requirements": [
+                    {"type": "character_id", "values": [rnd.choice(["sber", "joy", "athena"])]},
+                    self.field_value(rnd.randrange(10))]}
+            else:
+                requirement = {"type": "random", "percent": 0}
+            node_requirements["node_{}".format(i)] = requirement
+        indexed = self.build_scenario(node_requirements, debug_transitions=True)
+        linear = self.build_scenario(node_requirements, transition_index=False)
+        for _ in range(300):
+            user = self.build_user(rnd.randrange(12), rnd.choice(["t1", "t2", "t3", "t4", "t5"]),
+                                   rnd.choice(["sber", "joy", "athena"]))
+            self.assertEqual(self.next_node_id(indexed, user), self.next_node_id(linear, user))
+
+    def test_debug_mode_detects_mismatch(self):
+        scenario = self.build_scenario({"node": {"type": "topic", "topics": ["topic"]}}, debug_transitions=True)
+        index = scenario.get_transition_index(scenario.scenario_nodes["start"])
+        index.candidates = Mock(return_value=[])
+        with self.assertRaises(AssertionError):
+            scenario.get_next_node(self.build_user(), scenario.scenario_nodes["start"], None, {})
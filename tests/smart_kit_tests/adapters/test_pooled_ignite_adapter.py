@@ -0,0 +1,148 @@
+# coding: utf-8
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from pyignite.exceptions import SocketError
+
+from core.db_adapter.pooled_ignite_adapter import PooledIgniteAdapter
+
+
+class FakeCache:
+    def __init__(self, storage, calls, failures):
+        self.storage = storage
+        self.calls = calls
+        self.failures = failures
+
+    async def _call(self, name, result):
+        self.calls.append(name)
+        if self.failures:
+            self.failures.pop()
+            raise SocketError("connection lost")
+        return result
+
+    async def get(self, key):
+        return await self._call("get", self.storage.get(key))
+
+    async def get_all(self, keys):
+        return await self._call("get_all", {key: self.storage[key] for key in keys if key in self.storage})
+
+    async def put(self, key, value):
+        await self._call("put", None)
+        self.storage[key] = value
+
+    async def put_all(self, items):
+        await self._call("put_all", None)
+        self.storage.update(items)
+
+    async def replace_if_equals(self, key, sample, value):
+        await self._call("replace_if_equals", None)
+        if self.storage.get(key) != sample:
+            return False
+        self.storage[key] = value
+        return True
+
+
+class FakeClient:
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        FakeClient.instances.append(self)
+
+    async def connect(self, url):
+        pass
+
+    async def get_or_create_cache(self, name):
+        return FakeCache(STORAGE, CALLS, FAILURES)
+
+    async def close(self):
+        self.closed = True
+
+
+STORAGE = {}
+CALLS = []
+FAILURES = []
+
+
+@patch("pyignite.aio_client.AioClient", FakeClient)
+class PooledIgniteAdapterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        STORAGE.clear()
+        CALLS.clear()
+        FAILURES.clear()
+        FakeClient.instances.clear()
+        self.adapter = PooledIgniteAdapter({"url": ["127.0.0.1:10800"], "cache_name": "test", "pool_size": 3,
+                                            "retry": {"backoff_base": 0.001, "backoff_max": 0.01}})
+
+    async def test_pool_partition_aware(self):
+        await self.adapter.connect()
+        self.assertEqual(len(FakeClient.instances), 3)
+        self.assertTrue(all(client.kwargs["partition_aware"] for client in FakeClient.instances))
+
+    async def test_batch_get(self):
+        await self.adapter.connect()
+        await self.adapter.put_all({"a": "1", "b": "2"})
+        CALLS.clear()
+        result = await asyncio.gather(self.adapter.get("a"), self.adapter.get("b"), self.adapter.get("a"),
+                                      self.adapter.get("c"))
+        self.assertEqual(result, ["1", "2", "1", None])
+        self.assertEqual(CALLS, ["get_all"])
+        self.assertEqual(await self.adapter.get("b"), "2")
+        self.assertEqual(CALLS, ["get_all", "get"])
+        self.assertEqual(await self.adapter.get_all(["a", "c"]), {"a": "1"})
+
+    async def test_save_replace(self):
+        await self.adapter.connect()
+        await self.adapter.save("a", "1")
+        self.assertTrue(await self.adapter.replace_if_equals("a", "1", "2"))
+        self.assertFalse(await self.adapter.replace_if_equals("a", "1", "3"))
+        self.assertEqual(STORAGE, {"a": "2"})
+
+    def assert_no_leaked_clients(self):
+        active = {id(connection.client) for connection in self.adapter._connections if connection.client is not None}
+        for client in FakeClient.instances:
+            self.assertEqual(client.closed, id(client) not in active)
+
+    async def test_retry_reconnects_failed_client(self):
+        await self.adapter.connect()
+        FAILURES.extend([True] * 3)
+        await self.adapter.save("a", "1")
+        self.assertEqual(CALLS, ["put"] * 4)
+        self.assertEqual(STORAGE, {"a": "1"})
+        await asyncio.sleep(0.02)
+        self.assertTrue(all(connection.healthy for connection in self.adapter._connections))
+        self.assertEqual(len(FakeClient.instances), 6)
+        self.assert_no_leaked_clients()
+
+    async def test_pool_recovers_after_transient_failure(self):
+        await self.adapter.connect()
+        FAILURES.append(True)
+        await self.adapter.save("a", "1")
+        self.assertEqual(sum(connection.healthy for connection in self.adapter._connections), 2)
+        await asyncio.sleep(0.02)
+        for _ in range(3):
+            await self.adapter.save("a", "1")
+        await asyncio.sleep(0)
+        self.assertTrue(all(connection.healthy for connection in self.adapter._connections))
+        self.assertEqual(len(FakeClient.instances), 4)
+        self.assert_no_leaked_clients()
+
+    async def test_concurrent_reconnect_single_client(self):
+        await self.adapter.connect()
+        for connection in self.adapter._connections:
+            self.adapter._mark_failed(connection)
+        await asyncio.sleep(0.02)
+        await asyncio.gather(*(self.adapter.save(str(index), index) for index in range(10)))
+        await asyncio.sleep(0)
+        self.assertEqual(len(FakeClient.instances), 6)
+        self.assert_no_leaked_clients()
+
+    async def test_tries_exhausted(self):
+        self.adapter.try_count = 2
+        await self.adapter.connect()
+        FAILURES.extend([True] * 5)
+        with self.assertRaises(SocketError):
+            await self.adapter.get("a")
+        self.assertEqual(len(CALLS), 2)
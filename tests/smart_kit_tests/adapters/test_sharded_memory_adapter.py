@@ -0,0 +1,156 @@
+# coding: utf-8
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from core.db_adapter.sharded_memory_adapter import MemoryShard, ShardedMemoryAdapter, entry_size
+
+
+class Timer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MemoryShardTest(unittest.TestCase):
+    def setUp(self):
+        self.timer = Timer()
+        self.shard = MemoryShard(max_bytes=10 ** 6, ttl=100, resolution=10, timer=self.timer)
+
+    def test_ttl_lazy_and_wheel(self):
+        self.shard.put("a", "1")
+        self.timer.now += 50
+        self.shard.put("b", "2")
+        self.timer.now += 50
+        self.assertIsNone(self.shard.get("a"))
+        self.assertEqual(self.shard.get("b"), "2")
+        # запись без обращений удаляется колесом таймеров
+        self.timer.now += 70
+        self.shard.put("c", "3")
+        self.assertEqual(list(self.shard.data), ["c"])
+        self.assertEqual(self.shard.bytes, entry_size("c", "3"))
+
+    def test_updated_key_not_expired_by_old_slot(self):
+        self.shard.put("a", "1")
+        self.timer.now += 90
+        self.shard.put("a", "2")
+        self.timer.now += 20
+        self.shard.put("b", "3")
+        self.assertEqual(self.shard.get("a"), "2")
+
+    def test_byte_limit(self):
+        size = entry_size("k0", "x" * 100)
+        shard = MemoryShard(max_bytes=size * 3, ttl=100, resolution=10, timer=self.timer)
+        for index in range(4):
+            shard.put(f"k{index}", "x" * 100)
+        self.assertEqual(list(shard.data), ["k1", "k2", "k3"])
+        self.assertLessEqual(shard.bytes, shard.max_bytes)
+        shard.put("big", "x" * (size * 3))
+        self.assertIsNone(shard.get("big"))
+        self.assertEqual(len(shard.data), 3)
+
+    def test_wheel_keeps_only_live_keys(self):
+        shard = MemoryShard(max_bytes=entry_size("k0", "x") * 3, ttl=100, resolution=10, timer=self.timer)
+        for index in range(50):
+            self.timer.now += 5
+            shard.put(f"k{index % 5}", "x")
+        self.assertEqual(sorted(key for keys in shard.wheel.values() for key in keys), sorted(shard.data))
+        self.assertEqual(len(shard.data), 3)
+
+    def test_replace_if_equals(self):
+        self.assertTrue(self.shard.replace_if_equals("a", None, "1"))
+        self.assertFalse(self.shard.replace_if_equals("a", None, "2"))
+        self.assertTrue(self.shard.replace_if_equals("a", "1", "2"))
+        self.assertEqual(self.shard.get("a"), "2")
+
+
+class ShardedMemoryAdapterTest(unittest.IsolatedAsyncioTestCase):
+    async def test_save_get(self):
+        adapter = ShardedMemoryAdapter({"shards": 4})
+        for index in range(100):
+            await adapter.save(str(index), f"data{index}")
+        self.assertEqual([await adapter.get(str(index)) for index in range(100)],
+                         [f"data{index}" for index in range(100)])
+        self.assertIsNone(await adapter.get("missing"))
+        self.assertEqual(sum(len(shard.data) for shard in adapter.shards), 100)
+
+    def test_memory_near_max_bytes(self):
+        max_bytes = 4 * 1024 * 1024
+        tracemalloc.start()
+        try:
+            adapter = ShardedMemoryAdapter({"max_bytes": max_bytes, "shards": 4})
+            before, _ = tracemalloc.get_traced_memory()
+            for index in range(100000):
+                # напрямую в шард: save еще пишет метрики, их память к хранилищу не относится
+                key = f"user_{index}"
+                adapter._shard(key).put(key, f"data_{index}")
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertLessEqual(adapter.bytes, max_bytes)
+        self.assertLess(used, max_bytes * 1.2)
+        self.assertGreater(used, max_bytes * 0.8)
+
+    async def test_replace_if_equals_threads(self):
+        adapter = ShardedMemoryAdapter({"shards": 2})
+        await adapter.save("counter", 0)
+        shard = adapter._shard("counter")
+
+        def increment():
+            for _ in range(200):
+                while True:
+                    value = shard.get("counter")
+                    if shard.replace_if_equals("counter", value, value + 1):
+                        break
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(await adapter.get("counter"), 800)
+
+    async def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "memory.pickle")
+            adapter = ShardedMemoryAdapter({"snapshot_path": filename})
+            await adapter.connect()
+            data = {str(random.random()): "data" for _ in range(50)}
+            for key, value in data.items():
+                await adapter.save(key, value)
+            await adapter.close()
+
+            restored = ShardedMemoryAdapter({"snapshot_path": filename, "shards": 3})
+            await restored.connect()
+            self.assertEqual({key: await restored.get(key) for key in data}, data)
+            self.assertEqual(restored.bytes, adapter.bytes)
+
+    async def test_snapshot_counts_downtime(self):
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "memory.pickle")
+            adapter = ShardedMemoryAdapter({"ttl": 100})
+            await adapter.save("key", "data")
+            adapter.save_snapshot(filename)
+            started = time.time()
+
+            # за время простоя запись прожила часть ttl
+            with patch("time.time", return_value=started + 60):
+                restored = ShardedMemoryAdapter({"ttl": 100})
+                restored.load_snapshot(filename)
+            self.assertEqual(await restored.get("key"), "data")
+            (_, _, ttl), = restored._shard("key").items()
+            self.assertLessEqual(ttl, 40)
+
+            # истекшие за время простоя записи не загружаются
+            with patch("time.time", return_value=started + 120):
+                expired = ShardedMemoryAdapter({"ttl": 100})
+                expired.load_snapshot(filename)
+            self.assertIsNone(await expired.get("key"))
+            self.assertEqual(expired.bytes, 0)
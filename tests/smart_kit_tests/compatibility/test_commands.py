@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import Mock, patch
 
+from core.basic_models.actions.command import Command
 from core.names import field
 from smart_kit.compatibility import commands
 from smart_kit.names import message_names
@@ -203,3 +204,42 @@ class CombineAnswerToUserTest(unittest.TestCase):
         result = commands.combine_commands(list_of_commands, user)
 
         self.assertFalse(result[0].payload[field.AUTO_LISTENING])
+
+
+class CombineCommandsTest(unittest.TestCase):
+    @patch('smart_kit.configs.get_app_config')
+    def test_combine(self, mock_get_app_config):
+        patch_get_app_config(mock_get_app_config, False)
+        other_1 = Command("OTHER_1", {"a": 1})
+        other_2 = Command("OTHER_2", {"b": 2})
+        answer_1 = Command(message_names.ANSWER_TO_USER, {field.PRONOUNCE_TEXT: "one", field.ITEMS: [1], "x": 1})
+        answer_2 = Command(message_names.ANSWER_TO_USER, {field.PRONOUNCE_TEXT: "two", field.ITEMS: [2, 3], "x": 2,
+                                                          field.AUTO_LISTENING: True})
+        list_of_commands = [answer_1, other_1, answer_2, other_2]
+        user = PicklableMock()
+        user.last_scenarios.last_scenario_name = "scenario"
+        user.history.enabled = False
+
+        result = commands.combine_commands(list_of_commands, user)
+
+        self.assertIs(result, list_of_commands)
+        self.assertEqual([command.name for command in result], ["OTHER_1", "OTHER_2", message_names.ANSWER_TO_USER])
+        payload = result[-1].payload
+        self.assertEqual(payload[field.PRONOUNCE_TEXT], "one two")
+        self.assertEqual(payload[field.ITEMS], [1, 2, 3])
+        self.assertEqual(payload["x"], 2)
+        self.assertTrue(payload[field.AUTO_LISTENING])
+        self.assertEqual(payload[field.INTENT], "scenario")
+        self.assertFalse(payload[field.FINISHED])
+        self.assertNotIn(field.HISTORY_DATA, payload)
+        user.history.get_events.assert_not_called()
+
+    def test_no_answers(self):
+        list_of_commands = [Command("OTHER", {"a": 1})]
+        self.assertEqual(commands.combine_commands(list_of_commands, PicklableMock()), list_of_commands)
+
+    def test_different_request_data(self):
+        answer_1 = Command(message_names.ANSWER_TO_USER, {}, request_data={"a": 1})
+        answer_2 = Command(message_names.ANSWER_TO_USER, {}, request_data={"a": 2})
+        with self.assertRaises(ValueError):
+            commands.combine_answer_to_user([answer_1, answer_2])
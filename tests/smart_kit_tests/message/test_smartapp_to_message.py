@@ -1,8 +1,13 @@
 # coding: utf-8
+import json
 import unittest
+from unittest.mock import patch
+
+from google.protobuf import json_format
 
 from core.message.msg_validator import MessageValidator
 from smart_kit.message.smartapp_to_message import SmartAppToMessage
+from smart_kit.utils import SmartAppToMessage_pb2
 from smart_kit.utils.picklable_mock import PicklableMock
 
 
@@ -36,7 +41,7 @@ class TestSmartAppToMessage(unittest.TestCase):
             "payload": {"z": 1},
             "uuid": '1234-5678-9012'
         })
-        self.assertTrue(obj.value == self.output_json)
+        self.assertTrue(json.loads(obj.value) == json.loads(self.output_json))
 
     def test_smart_app_to_message_2(self):
         obj = SmartAppToMessage(self.command_, self.message_, self.request_, ["t"])
@@ -82,3 +87,59 @@ class TestSmartAppToMessageValidation(unittest.TestCase):
             command_, message_, request_,
             validators=(PieMessageValidator(),))
         self.assertFalse(message.validate())
+
+
+class TestSmartAppToMessageProtobuf(unittest.TestCase):
+    def setUp(self):
+        self.command_ = PicklableMock()
+        self.message_ = PicklableMock()
+        self.command_.payload = {
+            "pronounceText": "Привет", "items": [{"bubble": {"text": "Привет"}}], "finished": False,
+            "token": "secret"
+        }
+        self.command_.name = "ANSWER_TO_USER"
+        self.command_.loader = "protobuf"
+        self.message_.payload = {}
+        self.message_.incremental_id = 111
+        self.message_.session_id = "11"
+        self.message_.uuid = {"userId": "user", "userChannel": "B2C"}
+
+    def test_value(self):
+        obj = SmartAppToMessage(self.command_, self.message_, PicklableMock())
+        parsed = SmartAppToMessage_pb2.SmartAppToMessage()
+        parsed.ParseFromString(obj.value)
+        self.assertIsInstance(obj.value, bytes)
+        self.assertEqual(parsed.messageId, 111)
+        self.assertEqual(parsed.sessionId, "11")
+        self.assertEqual(parsed.messageName, "ANSWER_TO_USER")
+        self.assertEqual(parsed.uuid.userId, "user")
+        self.assertEqual(parsed.uuid.userChannel, "B2C")
+        self.assertEqual(parsed.payload["pronounceText"].string_value, "Привет")
+        self.assertFalse(parsed.payload["finished"].bool_value)
+        self.assertEqual(json_format.MessageToDict(parsed.payload["items"]), [{"bubble": {"text": "Привет"}}])
+
+    def test_masked_view(self):
+        obj = SmartAppToMessage(self.command_, self.message_, PicklableMock())
+        masked = json.loads(str(obj.masked_view))
+        self.assertEqual(masked["payload"]["token"], "***")
+        self.assertEqual(masked["payload"]["pronounceText"], "Привет")
+        self.assertEqual(obj.command.payload["token"], "secret")
+
+    def test_masked_request_value(self):
+        obj = SmartAppToMessage(self.command_, self.message_, PicklableMock())
+        parsed = SmartAppToMessage_pb2.SmartAppToMessage()
+        parsed.ParseFromString(obj.masked_request_value)
+        self.assertEqual(parsed.payload["token"].string_value, "***")
+        self.command_.loader = "json.dumps"
+        obj = SmartAppToMessage(self.command_, self.message_, PicklableMock())
+        self.assertEqual(json.loads(str(obj.masked_request_value))["payload"]["token"], "***")
+
+    def test_masked_view_is_lazy(self):
+        obj = SmartAppToMessage(self.command_, self.message_, PicklableMock())
+        with patch("core.utils.masking_message.masking") as masking_mock:
+            view = obj.masked_view
+            masking_mock.assert_not_called()
+            masking_mock.return_value = {}
+            str(view)
+            str(view)
+            masking_mock.assert_called_once()
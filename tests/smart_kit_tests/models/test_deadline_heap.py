@@ -0,0 +1,30 @@
+import unittest
+
+from core.model.heapq.deadline_heap import DeadlineHeap
+
+
+class DeadlineHeapTest(unittest.TestCase):
+    def test_pop_due(self):
+        heap = DeadlineHeap([("a", 3), ("b", 1), ("c", None)])
+        heap.schedule("d", 2)
+        self.assertEqual(len(heap), 3)
+        self.assertEqual(heap.peek(), 1)
+        self.assertEqual(heap.pop_due(2), ["b", "d"])
+        self.assertEqual(heap.pop_due(2), [])
+        self.assertEqual(heap.peek(), 3)
+
+    def test_reschedule_and_discard(self):
+        heap = DeadlineHeap([("a", 1), ("b", 2)])
+        heap.schedule("a", 5)
+        heap.discard("b")
+        self.assertEqual(heap.peek(), 5)
+        self.assertEqual(heap.pop_due(4), [])
+        heap.schedule("a", None)
+        self.assertIsNone(heap.peek())
+
+    def test_compaction(self):
+        heap = DeadlineHeap()
+        for deadline in range(1000):
+            heap.schedule("a", deadline)
+        self.assertLessEqual(len(heap._heap), DeadlineHeap.COMPACT_MIN_SIZE + 1)
+        self.assertEqual(heap.pop_due(1000), ["a"])
@@ -90,6 +90,12 @@ class ModelsTest1(unittest.IsolatedAsyncioTestCase):
         self.assertTrue(obj1.actions == '333')
         self.assertTrue(obj1.NOTHING_FOUND_ACTION == "nothing_found_action")
 
+    def test_dialogue_manager_scenario_keys_reloaded(self):
+        scenarios = TestScenarioDesc({1: "1"})
+        obj1 = dialogue_manager.DialogueManager({'scenarios': scenarios, 'external_actions': {}}, self.app_name)
+        scenarios[2] = "2"
+        self.assertEqual(obj1.scenario_keys, {1, 2})
+
     def test_dialogue_manager_found_action(self):
         obj1 = dialogue_manager.DialogueManager({'scenarios': self.test_scenarios,
                                                 'external_actions': {'nothing_found_action': self.TestAction}},
@@ -3,6 +3,7 @@ import unittest
 from unittest.mock import Mock
 
 from smart_kit.request import kafka_request
+from smart_kit.request.kafka_routes import KafkaRoutes
 
 
 class RequestTest1(unittest.TestCase):
@@ -50,3 +51,27 @@ class RequestTest1(unittest.TestCase):
         obj2 = kafka_request.SmartKitKafkaRequest(self.test_items2)
         self.assertTrue(obj1.__str__() == "KafkaRequest: kafka_key=54321")
         self.assertTrue(obj2.__str__() == "KafkaRequest: kafka_key=None")
+
+    def test_smart_kafka_request_send_headers(self):
+        obj1 = kafka_request.SmartKitKafkaRequest(self.test_items1)
+        publisher = Mock()
+        headers = [("shared header", b"1")]
+        self.test_source_mq_message.key = lambda: b"key"
+        obj1.run("data", {"publishers": {"54321": publisher}, "mq_message": self.test_source_mq_message,
+                          "headers": headers})
+        self.assertIs(publisher.send.call_args.kwargs["headers"], headers)
+
+
+class KafkaRoutesTest(unittest.TestCase):
+    def test_routes(self):
+        settings = [
+            {"from_channel": "B2C", "to_topic": "answer", "route_to_broker": "first"},
+            {"from_channel": "B2C", "to_topic": "answer", "route_to_broker": "second"},
+            {"from_channel": "SBOL", "to_topic": "answer", "route_to_broker": "third"},
+        ]
+        routes = KafkaRoutes(settings)
+        self.assertIs(routes.settings, settings)
+        self.assertEqual(routes.get("B2C", "answer"), "second")
+        self.assertEqual(routes.get("SBOL", "answer"), "third")
+        self.assertIsNone(routes.get("B2C", "other"))
+        self.assertIsNone(KafkaRoutes(None).get("B2C", "answer"))
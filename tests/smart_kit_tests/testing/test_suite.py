@@ -0,0 +1,84 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import Mock
+
+from smart_kit.testing.suite import TestSuite, shard_files
+
+
+class FakeTestCase:
+    running = 0
+    max_running = 0
+
+    def __init__(self, *args, messages=None, user=None, output=None, **kwargs):
+        self.messages = messages
+        self.output = output
+
+    async def run(self):
+        FakeTestCase.running += 1
+        FakeTestCase.max_running = max(FakeTestCase.max_running, FakeTestCase.running)
+        self.output.append("step 0")
+        await asyncio.sleep(0.01)
+        self.output.append("step 1")
+        FakeTestCase.running -= 1
+        return self.messages[0] == "ok"
+
+
+class TestSuiteTest(unittest.TestCase):
+    def setUp(self):
+        FakeTestCase.max_running = 0
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = self.dir.name
+        self.predefined = os.path.join(self.path, "predefined.txt")
+        with open(self.predefined, "w") as f:
+            json.dump({}, f)
+        for index in range(3):
+            with open(os.path.join(self.path, f"test_{index}.json"), "w") as f:
+                json.dump({f"case_{index}_{case}": ["ok"] for case in range(index + 1)}, f)
+        with open(os.path.join(self.path, "test_fail.json"), "w") as f:
+            json.dump({"case_fail": ["fail"]}, f)
+        self.app_config = Mock(TEST_CASE=FakeTestCase)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_run_sequential(self):
+        durations_path = os.path.join(self.path, "durations.csv")
+        suite = TestSuite(self.path, self.app_config, self.predefined, False, durations_path=durations_path)
+        self.assertFalse(suite.run())
+        self.assertEqual(FakeTestCase.max_running, 1)
+        with open(durations_path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 7)
+        self.assertEqual({row["test_case"] for row in rows if row["success"] == "0"}, {"case_fail"})
+
+    def test_run_concurrent(self):
+        suite = TestSuite(self.path, self.app_config, self.predefined, False, concurrency=4)
+        results = suite.run_shard(suite.collect_files())
+        self.assertEqual(FakeTestCase.max_running, 4)
+        self.assertEqual(len(results), 7)
+        self.assertEqual(sum(result.success for result in results), 6)
+
+    def test_concurrent_output_not_interleaved(self):
+        suite = TestSuite(self.path, self.app_config, self.predefined, False, concurrency=4)
+        with redirect_stdout(StringIO()) as stdout:
+            results = suite.run_shard(suite.collect_files())
+        for result in results:
+            self.assertIn(f"[+] Processing test case {result.test_case} from {result.file}\nstep 0\nstep 1\n",
+                          stdout.getvalue())
+
+    def test_run_workers(self):
+        suite = TestSuite(self.path, self.app_config, self.predefined, False, workers=2)
+        self.assertFalse(suite.run())
+
+    def test_shard_files(self):
+        files = TestSuite(self.path, self.app_config, self.predefined, False).collect_files()
+        shards = shard_files(files, 2)
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(sorted(file for shard in shards for file in shard), files)
+        self.assertEqual(shard_files(files[:1], 3), [files[:1]])
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from smart_kit.text_preprocessing.cached_text_normalizer import CachedTextNormalizer
+
+
+def normalize(text, **kwargs):
+    return {"original_text": text, "normalized_text": text.lower(), "kwargs": kwargs}
+
+
+class CachedTextNormalizerTest(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = Mock(side_effect=normalize)
+        self.normalizer.normalize_sequence = Mock(side_effect=lambda texts, batch_size=None: [normalize(text)
+                                                                                             for text in texts])
+
+    def test_call_cached(self):
+        cached = CachedTextNormalizer(self.normalizer)
+        first = cached("Привет")
+        second = cached("Привет")
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(self.normalizer.call_count, 1)
+        cached("Привет", message_type="text")
+        self.assertEqual(self.normalizer.call_count, 2)
+
+    def test_normalize_sequence_only_missed(self):
+        cached = CachedTextNormalizer(self.normalizer)
+        cached("b")
+        result = cached.normalize_sequence(["a", "b", "c"])
+        self.assertEqual([item["original_text"] for item in result], ["a", "b", "c"])
+        self.normalizer.normalize_sequence.assert_called_once_with(["a", "c"], None)
+
+    def test_persisted(self):
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "normalization.json")
+            cached = CachedTextNormalizer.from_file(self.normalizer, filename)
+            cached.normalize_sequence(["a", "b"])
+            cached.save(filename)
+
+            other_normalizer = Mock()
+            loaded = CachedTextNormalizer.from_file(other_normalizer, filename)
+            self.assertEqual(loaded("a")["normalized_text"], "a")
+            self.assertEqual(len(loaded.normalize_sequence(["a", "b"])), 2)
+            other_normalizer.assert_not_called()
+            other_normalizer.normalize_sequence.assert_not_called()
+
+    def test_bounded(self):
+        cached = CachedTextNormalizer(self.normalizer, max_entries=2)
+        cached.normalize_sequence(["a", "b", "c"])
+        self.assertEqual(len(cached.cache), 2)
+        cached("a")
+        self.assertEqual(self.normalizer.call_count, 1)
+
+    def test_save_update_keeps_file_entries(self):
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "normalization.json")
+            first = CachedTextNormalizer(self.normalizer)
+            first("a")
+            first.save(filename)
+            second = CachedTextNormalizer(self.normalizer)
+            second("b")
+            second.cache.save(filename, update=True)
+            self.assertEqual(list(CachedTextNormalizer.from_file(Mock(), filename).cache.storage), ["a", "b"])
@@ -0,0 +1,156 @@
+# coding: utf-8
+import json
+import random
+import unittest
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from scenarios.scenario_models.forms.form import Form, form_models
+from scenarios.scenario_models.forms.form_description import FormDescription
+from scenarios.scenario_models.history import Event, HistoryDescription
+from scenarios.user.user_model import User
+
+EXPIRE_ORDER = ["counters", "variables", "private_vars", "local_vars", "message_vars", "behaviors", "forms",
+                "last_fields", "last_scenarios", "history"]
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def patched(self):
+        stack = ExitStack()
+        for target in ("time.time", "core.basic_models.counter.counter.time",
+                       "scenarios.scenario_models.history.history.time", "scenarios.behaviors.behaviors.time"):
+            stack.enter_context(patch(target, self))
+        return stack
+
+
+def reference_expire(user):
+    """User.expire до индекса: expire всех подсистем"""
+    for name in EXPIRE_ORDER:
+        user.get_field(name).expire()
+
+
+def random_record(rng, now):
+    def deadline():
+        return int(now) + rng.randint(-50, 100)
+
+    return {
+        "counters": {f"c{i}": {"value": i + 1, "create_time": int(now) - rng.randint(0, 100), "update_time": None,
+                               "lifetime": rng.choice([None, rng.randint(1, 100)])} for i in range(rng.randint(0, 3))},
+        "variables": {f"v{i}": [i, deadline()] for i in range(rng.randint(0, 3))},
+        "private_vars": {f"p{i}": [i, deadline()] for i in range(rng.randint(0, 3))},
+        "last_fields": {f"lf{i}": {"value": i, "remove_time": deadline()} for i in range(rng.randint(0, 3))},
+        "forms": {form_id: {"remove_time": deadline()}
+                  for form_id in rng.sample(["form1", "form2", "removed_form"], rng.randint(0, 3))},
+        "last_scenarios": rng.sample(["s_form1", "s_form2", "no_form_scenario", "removed_scenario"],
+                                     rng.randint(0, 4)),
+        "history": {"events": [{"type": "t", "scenario": "s_form1", "created_time": now - rng.randint(0, 100)}
+                               for _ in range(rng.randint(0, 3))]},
+        "behaviors": {f"cb{i}": {"behavior_id": "b", "expire_time": deadline(), "scenario_id": None}
+                      for i in range(rng.randint(0, 2))},
+    }
+
+
+def mutate(user, rng, now):
+    """Случайные изменения части подсистем, как при обработке сообщения"""
+    if rng.random() < 0.3:
+        user.variables.set("new", 1, ttl=rng.randint(1, 100))
+    if rng.random() < 0.3:
+        user.counters["new"].inc(lifetime=rng.randint(1, 100))
+    if rng.random() < 0.3:
+        user.last_fields["new"].set_remove_time(rng.randint(1, 100))
+    if rng.random() < 0.3:
+        user.forms.new("form1")
+    if rng.random() < 0.3:
+        user.forms.remove_item("form2")
+    if rng.random() < 0.3:
+        user.history.add_event(Event(type="t", scenario="s_form2", created_time=now))
+    if rng.random() < 0.3:
+        user.last_scenarios.scenarios_names.append(rng.choice(["s_form1", "s_form2"]))
+
+
+class UserExpiryIndexTest(unittest.TestCase):
+    def setUp(self):
+        form_models[FormDescription] = Form
+        self.descriptions = {
+            "forms": {form_id: FormDescription({"fields": {}, "lifetime": 40}, form_id)
+                      for form_id in ("form1", "form2")},
+            "scenarios": {"s_form1": SimpleNamespace(form_type="form1"),
+                          "s_form2": SimpleNamespace(form_type="form2"),
+                          "no_form_scenario": SimpleNamespace()},
+            "behaviors": {},
+            "history": HistoryDescription({"enabled": True, "event_expiration_delay": 30}),
+            "last_scenarios": Mock(),
+        }
+        self.settings = Mock()
+        self.settings.app_name = "test_app"
+        self.message = Mock(callback_id=None)
+
+    def _user(self, db_data):
+        return User(1, self.message, db_data, self.settings, self.descriptions, Mock())
+
+    @staticmethod
+    def _state(user):
+        raw = json.loads(json.dumps(user.raw))
+        raw.pop("expiry_index", None)
+        return raw
+
+    def test_equivalent_to_full_expire(self):
+        for seed in range(200):
+            rng = random.Random(seed)
+            clock = Clock(1600000000.0 + rng.random())
+            with clock.patched():
+                record = json.dumps(random_record(rng, clock.now))
+                indexed_record = reference_record = record
+                for step in range(5):
+                    clock.now += rng.choice([0, 1, rng.randint(0, 60)])
+                    indexed, reference = self._user(indexed_record), self._user(reference_record)
+                    indexed.expire()
+                    reference_expire(reference)
+                    self.assertEqual(self._state(indexed), self._state(reference), f"seed {seed}, step {step}")
+
+                    mutation_seed = rng.random()
+                    mutate(indexed, random.Random(mutation_seed), clock.now)
+                    mutate(reference, random.Random(mutation_seed), clock.now)
+                    indexed_record, reference_record = indexed.raw_str, reference.raw_str
+
+    def test_untouched_fields_skipped(self):
+        clock = Clock(1600000000.0)
+        with clock.patched():
+            user = self._user(json.dumps({"variables": {"a": [1, clock.now + 100]},
+                                          "forms": {"form1": {"remove_time": clock.now + 50}}}))
+            user.expire()
+            record = user.raw_str
+            self.assertEqual(json.loads(record)["expiry_index"]["heap"][:2],
+                             [[clock.now + 50, "forms"], [clock.now + 100, "variables"]])
+
+            user = self._user(record)
+            user.expire()
+            self.assertFalse(user.is_materialized("forms"))
+            self.assertFalse(user.is_materialized("variables"))
+
+            clock.now += 50
+            user = self._user(record)
+            user.expire()
+            self.assertTrue(user.is_materialized("forms"))
+            self.assertFalse(user.is_materialized("variables"))
+            self.assertEqual(user.raw["forms"], {})
+
+    def test_removed_description(self):
+        clock = Clock(1600000000.0)
+        with clock.patched():
+            user = self._user(json.dumps({"forms": {"form2": {"remove_time": clock.now + 50}},
+                                          "last_scenarios": ["s_form2"]}))
+            user.expire()
+            record = user.raw_str
+            del self.descriptions["forms"]["form2"]
+            user = self._user(record)
+            user.expire()
+            self.assertNotIn("form2", user.raw["forms"])
+            self.assertEqual(user.raw["last_scenarios"], [])
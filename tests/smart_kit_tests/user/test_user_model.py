@@ -37,7 +37,7 @@ class UserTest2(unittest.TestCase):
     def test_smart_app_user_fields(self):
         obj1 = user_model.User(self.test_id, self.test_message, None, self.test_values, self.test_descriptions,
                                self.test_parametrizer_cls)
-        self.assertEqual(len(obj1.fields), 15)
+        self.assertEqual(len(obj1.fields), 16)
         self.assertTrue(isinstance(obj1.fields[0], Field))
 
     def test_smart_app_user_parametrizer(self):